@@ -20,7 +20,9 @@ from meetup_search.commands.reset_index import reset_index
 from meetup_search.commands.update_groups import update_groups
 from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient
 from meetup_search.models.token import Token
-from meetup_search.rest_api.api import MeetupSearchApi, MeetupSearchSuggestApi
+from meetup_search.rest_api.api import (MeetupSearchApi, MeetupSearchSuggestApi,
+                                        ResultCacheStatsApi)
+from meetup_search.rest_api.result_cache import MemoryCacheBackend, ResultCache
 
 
 def create_app(config_path: Optional[str] = None) -> FlaskApp:
@@ -83,17 +85,28 @@ def create_app(config_path: Optional[str] = None) -> FlaskApp:
             access_token=meetup_token['access_token'],
             refresh_token=meetup_token['refresh_token']
         )
+        if 'expires_in' in meetup_token:
+            token.set_expires_in(expires_in=int(meetup_token['expires_in']))
         token.save()
         
         return jsonify(
                 meetup.get('https://api.meetup.com/self/groups?&sign=true&photo-host=secure&page=20'
             ).json())
 
+    # init result cache
+    if app.config.get("RESULT_CACHE_ENABLED"):
+        app.extensions["result_cache"] = ResultCache(
+            backend=app.config.get("RESULT_CACHE_BACKEND")
+            or MemoryCacheBackend(max_size=app.config["RESULT_CACHE_MAX_SIZE"]),
+            ttl=app.config["RESULT_CACHE_TTL"],
+        )
+
     # init flask api
     api: Api = Api(app)
     # add api endpoints
     api.add_resource(MeetupSearchApi, "/")
     api.add_resource(MeetupSearchSuggestApi, "/suggest/")
+    api.add_resource(ResultCacheStatsApi, "/cache/")
 
     # add commands to flask app
     app.cli.add_command(get_group)
@@ -14,6 +14,16 @@ SECRET_KEY = env("SECRET_KEY")
 # https://flask-restful.readthedocs.io/en/latest/reqparse.html#multiple-values-lists
 BUNDLE_ERRORS = False
 
+# Result Cache
+# ------------------------------------------------------------------------------
+# cache the responses of the search & suggest endpoints in the process, when enabled with the
+# RESULT_CACHE_ENABLED env, for a cache shared by all processes set RESULT_CACHE_BACKEND to a
+# RedisCacheBackend in a custom config
+RESULT_CACHE_ENABLED = env.bool("RESULT_CACHE_ENABLED", False)
+RESULT_CACHE_TTL = env.int("RESULT_CACHE_TTL", 60)
+RESULT_CACHE_MAX_SIZE = env.int("RESULT_CACHE_MAX_SIZE", 1000)
+RESULT_CACHE_BACKEND = None
+
 
 # ELASTICSEARCH
 # ------------------------------------------------------------------------------
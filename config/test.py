@@ -4,3 +4,8 @@ from config.base import *
 # ------------------------------------------------------------------------------
 TESTING = True
 DEBUG = True
+
+# Result Cache
+# ------------------------------------------------------------------------------
+# the tests write & search without bumping the index generation
+RESULT_CACHE_ENABLED = False
@@ -7,7 +7,10 @@ from flask.app import Flask
 from app import create_app
 from meetup_search.commands.migrate_models import migrate_models
 from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient
-from meetup_search.models.group import Group
+from meetup_search.models.crawl_state import CrawlState
+from meetup_search.models.group import Event, Group, GroupMeetupId
+from meetup_search.models.index_generation import IndexGeneration
+from meetup_search.models.index_version import get_version_pattern
 from meetup_search.models.meetup_zip import MeetupZip
 from meetup_search.models.token import Token
 
@@ -15,12 +18,13 @@ from meetup_search.models.token import Token
 @pytest.fixture
 def api_client() -> MeetupApiClient:
     """
-    meetup api client
+    meetup api client, wich wait for the refresh of every write, so the written groups & events
+    are searchable right away
 
     Returns:
         MeetupApiClient -- Meetup Api client
     """
-    return MeetupApiClient()
+    return MeetupApiClient(refresh="wait_for")
 
 
 @pytest.fixture
@@ -139,22 +143,16 @@ def pytest_runtest_teardown():
 
 def delte_index():
     """
-    delte elasticsearch index
+    delte elasticsearch index, with all index versions behind the aliases
     """
-    print("delete Elasticsearch index: {}".format(Group.Index.name))
-    create_app(config_path="/app/config/test.py").config["ES"].indices.delete(
-        index=Group.Index.name, ignore=[400, 404]
-    )
-
-    print("delete Elasticsearch index: {}".format(MeetupZip.Index.name))
-    create_app(config_path="/app/config/test.py").config["ES"].indices.delete(
-        index=MeetupZip.Index.name, ignore=[400, 404]
-    )
-
-    print("delete Elasticsearch index: {}".format(Token.Index.name))
-    create_app(config_path="/app/config/test.py").config["ES"].indices.delete(
-        index=Token.Index.name, ignore=[400, 404]
-    )
+    for document in (Group, Event, GroupMeetupId, MeetupZip, Token, CrawlState, IndexGeneration):
+        print("delete Elasticsearch index: {}".format(document.Index.name))
+        create_app(config_path="/app/config/test.py").config["ES"].indices.delete(
+            index=get_version_pattern(document=document), ignore=[400, 404]
+        )
+        create_app(config_path="/app/config/test.py").config["ES"].indices.delete(
+            index=document.Index.name, ignore=[400, 404]
+        )
 
     sleep(2)
 
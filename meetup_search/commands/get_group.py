@@ -7,23 +7,29 @@ from meetup_search.meetup_api_client.exceptions import (
     MeetupConnectionError,
 )
 from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient
+from meetup_search.models.bulk_writer import REFRESH_MODES, BulkWriter
 from meetup_search.models.group import Event, Group
+from meetup_search.models.index_generation import IndexGeneration
 
 
 @click.command(name="get_group")
 @with_appcontext
 @click.option("--sandbox", nargs=1, type=bool)
+@click.option("--refresh", type=click.Choice(REFRESH_MODES), default="true")
 @click.argument(
     "meetup_group_urlname", type=str, required=False,
 )
 def get_group(
-    meetup_group_urlname: Optional[str] = None, sandbox: bool = False
+    meetup_group_urlname: Optional[str] = None,
+    sandbox: bool = False,
+    refresh: str = "true",
 ) -> Group:
     """
     Load single Meetupgroup from Meetup REST API into elasticsearch
 
     Arguments:
         meetup_group_urlname {str} -- meetup group urlname to load the group from meetup
+        refresh {str} -- elasticsearch refresh mode after the last write
 
     Returns:
         Group -- updated group from meetup.com
@@ -35,15 +41,19 @@ def get_group(
         print("No meetup_group_urlname was given!")
         exit(1)
 
-    api_client: MeetupApiClient = MeetupApiClient()
+    with BulkWriter(refresh=refresh) as bulk_writer:
+        api_client: MeetupApiClient = MeetupApiClient(bulk_writer=bulk_writer)
 
-    try:
-        group: Group = api_client.get_group(meetup_group_urlname)
-    except (GroupDoesNotExistsOnMeetup, MeetupConnectionError) as e:
-        print(e)
-        exit(2)
+        try:
+            group: Group = api_client.get_group(meetup_group_urlname)
+        except (GroupDoesNotExistsOnMeetup, MeetupConnectionError) as e:
+            print(e)
+            exit(2)
 
-    group_events: List[Event] = api_client.update_all_group_events(group=group)
+        group_events: List[Event] = api_client.update_all_group_events(group=group)
+
+    # invalidate the cached search results of the rest api
+    IndexGeneration.bump()
 
     print("Group {} was updatet with {} events".format(group.name, len(group_events)))
 
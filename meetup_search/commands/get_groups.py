@@ -1,6 +1,7 @@
 import glob
 import json
-from typing import Dict, List
+import os
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 import click
 from flask.cli import with_appcontext
@@ -9,12 +10,20 @@ from meetup_search.meetup_api_client.exceptions import (
     GroupDoesNotExistsOnMeetup,
     MeetupConnectionError,
 )
+from meetup_search.meetup_api_client.crawler import Crawler
+from meetup_search.meetup_api_client.http_transport import HttpTransport
 from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient
+from meetup_search.models.bulk_writer import REFRESH_MODES, BulkWriter
+from meetup_search.models.crawl_state import CrawlState
 from meetup_search.models.group import Event, Group
+from meetup_search.models.index_generation import IndexGeneration
 
 
 @click.command(name="get_groups")
 @click.option("--load_events", nargs=1, type=bool, default=True)
+@click.option("--refresh", type=click.Choice(REFRESH_MODES), default="true")
+@click.option("--workers", type=click.IntRange(min=1), default=1)
+@click.option("--resume", is_flag=True, default=False)
 @with_appcontext
 @click.argument(
     "meetup_files_path",
@@ -22,55 +31,108 @@ from meetup_search.models.group import Event, Group
     required=False,
     default="meetup_groups",
 )
-def get_groups(meetup_files_path: str, load_events: bool) -> Dict[str, List[str]]:
+def get_groups(
+    meetup_files_path: str,
+    load_events: bool,
+    refresh: str = "true",
+    workers: int = 1,
+    resume: bool = False,
+) -> Dict[str, List[str]]:
     """
     parse all JSON files in meetup_files_path, get the group name and index every group into
-    elasticsearch
+    elasticsearch, every crawled group is saved in the crawl state, so an interrupted run can be
+    resumed
 
     Arguments:
         meetup_files_path {str} -- path of the JSON files
         load_events {bool} -- load all events from groups
+        refresh {str} -- elasticsearch refresh mode after the last write
+        workers {int} -- amount of groups crawled at the same time
+        resume {bool} -- skip the groups wich was crawled by the last interrupted run
 
     Returns:
         Dict[str, List[str]] -- dict with valid & invalid group lists
     """
 
-    api_client: MeetupApiClient = MeetupApiClient()
-
-    mettup_groups_files: List[str] = glob.glob("{}/*.json".format(meetup_files_path))
-
     groups_dict: Dict[str, List[str]] = {"valid": [], "invalid": []}
     event_counter: int = 0
 
-    for mettup_groups_file in mettup_groups_files:
-        with open(mettup_groups_file) as json_file:
-            data = json.load(json_file)
-
-            for group_data in data:
-                try:
-                    group: Group = api_client.get_group(data[group_data]["urlname"])
-                except (GroupDoesNotExistsOnMeetup, MeetupConnectionError) as e:
-                    print(e)
-                    groups_dict["invalid"].append(data[group_data]["urlname"])
-                    continue
+    # load the crawl state of the last run, or start from the beginning
+    crawl: str = "get_groups:{}".format(os.path.abspath(meetup_files_path))
+    done_urlnames: Set[str] = set()
+    if resume:
+        done_urlnames = CrawlState.get_done_tasks(crawl=crawl)
+        print("Resume crawl, skip {} groups!".format(len(done_urlnames)))
+    else:
+        CrawlState.reset(crawl=crawl)
+
+    def crawl_group(urlname: str) -> Tuple[str, Optional[Group], List[Event]]:
+        """
+        load a group & optional all new events from meetup
+
+        Arguments:
+            urlname {str} -- meetup group urlname
+
+        Returns:
+            Tuple[str, Optional[Group], List[Event]] -- urlname, group or None when the group
+                                                        could not be loaded & the new events
+        """
+        try:
+            group: Group = api_client.get_group(urlname)
+        except GroupDoesNotExistsOnMeetup as e:
+            print(e)
+            CrawlState.mark_done(crawl=crawl, task=urlname, bulk_writer=bulk_writer)
+            return urlname, None, []
+        except MeetupConnectionError as e:
+            # crawl the group again on resume
+            print(e)
+            return urlname, None, []
+
+        group_events: List[Event] = []
+        if load_events:
+            try:
+                group_events = api_client.update_all_group_events(group=group, raise_errors=True)
+            except MeetupConnectionError as e:
+                # crawl the group again on resume, when not all events could be loaded
+                print(e)
+                return urlname, group, group_events
+
+        CrawlState.mark_done(crawl=crawl, task=urlname, bulk_writer=bulk_writer)
+        return urlname, group, group_events
+
+    # the bulk writer is closed on errors too, so the buffered groups & crawl state are saved
+    with BulkWriter(refresh=refresh) as bulk_writer:
+        api_client: MeetupApiClient = MeetupApiClient(
+            transport=HttpTransport(pool_maxsize=max(workers, 10)), bulk_writer=bulk_writer
+        )
 
-                groups_dict["valid"].append(data[group_data]["urlname"])
+        crawler: Crawler = Crawler(workers=workers)
+        urlnames: Iterator[str] = (
+            urlname
+            for urlname in get_urlnames(meetup_files_path=meetup_files_path)
+            if urlname not in done_urlnames
+        )
+        for urlname, group, group_events in crawler.run(tasks=urlnames, crawl=crawl_group):
+            if not group:
+                groups_dict["invalid"].append(urlname)
+                continue
 
-                if load_events:
-                    group_events: List[Event] = api_client.update_all_group_events(
-                        group=group
-                    )
+            groups_dict["valid"].append(urlname)
 
-                    event_counter = event_counter + len(group_events)
+            if load_events:
+                event_counter = event_counter + len(group_events)
 
-                    print(
-                        "Group {} was updatet with {} events".format(
-                            group.name, len(group_events)
-                        )
+                print(
+                    "Group {} was updatet with {} events".format(
+                        group.name, len(group_events)
                     )
+                )
 
-                else:
-                    print("Group {} was updatet without events".format(group.name,))
+            else:
+                print("Group {} was updatet without events".format(group.name,))
+
+    # invalidate the cached search results of the rest api
+    IndexGeneration.bump()
 
     print(
         "{} groups was updatet with {} new events & {} do not exists anymore".format(
@@ -79,3 +141,23 @@ def get_groups(meetup_files_path: str, load_events: bool) -> Dict[str, List[str]
     )
 
     return groups_dict
+
+
+def get_urlnames(meetup_files_path: str) -> Iterator[str]:
+    """
+    get every group urlname of all JSON files in meetup_files_path
+
+    Arguments:
+        meetup_files_path {str} -- path of the JSON files
+
+    Returns:
+        Iterator[str] -- group urlnames
+    """
+    mettup_groups_files: List[str] = glob.glob("{}/*.json".format(meetup_files_path))
+
+    for mettup_groups_file in mettup_groups_files:
+        with open(mettup_groups_file) as json_file:
+            data = json.load(json_file)
+
+        for group_data in data:
+            yield data[group_data]["urlname"]
@@ -1,64 +1,172 @@
-from time import sleep
-from typing import List
+from typing import Iterator, List, Set, Tuple
 
 import click
 from flask.cli import with_appcontext
 
+from meetup_search.meetup_api_client.crawler import Crawler, SeenSet
+from meetup_search.meetup_api_client.exceptions import (HttpNoSuccess, HttpNotAccessibleError,
+                                                        HttpNotFoundError, HttpNoXRateLimitHeader,
+                                                        MeetupConnectionError)
+from meetup_search.meetup_api_client.http_transport import HttpTransport
 from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient
+from meetup_search.models.bulk_writer import REFRESH_MODES, BulkWriter
+from meetup_search.models.crawl_state import CrawlState
 from meetup_search.models.group import Group
+from meetup_search.models.index_generation import IndexGeneration
 from meetup_search.models.meetup_zip import MeetupZip
 
 
 @click.command(name="load_groups")
 @click.option("--load_events", nargs=1, type=bool, default=True)
 @click.option("--country", nargs=1, type=str, default="DE")
+@click.option("--refresh", type=click.Choice(REFRESH_MODES), default="true")
+@click.option("--workers", type=click.IntRange(min=1), default=1)
+@click.option("--resume", is_flag=True, default=False)
 @with_appcontext
-def load_groups_command(load_events: bool, country: str):
+def load_groups_command(
+    load_events: bool, country: str, refresh: str, workers: int, resume: bool
+):
     """
     Load all groups from a country of all meetup zips saved in elasticsearch
 
     Arguments:
         load_events {bool} -- Load all past events of every group and save them into elasticsearch
         country {str} -- Country code like DE for germany
+        refresh {str} -- elasticsearch refresh mode after the last write
+        workers {int} -- amount of zips crawled at the same time
+        resume {bool} -- skip the zips wich was crawled by the last interrupted run
     """
 
-    load_groups(load_events=load_events, country=country)
+    load_groups(
+        load_events=load_events,
+        country=country,
+        refresh=refresh,
+        workers=workers,
+        resume=resume,
+    )
 
 
-def load_groups(load_events: bool, country: str):
+def get_crawl(country: str, index: str) -> str:
     """
-    Load all groups from a country of all meetup zips saved in elasticsearch
+    Get the crawl state name of load_groups, the state is bound to the filled group index, so a
+    resume into a new index version does not skip the zips wich was crawled into another index
 
     Arguments:
-        load_events {bool} -- Load all past events of every group and save them into elasticsearch
         country {str} -- Country code like DE for germany
+        index {str} -- filled group index
+
+    Returns:
+        str -- crawl name, like "load_groups:DE:meetup_group"
+    """
+    return "load_groups:{}:{}".format(country, index)
+
+
+def load_groups(
+    load_events: bool,
+    country: str,
+    refresh: str = "true",
+    workers: int = 1,
+    resume: bool = False,
+):
     """
-    # meetup api client
-    api_client: MeetupApiClient = MeetupApiClient()
+    Load all groups from a country of all meetup zips saved in elasticsearch, every crawled zip is
+    saved in the crawl state, so an interrupted run can be resumed
+
+    Arguments:
+        load_events {bool} -- Load all past events of every group and save them into elasticsearch
+        country {str} -- Country code like DE for germany
 
-    # get all zip codes from elasticsearch
-    meetup_zips: List[MeetupZip] = MeetupZip.get_all_zips()
+    Keyword Arguments:
+        refresh {str} -- elasticsearch refresh mode after the last write (default: {"true"})
+        workers {int} -- amount of zips crawled at the same time (default: {1})
+        resume {bool} -- skip the zips wich was crawled by the last interrupted run, the events
+                         of a group are always resumed from the last stored event
+                         (default: {False})
+    """
+    # load the crawl state of the last run into the same group index, or start from the beginning
+    crawl: str = get_crawl(country=country, index=Group._default_index())
+    done_zips: Set[str] = set()
+    if resume:
+        done_zips = CrawlState.get_done_tasks(crawl=crawl)
+        print("Resume crawl, skip {} zips!".format(len(done_zips)))
+    else:
+        CrawlState.reset(crawl=crawl)
+
+    # stream all zip codes from elasticsearch
+    meetup_zips: Iterator[MeetupZip] = (
+        meetup_zip
+        for meetup_zip in MeetupZip.get_all_zips()
+        if meetup_zip.zip_code not in done_zips
+    )
+
+    # every group is saved & event-fetched only once per run, neighboring zips find the same groups
+    seen_groups: SeenSet = SeenSet()
 
     print("Start fetching groups from meetup!")
 
-    for meetup_zip in meetup_zips:
-        groups: List[Group] = api_client.search_new_groups(
-            zip_code=meetup_zip.zip_code, country_code=country
-        )
+    def crawl_zip(meetup_zip: MeetupZip) -> Tuple[MeetupZip, List[Group]]:
+        """
+        load all groups of a zip & optional all new events of the groups
 
-        sleep(1)
+        Arguments:
+            meetup_zip {MeetupZip} -- zip to crawl
 
+        Returns:
+            Tuple[MeetupZip, List[Group]] -- crawled zip & its groups
+        """
+        try:
+            groups: List[Group] = api_client.search_new_groups(
+                zip_code=meetup_zip.zip_code, country_code=country, seen_groups=seen_groups
+            )
+        except (
+            HttpNotFoundError,
+            HttpNotAccessibleError,
+            HttpNoSuccess,
+            HttpNoXRateLimitHeader,
+        ) as e:
+            # crawl the zip again on resume
+            print(e)
+            return meetup_zip, []
+
+        zip_done: bool = True
         if load_events:
             for group in groups:
                 print(group.urlname)
 
                 try:
-                    api_client.update_all_group_events(group=group)
-                except Exception as e:
+                    api_client.update_all_group_events(group=group, raise_errors=True)
+                except MeetupConnectionError as e:
                     print(e)
+                    zip_done = False
+
+        # crawl the zip again on resume, when not all events could be loaded
+        if zip_done:
+            CrawlState.mark_done(crawl=crawl, task=meetup_zip.zip_code, bulk_writer=bulk_writer)
+
+        return meetup_zip, groups
 
-        print(
-            "{} groups was added to elasticsearch for zip {}!".format(
-                len(groups), meetup_zip.zip_code
+    # the bulk writer is closed on errors too, so the buffered groups & crawl state are saved
+    with BulkWriter(refresh=refresh) as bulk_writer:
+        api_client: MeetupApiClient = MeetupApiClient(
+            transport=HttpTransport(pool_maxsize=max(workers, 10)), bulk_writer=bulk_writer
+        )
+
+        crawler: Crawler = Crawler(workers=workers)
+        for meetup_zip, groups in crawler.run(tasks=meetup_zips, crawl=crawl_zip):
+            print(
+                "{} groups was added to elasticsearch for zip {}!".format(
+                    len(groups), meetup_zip.zip_code
+                )
             )
+
+    # invalidate the cached search results of the rest api
+    IndexGeneration.bump()
+
+    print(
+        "{} groups was found, {} duplicate groups of neighboring zips was skipped!".format(
+            len(seen_groups), seen_groups.duplicates
         )
+    )
+
+    if len(bulk_writer.errors) > 0:
+        print("{} groups could not be saved!".format(len(bulk_writer.errors)))
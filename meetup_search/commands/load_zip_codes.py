@@ -17,9 +17,10 @@ from meetup_search.models.meetup_zip import MeetupZip
 @click.argument("lat_max", type=float, required=True)
 @click.argument("lon_min", type=float, required=True)
 @click.argument("lon_max", type=float, required=True)
+@click.option("--max_requests", type=click.IntRange(min=1), default=1000)
 @with_appcontext
 def load_zip_codes_command(
-    lat_min: float, lat_max: float, lon_min: float, lon_max: float
+    lat_min: float, lat_max: float, lon_min: float, lon_max: float, max_requests: int
 ):
     """
     Load all meetup zip codes from a boundingbox [min_lat, max_lat, min_lon, max_lon]
@@ -29,11 +30,20 @@ def load_zip_codes_command(
         lat_max {float} -- boundingbox lat max
         lon_min {float} -- boundingbox lon min
         lon_max {float} -- boundingbox lon max
+        max_requests {int} -- max requests to meetup for the boundingbox
     """
-    load_zip_codes(lat_min=lat_min, lat_max=lat_max, lon_min=lon_min, lon_max=lon_max)
+    load_zip_codes(
+        lat_min=lat_min,
+        lat_max=lat_max,
+        lon_min=lon_min,
+        lon_max=lon_max,
+        max_requests=max_requests,
+    )
 
 
-def load_zip_codes(lat_min: float, lat_max: float, lon_min: float, lon_max: float):
+def load_zip_codes(
+    lat_min: float, lat_max: float, lon_min: float, lon_max: float, max_requests: int = 1000
+):
     """
     Load all meetup zip codes from a boundingbox [min_lat, max_lat, min_lon, max_lon]
 
@@ -42,6 +52,9 @@ def load_zip_codes(lat_min: float, lat_max: float, lon_min: float, lon_max: floa
         lat_max {float} -- boundingbox lat max
         lon_min {float} -- boundingbox lon min
         lon_max {float} -- boundingbox lon max
+
+    Keyword Arguments:
+        max_requests {int} -- max requests to meetup for the boundingbox (default: {1000})
     """
     # init api client
     api_client: MeetupApiClient = MeetupApiClient()
@@ -49,7 +62,11 @@ def load_zip_codes(lat_min: float, lat_max: float, lon_min: float, lon_max: floa
     try:
         # get all zip codes from Switzerland
         zip_code_list: List[str] = api_client.get_all_zip_from_meetup(
-            min_lat=lat_min, max_lat=lat_max, min_lon=lon_min, max_lon=lon_max,
+            min_lat=lat_min,
+            max_lat=lat_max,
+            min_lon=lon_min,
+            max_lon=lon_max,
+            max_requests=max_requests,
         )
     except (
         HttpNotFoundError,
@@ -1,7 +1,21 @@
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Set, Tuple, Type
+
 import click
+from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import RequestError
+from elasticsearch.helpers import scan
+from elasticsearch_dsl import Document, Q, Search, UpdateByQuery, connections
+from elasticsearch_dsl.response import Response
 from flask.cli import with_appcontext
 
-from meetup_search.models.group import Group
+from meetup_search.models.bulk_writer import BulkWriter
+from meetup_search.models.crawl_state import CrawlState
+from meetup_search.models.group import Event, Group, GroupMeetupId
+from meetup_search.models.index_generation import IndexGeneration
+from meetup_search.models.index_version import (create_index_version, get_alias_indices,
+                                                switch_aliases)
 from meetup_search.models.meetup_zip import MeetupZip
 from meetup_search.models.token import Token
 
@@ -17,8 +31,305 @@ def migrate_models_command():
 
 def migrate_models():
     """
-    init elasticsearch models
+    init elasticsearch models, indices with a mapping wich can't be updated are reindexed after
+    the data migrations
+    """
+    reindex_documents: List[Type[Document]] = [
+        document
+        for document in (
+            Group, Event, GroupMeetupId, MeetupZip, Token, CrawlState, IndexGeneration
+        )
+        if not init_index(document)
+    ]
+
+    # index the zip_code keyword sub field of zips, which was saved before it was mapped
+    UpdateByQuery(index=MeetupZip._default_index()).query(
+        "bool", must_not={"exists": {"field": "zip_code.keyword"}}
+    ).params(conflicts="proceed").execute()
+
+    migrate_zip_ids()
+    migrate_group_ids()
+    migrate_group_events()
+    migrate_group_event_stats()
+    migrate_group_meetup_ids()
+
+    for document in reindex_documents:
+        print("reindex {}".format(document.Index.name))
+        reindex_index(document)
+
+    # invalidate the cached search results of the rest api
+    IndexGeneration.bump()
+
+
+def init_index(document: Type[Document]) -> bool:
+    """
+    create a new index version with an alias for a document or update the mapping of the existing
+    index behind the alias
+
+    Arguments:
+        document {Type[Document]} -- document class of the index
+
+    Returns:
+        bool -- False when the existing mapping conflict with the document mapping, like a text
+                field wich is now a keyword field, so the index has to be reindexed
+    """
+    connection: Elasticsearch = connections.get_connection()
+    if not connection.indices.exists(index=document.Index.name):
+        switch_aliases({document: create_index_version(document=document)})
+        return True
+
+    # the mapping can be only updated on the physical index & not on the alias
+    try:
+        for index in get_alias_indices(document=document) or [document.Index.name]:
+            document.init(index=index)
+    except RequestError as e:
+        if e.error != "illegal_argument_exception":
+            raise
+        return False
+    return True
+
+
+def reindex_index(document: Type[Document], request_timeout: int = 3600) -> int:
+    """
+    copy all documents into a new index version with the current mapping & switch the alias to the
+    new index afterwards, the old index is used until the new index is complete
+
+    Arguments:
+        document {Type[Document]} -- document class of the index
+
+    Keyword Arguments:
+        request_timeout {int} -- timeout of the reindex request in secounds (default: {3600})
+
+    Raises:
+        RequestError: when not every document could be copied, the alias is not switched
+
+    Returns:
+        int -- amount of reindexed documents
+    """
+    connection: Elasticsearch = connections.get_connection()
+    index: str = create_index_version(document=document)
+
+    response: dict = connection.reindex(
+        body={"source": {"index": document.Index.name}, "dest": {"index": index}},
+        refresh=True,
+        request_timeout=request_timeout,
+    )
+    if len(response["failures"]) > 0:
+        connection.indices.delete(index=index)
+        raise RequestError(400, "reindex_failures", response["failures"])
+
+    switch_aliases({document: index})
+
+    return response["total"]
+
+
+def migrate_group_ids() -> int:
+    """
+    move groups, which was saved with a random id, to the id based on the urlname
+
+    Returns:
+        int -- amount of moved groups
+    """
+    # (old id, new id) of every moved group
+    moved_ids: List[Tuple[str, str]] = []
+
+    # scan use a scroll snapshot, so the moved groups are not loaded again
+    with BulkWriter() as bulk_writer:
+        for group in Group.search().params(preserve_order=False).scan():
+            old_id: str = group.meta.id
+            new_id: str = Group.get_id(urlname=group.urlname)
+            if old_id == new_id:
+                continue
+
+            # save the group with the new id, the old document is deleted after the flush
+            bulk_writer.save(group)
+            moved_ids.append((old_id, new_id))
+
+    return delete_moved_documents(
+        document=Group, moved_ids=moved_ids, errors=bulk_writer.errors
+    )
+
+
+def migrate_zip_ids() -> int:
+    """
+    move zips, which was saved with a random id, to the zip_code as id, double zips are merged
+
+    Returns:
+        int -- amount of moved zips
+    """
+    # (old id, new id) of every moved zip
+    moved_ids: List[Tuple[str, str]] = []
+
+    # scan use a scroll snapshot, so the moved zips are not loaded again
+    with BulkWriter() as bulk_writer:
+        for meetup_zip in MeetupZip.search().params(preserve_order=False).scan():
+            old_id: str = meetup_zip.meta.id
+            if old_id == meetup_zip.zip_code:
+                continue
+
+            # create the zip with the new id, the old document is deleted after the flush
+            bulk_writer.create(MeetupZip(zip_code=meetup_zip.zip_code))
+            moved_ids.append((old_id, meetup_zip.zip_code))
+
+    return delete_moved_documents(
+        document=MeetupZip, moved_ids=moved_ids, errors=bulk_writer.errors
+    )
+
+
+def delete_moved_documents(
+    document: Type[Document], moved_ids: List[Tuple[str, str]], errors: List[dict]
+) -> int:
+    """
+    delete the old documents after they was written with the new id, old documents of a new id
+    wich could not be written are kept, so no document is lost
+
+    Arguments:
+        document {Type[Document]} -- document class of the moved documents
+        moved_ids {List[Tuple[str, str]]} -- (old id, new id) of every moved document
+        errors {List[dict]} -- bulk response items of the failed writes
+
+    Returns:
+        int -- amount of moved documents
+    """
+    failed_ids: Set[str] = {error["_id"] for error in errors if "_id" in error}
+
+    with BulkWriter() as bulk_writer:
+        for old_id, new_id in moved_ids:
+            if new_id not in failed_ids:
+                bulk_writer.delete(document(meta={"id": old_id}))
+
+    if len(failed_ids) > 0:
+        print(
+            "{} {} documents could not be moved!".format(len(failed_ids), document.Index.name)
+        )
+
+    return bulk_writer.indexed + bulk_writer.skipped
+
+
+def migrate_group_events() -> int:
+    """
+    move the events from the nested events array of the groups into the event index
+
+    Returns:
+        int -- amount of moved events
     """
-    Group.init()
-    MeetupZip.init()
-    Token.init()
+    moved_events: int = 0
+
+    # groups with nested events, new group indices has no events mapping
+    nested_events_query: dict = {
+        "nested": {
+            "path": "events",
+            "query": {"match_all": {}},
+            "ignore_unmapped": True,
+        }
+    }
+
+    with BulkWriter() as bulk_writer:
+        for hit in scan(
+            connections.get_connection(),
+            index=Group._default_index(),
+            query={"query": nested_events_query},
+            _source=["events"],
+        ):
+            for event_dict in hit["_source"]["events"]:
+                bulk_writer.save(Event(group_id=hit["_id"], **event_dict))
+                moved_events = moved_events + 1
+
+    # keep the nested events, when not every event could be saved
+    if len(bulk_writer.errors) > 0:
+        print("{} events could not be moved!".format(len(bulk_writer.errors)))
+        return moved_events - len(bulk_writer.errors)
+
+    # remove the events from the groups, after all events are saved
+    UpdateByQuery(index=Group._default_index()).query(nested_events_query).script(
+        source="ctx._source.remove('events')"
+    ).params(conflicts="proceed").execute()
+
+    return moved_events
+
+
+def migrate_group_event_stats(batch_size: int = 1000) -> int:
+    """
+    calculate the event statistics of every group without statistics from the event index, the
+    groups are loaded in batches & the statistics of every batch are calculated with a single
+    aggregation & the venues are loaded with a single search. Groups with statistics was updated
+    by the crawler, so they are not calculated again on the next migration.
+
+    Keyword Arguments:
+        batch_size {int} -- how many groups are calculated with a single request (default: {1000})
+
+    Returns:
+        int -- amount of updated groups
+    """
+    updated_groups: int = 0
+
+    # scan use a scroll snapshot, so the updated groups are not loaded again
+    group_ids: Iterator[str] = (
+        group.meta.id
+        for group in Group.search()
+        .filter(~Q("exists", field="event_count"))
+        .source(False)
+        .params(preserve_order=False)
+        .scan()
+    )
+
+    with BulkWriter() as bulk_writer:
+        while True:
+            batch: List[str] = list(islice(group_ids, batch_size))
+            if len(batch) == 0:
+                return updated_groups
+
+            s: Search = Event.search().filter("terms", group_id=batch).extra(size=0)
+            s.aggs.bucket("groups", "terms", field="group_id", size=len(batch)).metric(
+                "first_event_time", "min", field="time"
+            ).metric("last_event_time", "max", field="time")
+            results: Response = s.execute()
+
+            groups: Dict[str, Group] = {}
+            for bucket in results.aggregations.groups.buckets:
+                groups[bucket.key] = Group(
+                    meta={"id": bucket.key},
+                    event_count=bucket.doc_count,
+                    first_event_time=datetime.utcfromtimestamp(
+                        bucket.first_event_time.value / 1000
+                    ),
+                    last_event_time=datetime.utcfromtimestamp(
+                        bucket.last_event_time.value / 1000
+                    ),
+                )
+
+            if len(groups) > 0:
+                for event in Event.get_events_of_groups(
+                    group_ids=list(groups),
+                    source_fields=list(Event.VENUE_FIELDS),
+                    only_with_venue=True,
+                ):
+                    groups[event.group_id].add_venue(event)
+
+            for group in groups.values():
+                bulk_writer.update(group, fields=Group.EVENT_STATS_FIELDS)
+                updated_groups = updated_groups + 1
+
+
+def migrate_group_meetup_ids() -> int:
+    """
+    create the GroupMeetupId documents of groups, wich was saved before the meetup_ids was
+    stored, so renamed groups are found by upsert. Existing documents are not overwritten, so the
+    groups are only loaded when there are less documents than groups with a meetup_id.
+
+    Returns:
+        int -- amount of created documents
+    """
+    groups_with_meetup_id: Search = Group.search().filter("range", meetup_id={"gt": 0})
+    if GroupMeetupId.search().count() >= groups_with_meetup_id.count():
+        return 0
+
+    with BulkWriter() as bulk_writer:
+        for group in (
+            groups_with_meetup_id.source(["meetup_id"]).params(preserve_order=False).scan()
+        ):
+            bulk_writer.create(
+                GroupMeetupId(meta={"id": str(group.meetup_id)}, group_id=group.meta.id)
+            )
+
+    return bulk_writer.indexed
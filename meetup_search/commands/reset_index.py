@@ -1,30 +1,39 @@
 import time
+from datetime import datetime
 from time import sleep
-from typing import List, Optional
+from typing import Dict, List, Optional, Type
 
 import click
-from elasticsearch import Elasticsearch
+from elasticsearch_dsl import Document
 from environs import Env
 from flask.cli import with_appcontext
 
-from meetup_search.commands.load_groups import load_groups
+from meetup_search.commands.load_groups import get_crawl, load_groups
 from meetup_search.commands.load_zip_codes import load_zip_codes
 from meetup_search.commands.migrate_models import migrate_models
-from meetup_search.models.group import Group
+from meetup_search.models.crawl_state import CrawlState
+from meetup_search.models.group import Event, Group, GroupMeetupId
+from meetup_search.models.index_generation import IndexGeneration
+from meetup_search.models.index_version import (INDEX_VERSION_FORMAT, create_index_version,
+                                                delete_unfinished_indices, get_unfinished_index,
+                                                switch_aliases, use_indices)
 from meetup_search.models.meetup_zip import MeetupZip
 
 
 @click.command(name="reset_index")
 @click.option("--waring_time", type=int, default=30)
 @click.option("--reset_periode", type=int)
+@click.option("--resume", is_flag=True, default=False)
 @with_appcontext
-def reset_index(waring_time: int, reset_periode: Optional[int]):
+def reset_index(waring_time: int, reset_periode: Optional[int], resume: bool = False):
     """
-    Reset elasticsearch index & reload every new group from meetup.com
-    
+    Reload every group from meetup.com into new elasticsearch indices, every search use the old
+    indices until the new indices are complete & the aliases are switched to them
+
     Arguments:
         waring_time {int} -- Delay time for stop command
         reset_periode {Optional[int]} -- run this command in a weekly periode like every 4 weeks
+        resume {bool} -- continue to fill the new indices of an interrupted reset
     """
 
     # check if it's time to reset elasticsearch index
@@ -39,8 +48,8 @@ def reset_index(waring_time: int, reset_periode: Optional[int]):
             print("Skip reset elasticsearch index, because it's not on schedule!")
             exit(0)
 
-    print("You try to drop the current elasticsearch index & to reload them again!")
-    print("You have 30 secounds to stop this operation, you can't undo this action!")
+    print("You try to replace the current elasticsearch index & to reload them again!")
+    print("You have {} secounds to stop this operation!".format(waring_time))
     print("To stop this action press 'crtl + c'")
 
     try:
@@ -51,41 +60,60 @@ def reset_index(waring_time: int, reset_periode: Optional[int]):
         print("You stop this action, nothing changed...")
         return
 
-    print("The Elasticsearch index will now be delted ...")
-
-    # delete group & meetup zip index
-    # fixme load es from flask base config!
-    env: Env = Env()
-    elasticsearch: Elasticsearch = Elasticsearch(
-        [{"host": env("http.host"), "port": env("http.port")}]
-    )
-    elasticsearch.indices.delete(index=Group.Index.name, ignore=[400, 404])
-    elasticsearch.indices.delete(index=MeetupZip.Index.name, ignore=[400, 404])
-
-    sleep(2)
-
-    print("The Elasticsearch index are now deletet!")
-
-    # migrate models
+    # migrate models, so the current indices are behind aliases
     migrate_models()
 
-    sleep(1)
-
-    boundingboxes: dict = env.dict("LOCATION_BOUNDINGBOX", subcast=str)
-    for boundingbox in boundingboxes:
-        print("Load meetup.com zip codes for {}".format(boundingbox))
-        boundingbox_list: List[str] = boundingboxes[boundingbox].split(" ")
-        load_zip_codes(
-            lat_min=float(boundingbox_list[0]),
-            lat_max=float(boundingbox_list[1]),
-            lon_min=float(boundingbox_list[2]),
-            lon_max=float(boundingbox_list[3]),
-        )
-
-    sleep(2)
-
-    for country in env.list("LOCATION_COUNTRIES"):
-        print("Load groups with all events from {}!".format(country))
-        load_groups(load_events=True, country=country)
+    env: Env = Env()
+    countries: List[str] = env.list("LOCATION_COUNTRIES")
+
+    # create the new index versions, or use the versions of an interrupted reset
+    version: str = datetime.now().strftime(INDEX_VERSION_FORMAT)
+    indices: Dict[Type[Document], str] = {}
+    for document in (Group, Event, GroupMeetupId, MeetupZip):
+        unfinished_index: Optional[str] = None
+        stale_indices: List[str] = []
+        if resume:
+            unfinished_index = get_unfinished_index(document=document)
+        else:
+            stale_indices = delete_unfinished_indices(document=document)
+
+        if unfinished_index:
+            print("Resume Elasticsearch index: {}".format(unfinished_index))
+            indices[document] = unfinished_index
+        else:
+            indices[document] = create_index_version(document=document, version=version)
+            print("Create Elasticsearch index: {}".format(indices[document]))
+            stale_indices.append(indices[document])
+
+        # the crawl state of deleted & new group indices is never resumed
+        if document is Group:
+            for index in stale_indices:
+                for country in countries:
+                    CrawlState.reset(crawl=get_crawl(country=country, index=index))
+
+    # fill the new indices, while every search still use the old indices
+    with use_indices(indices):
+        boundingboxes: dict = env.dict("LOCATION_BOUNDINGBOX", subcast=str)
+        for boundingbox in boundingboxes:
+            print("Load meetup.com zip codes for {}".format(boundingbox))
+            boundingbox_list: List[str] = boundingboxes[boundingbox].split(" ")
+            load_zip_codes(
+                lat_min=float(boundingbox_list[0]),
+                lat_max=float(boundingbox_list[1]),
+                lon_min=float(boundingbox_list[2]),
+                lon_max=float(boundingbox_list[3]),
+            )
+
+        sleep(2)
+
+        for country in countries:
+            print("Load groups with all events from {}!".format(country))
+            load_groups(load_events=True, country=country, resume=resume)
+
+    # switch all aliases with a single request & delete the old indices
+    switch_aliases(indices)
+
+    # invalidate the cached search results of the rest api
+    IndexGeneration.bump()
 
     print("All done :)")
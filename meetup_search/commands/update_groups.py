@@ -1,23 +1,49 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import Optional
 
 import click
 from flask.cli import with_appcontext
+from meetup_search.meetup_api_client.crawler import Crawler
+from meetup_search.meetup_api_client.http_transport import HttpTransport
 from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient
+from meetup_search.models.bulk_writer import REFRESH_MODES, BulkWriter
 from meetup_search.models.group import Group
+from meetup_search.models.index_generation import IndexGeneration
 
 
 @click.command(name="update_groups")
+@click.option("--refresh", type=click.Choice(REFRESH_MODES), default="true")
+@click.option("--workers", type=click.IntRange(min=1), default=1)
+@click.option("--older_than_days", type=click.IntRange(min=0), default=0)
 @with_appcontext
-def update_groups():
+def update_groups(refresh: str = "true", workers: int = 1, older_than_days: int = 0):
     """
     update for all groups new events
+
+    Arguments:
+        refresh {str} -- elasticsearch refresh mode after the last write
+        workers {int} -- amount of groups updated at the same time
+        older_than_days {int} -- update only groups without events or with the last event older
+                                 than this many days, 0 -> update all groups
     """
-    # get all groups
-    groups: List[Group] = Group.get_all_groups()
+    # select the groups with a range query on the stored last event time
+    last_event_before: Optional[datetime] = None
+    if older_than_days > 0:
+        last_event_before = datetime.now() - timedelta(days=older_than_days)
+
+    # init api client, the bulk writer is closed on errors too, so the buffered events are saved
+    with BulkWriter(refresh=refresh) as bulk_writer:
+        api_client: MeetupApiClient = MeetupApiClient(
+            transport=HttpTransport(pool_maxsize=max(workers, 10)), bulk_writer=bulk_writer
+        )
 
-    # init api client
-    api_client: MeetupApiClient = MeetupApiClient()
+        # update all groups, streamed from elasticsearch
+        crawler: Crawler = Crawler(workers=workers)
+        for _ in crawler.run(
+            tasks=Group.get_all_groups(last_event_before=last_event_before),
+            crawl=api_client.update_all_group_events,
+        ):
+            pass
 
-    # update all groups
-    for group in groups:
-        api_client.update_all_group_events(group=group)
+    # invalidate the cached search results of the rest api
+    IndexGeneration.bump()
@@ -0,0 +1,584 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+import aiohttp
+
+from meetup_search.meetup_api_client.crawler import SeenSet
+from meetup_search.meetup_api_client.json_parser import (
+    get_event_from_response, get_group_from_response)
+from meetup_search.meetup_api_client.meetup_api_client import (MeetupApiClient,
+                                                               RateLimit)
+from meetup_search.meetup_api_client.token_manager import TokenManager
+from meetup_search.models.bulk_writer import BulkWriter
+from meetup_search.models.group import Event, Group
+from meetup_search.models.token import Token
+
+from .exceptions import (EventAlreadyExists, GroupDoesNotExistsOnMeetup,
+                         HttpNoSuccess, HttpNotAccessibleError,
+                         HttpNotFoundError, HttpNoXRateLimitHeader,
+                         InvalidResponse, MeetupConnectionError)
+
+Result = TypeVar("Result")
+
+
+class AsyncRateLimit(RateLimit):
+    """
+    meetup api rate limit of a single event loop, the bucket is only changed by the coroutines
+    of the loop, so the thread condition is never taken & can't block the loop
+    """
+
+    def try_acquire(self) -> float:
+        return self._try_acquire()
+
+    async def wait_for_next_request(self):  # type: ignore
+        """
+        wait for next request without blocking the event loop, if needed & take a request from
+        the bucket
+        """
+        while True:
+            wait_time: float = self._try_acquire()
+            if wait_time <= 0:
+                return
+
+            await asyncio.sleep(wait_time)
+
+    def request_done(self):
+        self._request_done()
+
+    def update_rate_limit(self, response, reset_time: int):
+        self._update_rate_limit(response, reset_time)
+
+
+class AsyncMeetupApiClient:
+    """
+    asyncio meetup api client with the same surface as MeetupApiClient, all requests run over a
+    pooled aiohttp session with a bounded amount of concurrent requests
+
+    Usage:
+        async with AsyncMeetupApiClient(max_concurrency=10) as api_client:
+            group: Group = await api_client.get_group("Meetup-API-Testing")
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        limit_per_host: int = 10,
+        timeout: float = 30,
+        bulk_writer: Optional[BulkWriter] = None,
+        refresh: str = "false",
+    ):
+        """
+        set rate limits & meetup api url
+
+        Keyword Arguments:
+            max_concurrency {int} -- max concurrent requests of this client (default: {10})
+            limit_per_host {int} -- max open connections per host (default: {10})
+            timeout {float} -- total timeout per request in secounds (default: {30})
+            bulk_writer {Optional[BulkWriter]} -- buffer every group save into bulk requests, save
+                                                  every group directly when None (default: {None})
+            refresh {str} -- refresh param for direct group saves, ignored when there is a
+                             bulk_writer (default: {"false"})
+        """
+        self.rate_limit: AsyncRateLimit = AsyncRateLimit()
+
+        # meetup apir url
+        self.base_url: str = "https://api.meetup.com/"
+
+        self.max_concurrency: int = max_concurrency
+        self.limit_per_host: int = limit_per_host
+        self.timeout: float = timeout
+
+        self.bulk_writer: Optional[BulkWriter] = bulk_writer
+        self.refresh: str = refresh
+
+        # keep the oauth token in memory & refresh it only before it expires
+        self.token_manager: TokenManager = TokenManager(
+            token=Token.get_token(), post_url=MeetupApiClient.TOKEN_URL
+        )
+
+        # created inside the running event loop
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> AsyncMeetupApiClient:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        close all open connections of the pool
+        """
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        get the pooled http session, create it on the first request
+
+        Returns:
+            aiohttp.ClientSession -- pooled http session
+        """
+        if not self.session:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_concurrency, limit_per_host=self.limit_per_host
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+        return self.session
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        """
+        get the semaphore which bound the concurrent requests, create it on the first request
+
+        Returns:
+            asyncio.Semaphore -- request semaphore
+        """
+        if not self.semaphore:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self.semaphore
+
+    @staticmethod
+    async def run_blocking(function: Callable[..., Result], *args) -> Result:
+        """
+        run a blocking function like an elasticsearch request in the default executor
+
+        Arguments:
+            function {Callable[..., Result]} -- blocking function
+
+        Returns:
+            Result -- function result
+        """
+        return await asyncio.get_event_loop().run_in_executor(None, function, *args)
+
+    async def wait_for_next_request(self):
+        """
+        wait for next request without blocking the event loop, if needed
+        """
+        await self.rate_limit.wait_for_next_request()
+
+    async def get(
+        self, url_path: str, retry: int = 0, max_retry=3, reset_time: int = 60
+    ) -> dict:
+        """
+        meetup http request on the url_path
+
+        Arguments:
+            url_path {str} -- url path without domain example for url
+                              https://api.meetup.com/find/groups is the url_path find/groups
+
+        Keyword Arguments:
+            retry {int} -- how many times try to get the same url (default: {0})
+            max_retry {int} -- max retries bevor raise an error (default: {3})
+            reset_time {int} -- wait time in secounds (default: {60})
+
+        Raises:
+            HttpNotFoundError: When get a 404 or 400 Error on the Meetup API
+            HttpNotAccessibleError: When get a 410 (gone) Error on the Meetup API
+            HttpNoSuccess: When get a HTTP Error (every error without 400, 404 & 410) or a
+                           connection error on the Meetup API
+            HttpNoXRateLimitHeader: Raise when HTTP response has no XRateLimitHeader
+
+        Returns:
+            dict -- json as python dict
+        """
+        session: aiohttp.ClientSession = self.get_session()
+
+        # refresh the token in the executor, because the refresh request is blocking & the token
+        # manager lock is only taken in the executor, so a refresh can't block the event loop
+        token: Optional[Token] = self.token_manager.token
+        auth_headers: dict = {}
+        if token and token.is_expired(margin=self.token_manager.refresh_margin):
+            auth_headers = await self.run_blocking(self.token_manager.get_auth_headers)
+        elif token:
+            auth_headers = {"Authorization": "Bearer {}".format(token.access_token)}
+
+        url: str = "{}{}".format(self.base_url, url_path)
+
+        request_error: Optional[Exception] = None
+        status: int = 0
+        json_response: dict = {}
+
+        await self.wait_for_next_request()
+        try:
+            async with self.get_semaphore():
+                async with session.get(url, headers=auth_headers) as response:
+                    status = response.status
+
+                    if status == 200:
+                        # aiohttp response has the same headers interface
+                        self.rate_limit.update_rate_limit(response, reset_time)  # type: ignore
+                        json_response = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            request_error = HttpNoSuccess("Could not connect to {}!".format(url))
+        except HttpNoXRateLimitHeader:
+            request_error = HttpNoXRateLimitHeader("There is no XRateLimit Header!")
+        finally:
+            self.rate_limit.request_done()
+
+        if request_error:
+            if retry >= max_retry:
+                raise request_error
+            return await self.get(
+                url_path=url_path,
+                retry=retry + 1,
+                max_retry=max_retry,
+                reset_time=reset_time,
+            )
+
+        # access_token was rejected -> refresh it & try again
+        if status == 401 and self.token_manager.token:
+            if retry >= max_retry:
+                raise HttpNoSuccess("Meetup rejected the auth token for {}!".format(url))
+            await self.run_blocking(
+                self.token_manager.refresh, auth_headers["Authorization"].split(" ")[-1]
+            )
+            return await self.get(
+                url_path=url_path,
+                retry=retry + 1,
+                max_retry=max_retry,
+                reset_time=reset_time,
+            )
+
+        if status == 404:
+            raise HttpNotFoundError
+        if status == 410:
+            raise HttpNotAccessibleError
+        if status != 200:
+            if retry >= max_retry:
+                raise HttpNoSuccess
+            return await self.get(
+                url_path=url_path,
+                retry=retry + 1,
+                max_retry=max_retry,
+                reset_time=reset_time,
+            )
+
+        return json_response
+
+    def save_events(self, group: Group, events: List[Event]):
+        """
+        save new events & the event statistics of the group into elasticsearch, over the
+        bulk_writer if there is one, else with a single bulk request, this is blocking so
+        run it with run_blocking
+
+        Arguments:
+            group {Group} -- group of the events
+            events {List[Event]} -- events to save
+        """
+        if self.bulk_writer:
+            MeetupApiClient.write_events(
+                bulk_writer=self.bulk_writer, group=group, events=events
+            )
+            return
+
+        with BulkWriter(refresh=self.refresh) as bulk_writer:
+            MeetupApiClient.write_events(
+                bulk_writer=bulk_writer, group=group, events=events
+            )
+
+    def parse_and_save_group(self, response: dict) -> Group:
+        """
+        parse a group from a meetup response & write it with a single upsert, the stored event
+        statistics are loaded into the group, this is blocking so run it with run_blocking
+
+        Arguments:
+            response {dict} -- meetup group response
+
+        Returns:
+            Group -- saved group
+        """
+        group: Group = get_group_from_response(response=response)
+        if self.bulk_writer:
+            group.upsert(refresh="false")
+            self.bulk_writer.add_index(group.meta.index)
+        else:
+            group.upsert(refresh=self.refresh)
+        return group
+
+    async def get_group(self, group_urlname: str) -> Group:
+        """
+        get or create a Group based on the group_urlname and fill / update the object from meetup
+        rest api
+
+        Arguments:
+            group_urlname {str} -- Meetup group the urlname as string
+
+        Raises:
+            GroupDoesNotExistsOnMeetup: Group does not exists on Meetup.com
+            MeetupConnectionError: Some network error to meetup.com
+
+        Returns:
+            Group -- Group based on the group_urlname
+        """
+        try:
+            response: dict = await self.get("{}".format(group_urlname))
+        except (HttpNotAccessibleError, HttpNotFoundError):
+            # delete group if exists
+            await self.run_blocking(Group.delete_if_exists, group_urlname)
+            raise GroupDoesNotExistsOnMeetup(
+                "{} group does not exists on meetup.com!".format(group_urlname)
+            )
+
+        except (HttpNoXRateLimitHeader):
+            raise MeetupConnectionError(
+                "Could not connect to meetup -> Rate Limits reached for {}!".format(
+                    group_urlname
+                )
+            )
+        except (HttpNoSuccess):
+            raise MeetupConnectionError(
+                "Could not connect to meetup -> network problems for {}".format(
+                    group_urlname
+                )
+            )
+
+        return await self.run_blocking(self.parse_and_save_group, response)
+
+    async def update_all_group_events(
+        self, group: Group, max_entries_per_page: int = 200
+    ) -> List[Event]:
+        """
+        get all past events from meetup rest api & add them to the group, only the new events of
+        every page & the event statistics of the group are saved
+
+        Arguments:
+            group {Group} -- Group to update
+
+        Keyword Arguments:
+            max_entries_per_page {int} -- How many events should be requestst at once on meetup
+            (between 1 to 200) (default: {200})
+
+        Returns:
+            List[Event] -- List[Event] every new Events wich wasn't already in elasticsearch
+        """
+
+        # return [Event], init empty
+        events: List[Event] = []
+
+        # fetch all events
+        while True:
+            group_events: List[Event] = await self.update_group_events(
+                group=group, max_entries=max_entries_per_page
+            )
+            if len(group_events) == 0:
+                break
+
+            # adding the events load the stored event ids from elasticsearch on the first page
+            await self.run_blocking(group.add_events, group_events)
+            await self.run_blocking(self.save_events, group, group_events)
+            events.extend(group_events)
+
+        return events
+
+    async def update_group_events(
+        self, group: Group, max_entries: int = 200
+    ) -> List[Event]:
+        """
+        get new past events from meetup rest api
+
+        Arguments:
+            group {Group} -- Group to update
+
+        Keyword Arguments:
+            max_entries {int} -- how much events get from the meetup rest api per request
+                                 (default 200, min 1, max 200)
+
+        Returns:
+            List[Event] -- new Events wich are not the database from the request
+        """
+
+        # get last event time from group
+        last_event_time: Optional[datetime] = group.last_event_time
+
+        # return [Event], init empty
+        events: List[Event] = []
+
+        # when there is a last_event_time
+        # -> set on meetup that only events fetch wich are no ealier than this event
+        try:
+            response: dict = {}
+            if last_event_time:
+                response = await self.get(
+                    "{}/events?status=past&no_earlier_than={}&page={}".format(
+                        group.urlname,
+                        last_event_time.strftime("%Y-%m-%d"),
+                        MeetupApiClient.get_max_entries(max_entries=max_entries),
+                    )
+                )
+            else:
+                response = await self.get(
+                    "{}/events?status=past&page={}".format(
+                        group.urlname,
+                        MeetupApiClient.get_max_entries(max_entries=max_entries),
+                    )
+                )
+        except (
+            HttpNotFoundError,
+            HttpNotAccessibleError,
+            HttpNoSuccess,
+            HttpNoXRateLimitHeader,
+        ) as e:
+            print(e)
+            return events
+
+        return await self.run_blocking(self.parse_events, group, response)
+
+    @staticmethod
+    def parse_events(group: Group, response: list) -> List[Event]:
+        """
+        parse the new events of a meetup events response, the stored event ids of the group are
+        loaded from elasticsearch to skip the existing events, this is blocking so run it with
+        run_blocking
+
+        Arguments:
+            group {Group} -- group of the events
+            response {list} -- meetup events response
+
+        Returns:
+            List[Event] -- new Events wich are not the database from the response
+        """
+        events: List[Event] = []
+
+        # go through every event from response and at them to the database
+        for event_response in response:
+            try:
+                event: Event = get_event_from_response(
+                    response=event_response, group=group
+                )
+                events.append(event)
+            except (EventAlreadyExists, InvalidResponse):
+                pass
+
+        return events
+
+    async def get_pages(
+        self,
+        get_url_path: Callable[[int], str],
+        max_entries: int,
+        parse_page: Callable[[list], Awaitable[None]],
+    ):
+        """
+        request all pages of a paginated meetup endpoint, the next page is prefetched while the
+        current page is parsed
+
+        Arguments:
+            get_url_path {Callable[[int], str]} -- create the url path for a page offset
+            max_entries {int} -- entries per page, a page with less entries is the last page
+            parse_page {Callable[[list], Awaitable[None]]} -- parse a page response
+        """
+        offset: int = 0
+        next_page: Optional[asyncio.Future] = asyncio.ensure_future(
+            self.get(get_url_path(offset))
+        )
+
+        while next_page:
+            response: list = await next_page
+            offset = offset + 1
+
+            # prefetch the next page, when the current page is full
+            next_page = None
+            if len(response) >= max_entries:
+                next_page = asyncio.ensure_future(self.get(get_url_path(offset)))
+
+            try:
+                await parse_page(response)
+            except Exception:
+                if next_page:
+                    next_page.cancel()
+                raise
+
+    async def get_zip_from_meetup(
+        self, lat: float, lon: float, max_entries: int = 500
+    ) -> List[str]:
+        """
+        get all meetup zips from location [lat, lon]
+
+        Arguments:
+            lat {float} -- geo lat for getting zip code
+            lon {float} -- geo lon for getting zip code
+
+        Keyword Arguments:
+            max_entries -- how much events get from the meetup rest api per request
+                           (default 500, min 1, max 500)
+
+        Returns:
+            List[str] -- list of meetup zips
+        """
+        zip_code_list: List[str] = []
+
+        max_entries = MeetupApiClient.get_max_entries(max_entries=max_entries)
+
+        async def parse_page(response: list):
+            for location in response:
+                if "zip" in location:
+                    zip_code_list.append(location["zip"])
+
+        await self.get_pages(
+            get_url_path=lambda offset: "find/locations?page={0!s}&lat={1:.3f}&lon={2:.3f}"
+            "&only=zip&offset={3:.0f}".format(max_entries, lat, lon, offset),
+            max_entries=max_entries,
+            parse_page=parse_page,
+        )
+
+        return zip_code_list
+
+    async def search_new_groups(
+        self,
+        zip_code: str,
+        country_code: str,
+        max_entries: int = 500,
+        seen_groups: Optional[SeenSet] = None,
+    ) -> List[Group]:
+        """
+        Search on meetup.com for new groups, based on meetup zip location and save the groups into
+        elasticsearch
+
+        Arguments:
+            zip_code {float} -- meetup zip location
+            country_code {str} -- get only groups for this country (default DE)
+
+        Keyword Arguments:
+            max_entries {int}-- how much events get from the meetup rest api per request
+                                (default 500, min 1, max 500)
+            seen_groups {Optional[SeenSet]} -- group ids wich was already found in this run, these
+                                               groups are skipped without parsing & saving them
+                                               (default: {None})
+
+        Returns:
+            List[Group] -- Get all groups of the zip location, without the skipped groups
+        """
+
+        groups: List[Group] = []
+
+        max_entries = MeetupApiClient.get_max_entries(max_entries=max_entries)
+
+        async def parse_page(response: list):
+            for group_response in response:
+                if "urlname" not in group_response:
+                    continue
+                if seen_groups is not None and not seen_groups.add(
+                    Group.get_id(urlname=group_response["urlname"])
+                ):
+                    continue
+
+                group: Group = await self.run_blocking(self.parse_and_save_group, group_response)
+                groups.append(group)
+                print(group.urlname)
+
+        await self.get_pages(
+            get_url_path=lambda offset: "find/groups?page={0!s}&radius=100&offset={1:.0f}"
+            "&zip={2}&country={3}".format(max_entries, offset, zip_code, country_code),
+            max_entries=max_entries,
+            parse_page=parse_page,
+        )
+
+        return groups
@@ -0,0 +1,116 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, Hashable, Iterable, Iterator, Set, TypeVar
+
+Task = TypeVar("Task")
+Result = TypeVar("Result")
+
+
+class Crawler:
+    """
+    run a crawl function for every task on a pool of worker threads, all workers should share the
+    same MeetupApiClient so they share its rate limit, token & connection pool
+
+    Usage:
+        crawler: Crawler = Crawler(workers=4)
+
+        for group in crawler.run(tasks=urlnames, crawl=api_client.get_group):
+            print(group.name)
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 0):
+        """
+        init crawler
+
+        Keyword Arguments:
+            workers {int} -- amount of worker threads, 1 crawl in the calling thread (default: {1})
+            max_pending {int} -- max tasks which are taken from the task iterable but not done yet,
+                                 0 -> 2 * workers (default: {0})
+        """
+        if workers < 1:
+            raise ValueError("workers has to be equal or greater than 1!")
+
+        self.workers: int = workers
+        self.max_pending: int = max_pending if max_pending > 0 else 2 * workers
+
+    def run(
+        self, tasks: Iterable[Task], crawl: Callable[[Task], Result]
+    ) -> Iterator[Result]:
+        """
+        crawl every task & yield the results in the order they are done, tasks are taken lazy from
+        the iterable, so it can be a generator over a large index
+
+        Arguments:
+            tasks {Iterable[Task]} -- tasks to crawl
+            crawl {Callable[[Task], Result]} -- crawl function, called once for every task
+
+        Returns:
+            Iterator[Result] -- crawl results
+        """
+        if self.workers == 1:
+            for task in tasks:
+                yield crawl(task)
+            return
+
+        task_iterator: Iterator[Task] = iter(tasks)
+        pending: Set[Future] = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                # fill up the pending tasks
+                for task in task_iterator:
+                    pending.add(executor.submit(crawl, task))
+                    if len(pending) >= self.max_pending:
+                        break
+
+                if len(pending) == 0:
+                    return
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+
+class SeenSet:
+    """
+    thread safe set of the keys seen in a crawl run, so tasks wich are found mutiple times like
+    groups of neighboring zips are crawled only once, the skipped duplicates are counted
+
+    Usage:
+        seen_groups: SeenSet = SeenSet()
+
+        if seen_groups.add(group_id):
+            crawl(group_id)
+    """
+
+    def __init__(self):
+        """
+        init empty seen set
+        """
+        self.keys: Set[Hashable] = set()
+        self.duplicates: int = 0
+        self.lock: Lock = Lock()
+
+    def add(self, key: Hashable) -> bool:
+        """
+        add a key to the seen set
+
+        Arguments:
+            key {Hashable} -- key of a task
+
+        Returns:
+            bool -- True when the key is new, False when the key was already seen
+        """
+        with self.lock:
+            if key in self.keys:
+                self.duplicates = self.duplicates + 1
+                return False
+            self.keys.add(key)
+            return True
+
+    def __len__(self) -> int:
+        """
+        Returns:
+            int -- amount of seen keys
+        """
+        return len(self.keys)
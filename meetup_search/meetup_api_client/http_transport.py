@@ -0,0 +1,90 @@
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+
+
+class HttpTransport:
+    """
+    pooled keep-alive http transport for the meetup api, every request to the same host reuse an
+    open connection instead of doing a new TCP & TLS handshake
+
+    Usage:
+        transport: HttpTransport = HttpTransport(pool_maxsize=20)
+        api_client: MeetupApiClient = MeetupApiClient(transport=transport)
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = True,
+        keep_alive: bool = True,
+        max_retries: int = 0,
+        timeout: Union[float, Tuple[float, float]] = (5, 30),
+    ):
+        """
+        create a requests session with a mounted connection pool
+
+        Keyword Arguments:
+            pool_connections {int} -- number of hosts with a cached connection pool (default: {10})
+            pool_maxsize {int} -- max open connections per host (default: {10})
+            pool_block {bool} -- block when all connections of a host are in use, instead of
+                                 opening an extra connection (default: {True})
+            keep_alive {bool} -- keep connections open between requests (default: {True})
+            max_retries {int} -- retries on connection errors, done by urllib3 (default: {0})
+            timeout {Union[float, Tuple[float, float]]} -- connect & read timeout in secounds
+                                                           (default: {(5, 30)})
+        """
+        self.timeout: Union[float, Tuple[float, float]] = timeout
+
+        self.session: requests.Session = requests.Session()
+
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=max_retries,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def get(self, url: str, headers: Optional[dict] = None) -> Response:
+        """
+        http GET request over the connection pool
+
+        Arguments:
+            url {str} -- full request url
+
+        Keyword Arguments:
+            headers {Optional[dict]} -- additional request headers (default: {None})
+
+        Returns:
+            Response -- http response
+        """
+        return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def post(self, url: str, data: Optional[dict] = None) -> Response:
+        """
+        http POST request over the connection pool
+
+        Arguments:
+            url {str} -- full request url
+
+        Keyword Arguments:
+            data {Optional[dict]} -- form data (default: {None})
+
+        Returns:
+            Response -- http response
+        """
+        return self.session.post(url, data=data, timeout=self.timeout)
+
+    def close(self):
+        """
+        close all open connections of the pool
+        """
+        self.session.close()
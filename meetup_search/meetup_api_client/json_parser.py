@@ -86,18 +86,18 @@ def get_group_from_response(response: dict) -> Group:
         response {dict} -- meetup api response in a dict
 
     Returns:
-        Group -- get or create Group based on urlname
+        Group -- new unsaved Group, only with the fields from the response, write it with
+                 group.upsert() to keep the stored events & event statistics
     """
 
-    group = Group.get_or_create_by_urlname(
+    group: Group = Group(
         urlname=response["urlname"],
         meetup_id=response["id"],
         created=datetime.fromtimestamp(response["created"] / 1000),
         description=response["description"],
         name=response["name"],
         link=response["link"],
-        lat=response["lat"],
-        lon=response["lon"],
+        location={"lat": response["lat"], "lon": response["lon"]},
         members=response["members"],
         status=response["status"],
         timezone=response["timezone"],
@@ -165,7 +165,6 @@ def get_group_from_response(response: dict) -> Group:
     if "who" in response:
         group.who = response["who"]
 
-    group.save()
     return group
 
 
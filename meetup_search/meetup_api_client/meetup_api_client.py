@@ -1,13 +1,18 @@
 import time
 from datetime import datetime
-from time import sleep
+from threading import Condition
 from typing import List, Optional
 
-import requests
+from requests.exceptions import RequestException
 from requests.models import Response
 
+from meetup_search.meetup_api_client.crawler import SeenSet
+from meetup_search.meetup_api_client.http_transport import HttpTransport
 from meetup_search.meetup_api_client.json_parser import (
     get_event_from_response, get_group_from_response)
+from meetup_search.meetup_api_client.token_manager import TokenManager
+from meetup_search.meetup_api_client.zip_sampler import ZipSampler
+from meetup_search.models.bulk_writer import BulkWriter
 from meetup_search.models.group import Event, Group
 from meetup_search.models.token import Token
 
@@ -19,7 +24,10 @@ from .exceptions import (EventAlreadyExists, GroupDoesNotExistsOnMeetup,
 
 class RateLimit:
     """
-    meetup api rate limit, wait for new request if needed
+    meetup api rate limit as token bucket shared by every worker, wait for new request if needed
+
+    The bucket is filled by the X-RateLimit headers of the meetup responses & waiting workers wake
+    up exactly when the rate limit window resets.
 
     Raises:
         HttpNoXRateLimitHeader: Raise when HTTP response has no XRateLimitHeader
@@ -42,21 +50,89 @@ class RateLimit:
         # unixtime when limits will be reseted
         self.reset_time: float = time.time()
 
-    def wait_for_next_request(self):
+        # requests which are send but got no response yet
+        self.in_flight: int = 0
+
+        # guard the bucket & wake up waiting workers
+        self.condition: Condition = Condition()
+
+    def try_acquire(self) -> float:
         """
-        wait for next request, if needed
+        take a request from the bucket without waiting
+
+        Returns:
+            float -- 0 when a request was taken, else the secounds until the window resets
         """
-        if not self.reset_time:
-            return
+        with self.condition:
+            return self._try_acquire()
 
+    def _try_acquire(self) -> float:
+        """
+        take a request from the bucket without waiting, the caller must hold the condition
+
+        Returns:
+            float -- 0 when a request was taken, else the secounds until the window resets
+        """
         if self.remaining < 1:
-            while self.reset_time > time.time():
-                time.sleep(1)
+            wait_time: float = self.reset_time - time.time()
+            if wait_time > 0:
+                return wait_time
+
+            # window was reset -> refill the bucket, when the limit is not known yet let the
+            # request pass
+            self.remaining = max(self.limit, 1)
+
+        self.remaining = self.remaining - 1
+        self.in_flight = self.in_flight + 1
+        return 0
+
+    def wait_for_next_request(self):
+        """
+        wait for next request, if needed & take a request from the bucket
+        """
+        with self.condition:
+            while True:
+                wait_time: float = self.try_acquire()
+                if wait_time <= 0:
+                    return
+
+                self.condition.wait(timeout=wait_time)
+
+    def request_done(self):
+        """
+        mark a request, taken by wait_for_next_request, as done
+        """
+        with self.condition:
+            self._request_done()
+
+    def _request_done(self):
+        """
+        mark a request as done, the caller must hold the condition
+        """
+        self.in_flight = max(self.in_flight - 1, 0)
 
     def update_rate_limit(self, response: Response, reset_time: int):
         """
         Update rate limit information from response header
 
+        Arguments:
+            response {Response} -- http response
+            reset_time {int} -- wait time in secounds
+
+        Raises:
+            HttpNoXRateLimitHeader: Raise when HTTP response has no XRateLimitHeader
+        """
+        with self.condition:
+            try:
+                self._update_rate_limit(response, reset_time)
+            finally:
+                # wake up the waiting workers to recheck the bucket
+                self.condition.notify_all()
+
+    def _update_rate_limit(self, response: Response, reset_time: int):
+        """
+        Update rate limit information from response header, the caller must hold the condition
+
         Arguments:
             response {Response} -- http response
             reset_time {int} -- wait time in secounds
@@ -69,13 +145,16 @@ class RateLimit:
         self.reset = int(response.headers.get("X-RateLimit-Reset", -1))
         self.reset_time = time.time() + self.reset
 
-        if self.limit < 0 or self.remaining < 0 or self.reset_time < 0:
+        if self.limit < 0 or self.remaining < 0 or self.reset < 0:
             self.limit = 0
             self.remaining = 0
             self.reset = reset_time
             self.reset_time = time.time() + self.reset
             raise HttpNoXRateLimitHeader("There is no XRateLimit Header!")
 
+        # the other requests in flight are not counted in the header yet
+        self.remaining = max(self.remaining - max(self.in_flight - 1, 0), 0)
+
 
 class MeetupApiClient:
     """
@@ -85,24 +164,41 @@ class MeetupApiClient:
     AUTHORIZATION_BASE_URL = 'https://secure.meetup.com/oauth2/authorize'
     TOKEN_URL = 'https://secure.meetup.com/oauth2/access'
 
-    def __init__(self):
+    def __init__(
+        self,
+        transport: Optional[HttpTransport] = None,
+        bulk_writer: Optional[BulkWriter] = None,
+        refresh: str = "false",
+    ):
         """
         set rate limits & meetup api url
+
+        Keyword Arguments:
+            transport {Optional[HttpTransport]} -- pooled http transport for every meetup request,
+                                                   create a default one when None
+                                                   (default: {None})
+            bulk_writer {Optional[BulkWriter]} -- buffer every group save into bulk requests, save
+                                                  every group directly when None (default: {None})
+            refresh {str} -- refresh param for direct group saves, ignored when there is a
+                             bulk_writer (default: {"false"})
         """
+        self.bulk_writer: Optional[BulkWriter] = bulk_writer
+        self.refresh: str = refresh
+
         self.rate_limit = RateLimit()
 
+        # shared connection pool for every request of this client
+        self.transport: HttpTransport = transport if transport else HttpTransport()
+
         # meetup apir url
         self.base_url: str = "https://api.meetup.com/"
 
-        self.token: Optional[Token] = Token.get_token()
-
-        # create auth header with cookie & csrf_token
-        if self.token:
-            self.auth_headers = {"Authorization": "Bearer {}".format(
-                self.token.access_token
-            )}
-        else:
-            self.auth_headers = {}
+        # keep the oauth token in memory & refresh it only before it expires
+        self.token_manager: TokenManager = TokenManager(
+            token=Token.get_token(),
+            session=self.transport.session,
+            post_url=self.TOKEN_URL,
+        )
 
     def get(
         self, url_path: str, retry: int = 0, max_retry=3, reset_time: int = 60
@@ -122,20 +218,55 @@ class MeetupApiClient:
         Raises:
             HttpNotFoundError: When get a 404 or 400 Error on the Meetup API
             HttpNotAccessibleError: When get a 410 (gone) Error on the Meetup API
-            HttpNoSuccess: When get a HTTP Error (every error without 400, 404 & 410) on the Meetup
-                           API
+            HttpNoSuccess: When get a HTTP Error (every error without 400, 404 & 410) or a
+                           connection error on the Meetup API
             HttpNoXRateLimitHeader: Raise when HTTP response has no XRateLimitHeader
 
         Returns:
             dict -- json as python dict
         """
+        auth_headers: dict = self.token_manager.get_auth_headers()
+
+        url: str = "{}{}".format(self.base_url, url_path)
+
+        request_error: Optional[Exception] = None
+
         self.rate_limit.wait_for_next_request()
+        try:
+            response: Response = self.transport.get(url, headers=auth_headers)
 
-        if self.token:
-            self.token.get_refresh_token()
+            if response.status_code == 200:
+                self.rate_limit.update_rate_limit(response=response, reset_time=reset_time)
+        except RequestException:
+            request_error = HttpNoSuccess("Could not connect to {}!".format(url))
+        except HttpNoXRateLimitHeader:
+            request_error = HttpNoXRateLimitHeader("There is no XRateLimit Header!")
+        finally:
+            self.rate_limit.request_done()
 
-        url: str = "{}{}".format(self.base_url, url_path)
-        response: Response = requests.get(url, headers=self.auth_headers)
+        if request_error:
+            if retry >= max_retry:
+                raise request_error
+            return self.get(
+                url_path=url_path,
+                retry=retry + 1,
+                max_retry=max_retry,
+                reset_time=reset_time,
+            )
+
+        # access_token was rejected -> refresh it & try again
+        if response.status_code == 401 and self.token_manager.token:
+            if retry >= max_retry:
+                raise HttpNoSuccess("Meetup rejected the auth token for {}!".format(url))
+            self.token_manager.refresh(
+                rejected_access_token=auth_headers["Authorization"].split(" ")[-1]
+            )
+            return self.get(
+                url_path=url_path,
+                retry=retry + 1,
+                max_retry=max_retry,
+                reset_time=reset_time,
+            )
 
         if response.status_code == 404:
             raise HttpNotFoundError
@@ -144,17 +275,60 @@ class MeetupApiClient:
         if response.status_code != 200:
             if retry >= max_retry:
                 raise HttpNoSuccess
-            return self.get(url_path=url_path, retry=retry + 1)
-
-        try:
-            self.rate_limit.update_rate_limit(response=response, reset_time=reset_time)
-        except HttpNoXRateLimitHeader:
-            if retry >= max_retry:
-                raise HttpNoXRateLimitHeader("There is no XRateLimit Header!")
-            return self.get(url_path=url_path, retry=retry + 1)
+            return self.get(
+                url_path=url_path,
+                retry=retry + 1,
+                max_retry=max_retry,
+                reset_time=reset_time,
+            )
 
         return response.json()
 
+    def save_events(self, group: Group, events: List[Event]):
+        """
+        save new events & the event statistics of the group into elasticsearch, over the
+        bulk_writer if there is one, else with a single bulk request
+
+        Arguments:
+            group {Group} -- group of the events
+            events {List[Event]} -- events to save
+        """
+        if self.bulk_writer:
+            self.write_events(bulk_writer=self.bulk_writer, group=group, events=events)
+            return
+
+        with BulkWriter(refresh=self.refresh) as bulk_writer:
+            self.write_events(bulk_writer=bulk_writer, group=group, events=events)
+
+    @staticmethod
+    def write_events(bulk_writer: BulkWriter, group: Group, events: List[Event]):
+        """
+        add new events & a partial update of the group event statistics to the bulk_writer
+
+        Arguments:
+            bulk_writer {BulkWriter} -- bulk writer for the events
+            group {Group} -- group of the events
+            events {List[Event]} -- events to save
+        """
+        for event in events:
+            bulk_writer.save(event)
+        bulk_writer.update(group, fields=Group.EVENT_STATS_FIELDS)
+
+    def upsert_group(self, group: Group):
+        """
+        write the group fields with a single upsert request & load the stored event statistics
+        into the group, the upsert is always direct, so the last event time is known before the
+        events of the group are crawled
+
+        Arguments:
+            group {Group} -- group to upsert
+        """
+        if self.bulk_writer:
+            group.upsert(refresh="false")
+            self.bulk_writer.add_index(group.meta.index)
+        else:
+            group.upsert(refresh=self.refresh)
+
     def get_group(self, group_urlname: str) -> Group:
         """
         get or create a Group based on the group_urlname and fill / update the object from meetup
@@ -193,15 +367,16 @@ class MeetupApiClient:
             )
 
         group: Group = get_group_from_response(response=response)
-        group.save()
+        self.upsert_group(group)
 
         return group
 
     def update_all_group_events(
-        self, group: Group, max_entries_per_page: int = 200
+        self, group: Group, max_entries_per_page: int = 200, raise_errors: bool = False
     ) -> List[Event]:
         """
-        get all past events from meetup rest api & add it as child pages to the group
+        get all past events from meetup rest api & add them to the group, only the new events of
+        every page & the event statistics of the group are saved
 
         Arguments:
             group {Group} -- Group to update
@@ -209,6 +384,12 @@ class MeetupApiClient:
         Keyword Arguments:
             max_entries_per_page {int} -- How many events should be requestst at once on meetup
             (between 1 to 200) (default: {200})
+            raise_errors {bool} -- raise a MeetupConnectionError, when a page could not be loaded,
+                                   instead of stop loading with the loaded events
+                                   (default: {False})
+
+        Raises:
+            MeetupConnectionError: when raise_errors & a page could not be loaded
 
         Returns:
             List[Event] -- List[Event] every new Events wich wasn't already in elasticsearch
@@ -220,19 +401,20 @@ class MeetupApiClient:
         # fetch all events
         while True:
             group_events: List[Event] = self.update_group_events(
-                group=group, max_entries=max_entries_per_page
+                group=group, max_entries=max_entries_per_page, raise_errors=raise_errors
             )
-            group.add_events(events=group_events)
-            group.save()
-            # todo replace sleep with wait for save done
-            sleep(1)
-            events.extend(group_events)
             if len(group_events) == 0:
                 break
 
+            group.add_events(events=group_events)
+            self.save_events(group=group, events=group_events)
+            events.extend(group_events)
+
         return events
 
-    def update_group_events(self, group: Group, max_entries: int = 200) -> List[Event]:
+    def update_group_events(
+        self, group: Group, max_entries: int = 200, raise_errors: bool = False
+    ) -> List[Event]:
         """
         get new past events from meetup rest api & add it as child pages to the group
 
@@ -240,6 +422,8 @@ class MeetupApiClient:
         group -- GroupPage
         max_entries -- how much events get from the meetup rest api per request
                        (default 200, min 1, max 200)
+        raise_errors -- raise a MeetupConnectionError, when the events could not be loaded,
+                        instead of return no events (default False)
 
         return -> [Event] new Events wich are not the database from the request
         """
@@ -275,6 +459,10 @@ class MeetupApiClient:
             HttpNoSuccess,
             HttpNoXRateLimitHeader,
         ) as e:
+            if raise_errors:
+                raise MeetupConnectionError(
+                    "Could not load the events of {} -> {}".format(group.urlname, e)
+                )
             print(e)
             return events
 
@@ -307,6 +495,32 @@ class MeetupApiClient:
             return 500
         return max_entries
 
+    def get_zip_page_from_meetup(
+        self, lat: float, lon: float, max_entries: int = 500, offset: int = 0
+    ) -> List[str]:
+        """
+        get a single page of meetup zips from location [lat, lon], sorted by the distance
+
+        Arguments:
+            lat {float} -- geo lat for getting zip code
+            lon {float} -- geo lon for getting zip code
+
+        Keyword Arguments:
+            max_entries -- how much zips get from the meetup rest api per request
+                           (default 500, min 1, max 500)
+            offset {int} -- page offset (default: {0})
+
+        Returns:
+            List[str] -- list of meetup zips
+        """
+        response = self.get(
+            "find/locations?page={0!s}&lat={1:.3f}&lon={2:.3f}&only=zip&offset={3:.0f}".format(
+                self.get_max_entries(max_entries=max_entries), lat, lon, offset
+            )
+        )
+
+        return [location["zip"] for location in response if "zip" in location]
+
     def get_zip_from_meetup(
         self, lat: float, lon: float, max_entries: int = 500
     ) -> List[str]:
@@ -331,20 +545,15 @@ class MeetupApiClient:
         offset: int = 0
 
         while True:
-            response = self.get(
-                "find/locations?page={0!s}&lat={1:.3f}&lon={2:.3f}&only=zip&offset={3:.0f}".format(
-                    max_entries, lat, lon, offset
-                )
+            zip_page: List[str] = self.get_zip_page_from_meetup(
+                lat=lat, lon=lon, max_entries=max_entries, offset=offset
             )
-
-            for location in response:
-                if "zip" in location:
-                    zip_code_list.append(location["zip"])
+            zip_code_list = zip_code_list + zip_page
 
             offset = offset + 1
 
             # break loop with got all zip of the location [lat, lon]
-            if len(zip_code_list) < offset * max_entries:
+            if len(zip_page) < max_entries:
                 return zip_code_list
 
     def get_all_zip_from_meetup(
@@ -354,9 +563,11 @@ class MeetupApiClient:
         min_lon: float,
         max_lon: float,
         max_entries: int = 500,
+        max_requests: int = 1000,
     ) -> List[str]:
         """
-        Get all Meetup Zips from a boundingbox, to get a boundingbox use nominatim
+        Get all Meetup Zips from a boundingbox, to get a boundingbox use nominatim. The boundingbox
+        is sampled adaptive, cells are only split where meetup returns full pages of new zips.
 
         Example for germany:
         https://nominatim.openstreetmap.org/search/germany?format=json
@@ -370,30 +581,36 @@ class MeetupApiClient:
         Keyword Arguments:
             max_entries -- how much events get from the meetup rest api per request
                            (default 500, min 1, max 200)
+            max_requests {int} -- max requests to meetup for the boundingbox (default: {1000})
 
         Returns:
-            List[str] -- list of meetup zips
+            List[str] -- list of unique meetup zips
         """
-        zip_code_list: List[str] = []
-
-        for lat in range(int(min_lat * 10), int(max_lat * 10), 5):
-            for lon in range(int(min_lon * 10), int(max_lon * 10), 5):
-                location_zip_code_list = self.get_zip_from_meetup(
-                    lat=float(lat / 10), lon=float(lon / 10), max_entries=max_entries
-                )
-
-                print(
-                    "Got {0:4.0f} Meetup Zips from Lat {1:2.1f} Lon {2:2.1f}".format(
-                        len(location_zip_code_list), float(lat / 10), float(lon / 10)
-                    )
-                )
+        max_entries = self.get_max_entries(max_entries=max_entries)
 
-                zip_code_list = zip_code_list + location_zip_code_list
+        sampler: ZipSampler = ZipSampler(
+            get_zip_page=lambda lat, lon, offset: self.get_zip_page_from_meetup(
+                lat=lat, lon=lon, max_entries=max_entries, offset=offset
+            ),
+            max_entries=max_entries,
+            max_requests=max_requests,
+        )
+        zip_code_list: List[str] = sampler.run(
+            min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon
+        )
+
+        print(
+            "Got {} Meetup Zips with {} requests".format(len(zip_code_list), sampler.requests)
+        )
 
         return zip_code_list
 
     def search_new_groups(
-        self, zip_code: str, country_code: str, max_entries: int = 500
+        self,
+        zip_code: str,
+        country_code: str,
+        max_entries: int = 500,
+        seen_groups: Optional[SeenSet] = None,
     ) -> List[Group]:
         """
         Search on meetup.com for new groups, based on meetup zip location and save the groups into
@@ -406,9 +623,12 @@ class MeetupApiClient:
         Keyword Arguments:
             max_entries {int}-- how much events get from the meetup rest api per request
                                 (default 500, min 1, max 500)
+            seen_groups {Optional[SeenSet]} -- group ids wich was already found in this run, these
+                                               groups are skipped without parsing & saving them
+                                               (default: {None})
 
         Returns:
-            List[Group] -- Get all groups of the zip location
+            List[Group] -- Get all groups of the zip location, without the skipped groups
         """
 
         groups: List[Group] = []
@@ -425,12 +645,19 @@ class MeetupApiClient:
             )
 
             for group_response in response:
-                if "urlname" in group_response:
-                    group: Group = get_group_from_response(response=group_response)
-                    groups.append(group)
-                    print(group.urlname)
+                if "urlname" not in group_response:
+                    continue
+                if seen_groups is not None and not seen_groups.add(
+                    Group.get_id(urlname=group_response["urlname"])
+                ):
+                    continue
+
+                group: Group = get_group_from_response(response=group_response)
+                self.upsert_group(group)
+                groups.append(group)
+                print(group.urlname)
 
             offset = offset + 1
 
-            if len(groups) < offset * max_entries:
+            if len(response) < max_entries:
                 return groups
@@ -0,0 +1,94 @@
+from threading import Lock
+from typing import Optional
+
+import requests
+
+from meetup_search.models.token import Token
+
+
+class TokenManager:
+    """
+    keep the meetup oauth token in memory and refresh it only shortly before it expires or after
+    meetup rejected the access_token
+
+    Usage:
+        token_manager: TokenManager = TokenManager(token=Token.get_token())
+
+        headers: dict = token_manager.get_auth_headers()
+    """
+
+    def __init__(
+        self,
+        token: Optional[Token],
+        session: Optional[requests.Session] = None,
+        refresh_margin: int = 60,
+        post_url: str = "https://secure.meetup.com/oauth2/access",
+    ):
+        """
+        init token manager
+
+        Arguments:
+            token {Optional[Token]} -- oauth token, without a token every request is unauthorized
+
+        Keyword Arguments:
+            session {Optional[requests.Session]} -- http session for the refresh requests
+                                                    (default: {None})
+            refresh_margin {int} -- refresh the token this many secounds before it expires
+                                    (default: {60})
+            post_url {str} -- meetup oauth token url
+                              (default: {"https://secure.meetup.com/oauth2/access"})
+        """
+        self.token: Optional[Token] = token
+        self.session: Optional[requests.Session] = session
+        self.refresh_margin: int = refresh_margin
+        self.post_url: str = post_url
+
+        # how many times the token was refreshed
+        self.refresh_count: int = 0
+
+        # only one worker at a time may refresh the token
+        self.lock: Lock = Lock()
+
+    def get_auth_headers(self) -> dict:
+        """
+        get the authorization header, refresh the token first if it will expire soon
+
+        Returns:
+            dict -- authorization header, empty when there is no token
+        """
+        if not self.token:
+            return {}
+
+        with self.lock:
+            if self.token.is_expired(margin=self.refresh_margin):
+                self._refresh(token=self.token)
+
+            return {"Authorization": "Bearer {}".format(self.token.access_token)}
+
+    def refresh(self, rejected_access_token: Optional[str] = None):
+        """
+        refresh the token after meetup rejected it (HTTP 401), skip the refresh when another worker
+        already refreshed the rejected access_token
+
+        Keyword Arguments:
+            rejected_access_token {Optional[str]} -- access_token which was rejected
+                                                     (default: {None})
+        """
+        if not self.token:
+            return
+
+        with self.lock:
+            if rejected_access_token and rejected_access_token != self.token.access_token:
+                return
+
+            self._refresh(token=self.token)
+
+    def _refresh(self, token: Token):
+        """
+        refresh the token, the caller must hold the lock
+
+        Arguments:
+            token {Token} -- token to refresh
+        """
+        token.get_refresh_token(post_url=self.post_url, session=self.session)
+        self.refresh_count = self.refresh_count + 1
@@ -0,0 +1,165 @@
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Set, Tuple
+
+
+class Cell(NamedTuple):
+    """
+    geo cell of a boundingbox, sampled at the center
+    """
+
+    min_lat: float
+    max_lat: float
+    min_lon: float
+    max_lon: float
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        """
+        Returns:
+            Tuple[float, float] -- center of the cell as [lat, lon]
+        """
+        return (self.min_lat + self.max_lat) / 2, (self.min_lon + self.max_lon) / 2
+
+    @property
+    def size(self) -> float:
+        """
+        Returns:
+            float -- longest side of the cell in degrees
+        """
+        return max(self.max_lat - self.min_lat, self.max_lon - self.min_lon)
+
+    def split(self) -> List["Cell"]:
+        """
+        split the cell into 4 quadrants
+
+        Returns:
+            List[Cell] -- quadrants of the cell
+        """
+        center_lat, center_lon = self.center
+        return [
+            Cell(self.min_lat, center_lat, self.min_lon, center_lon),
+            Cell(self.min_lat, center_lat, center_lon, self.max_lon),
+            Cell(center_lat, self.max_lat, self.min_lon, center_lon),
+            Cell(center_lat, self.max_lat, center_lon, self.max_lon),
+        ]
+
+
+class ZipSampler:
+    """
+    adaptive quadtree sampler for meetup zips in a boundingbox, instead of requesting every node
+    of a fixed grid. Every cell is sampled at the center with find/locations:
+
+    - an empty page or a page with (almost) only known zips stops the cell, like sea, empty land
+      or an area wich is already covered by the neighbor cells
+    - a full page of new zips is a dense area, so the next page of the center is requested
+    - a first page with new zips split the cell into 4 cells, until the min cell size
+
+    The quadrants are sampled breadth first, so a request budget cover the whole boundingbox
+    first & is spent on the dense areas afterwards.
+
+    The zip page is requested by a function, so the sampler can run against recorded responses.
+
+    Usage:
+        sampler: ZipSampler = ZipSampler(
+            get_zip_page=lambda lat, lon, offset: api_client.get_zip_page_from_meetup(
+                lat=lat, lon=lon, offset=offset
+            ),
+            max_entries=500,
+        )
+
+        zip_code_list: List[str] = sampler.run(
+            min_lat=47.27, max_lat=55.09, min_lon=5.86, max_lon=15.04
+        )
+    """
+
+    def __init__(
+        self,
+        get_zip_page: Callable[[float, float, int], List[str]],
+        max_entries: int,
+        max_requests: int = 1000,
+        min_cell_size: float = 0.1,
+        max_cell_size: float = 2,
+        min_new_ratio: float = 0.25,
+    ):
+        """
+        init sampler
+
+        Arguments:
+            get_zip_page {Callable[[float, float, int], List[str]]} -- get a page of zips for
+                                                                       [lat, lon, page offset]
+            max_entries {int} -- entries of a full page
+
+        Keyword Arguments:
+            max_requests {int} -- request budget of a run (default: {1000})
+            min_cell_size {float} -- cells of this size in degrees are not split anymore
+                                     (default: {0.1})
+            max_cell_size {float} -- the boundingbox is split into cells of this size in degrees
+                                     before the first request, so an empty center doesn't stop
+                                     the whole boundingbox (default: {2})
+            min_new_ratio {float} -- pages with less new zips than this part of the page stop the
+                                     cell (default: {0.25})
+        """
+        if max_requests < 1:
+            raise ValueError("max_requests has to be equal or greater than 1!")
+        if max_cell_size <= 0:
+            raise ValueError("max_cell_size has to be greater than 0!")
+
+        self.get_zip_page: Callable[[float, float, int], List[str]] = get_zip_page
+        self.max_entries: int = max_entries
+        self.max_requests: int = max_requests
+        self.min_cell_size: float = min_cell_size
+        self.max_cell_size: float = max_cell_size
+        self.min_new_ratio: float = min_new_ratio
+
+        self.requests: int = 0
+
+    def run(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> List[str]:
+        """
+        sample all zips of a boundingbox, until every cell is done or the request budget is spent
+
+        Arguments:
+            min_lat {float} -- boundingbox lat min
+            max_lat {float} -- boundingbox lat max
+            min_lon {float} -- boundingbox lon min
+            max_lon {float} -- boundingbox lon max
+
+        Returns:
+            List[str] -- unique zips in the order they was found
+        """
+        zip_code_list: List[str] = []
+        seen_zip_codes: Set[str] = set()
+
+        # split the boundingbox into the start cells
+        start_cells: List[Cell] = [Cell(min_lat, max_lat, min_lon, max_lon)]
+        while start_cells[0].size > self.max_cell_size:
+            start_cells = [child for cell in start_cells for child in cell.split()]
+
+        # cells with the page offset to request
+        cells: Deque[Tuple[Cell, int]] = deque((cell, 0) for cell in start_cells)
+
+        while cells and self.requests < self.max_requests:
+            cell, offset = cells.popleft()
+            lat, lon = cell.center
+
+            zip_page: List[str] = self.get_zip_page(lat, lon, offset)
+            self.requests = self.requests + 1
+
+            new_zip_codes: List[str] = [
+                zip_code for zip_code in zip_page if zip_code not in seen_zip_codes
+            ]
+            seen_zip_codes.update(new_zip_codes)
+            zip_code_list.extend(new_zip_codes)
+
+            # empty or already known area
+            if len(new_zip_codes) == 0 or len(new_zip_codes) < self.min_new_ratio * len(zip_page):
+                continue
+
+            # dense area -> next page of the center, before any other cell
+            if len(zip_page) >= self.max_entries:
+                cells.appendleft((cell, offset + 1))
+
+            # new area -> sample the quadrants
+            if offset == 0 and cell.size > self.min_cell_size:
+                cells.extend((child, 0) for child in cell.split())
+
+        return zip_code_list
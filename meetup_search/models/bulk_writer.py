@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from threading import Lock, RLock
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import streaming_bulk
+from elasticsearch_dsl import Document, connections
+
+# elasticsearch refresh modes ->
+# https://www.elastic.co/guide/en/elasticsearch/reference/current/docs-refresh.html
+REFRESH_MODES: Tuple[str, ...] = ("true", "wait_for", "false")
+
+# failed bulk results wich are counted as skipped, (op_type, status)
+SKIPPED_RESULTS: Tuple[Tuple[str, int], ...] = (("create", 409), ("delete", 404))
+
+
+class BulkWriter:
+    """
+    buffered elasticsearch writer, collect documents and index them with the bulk api instead of
+    a single request for every document
+
+    Elasticsearch bulk helpers doc ->
+    https://elasticsearch-py.readthedocs.io/en/master/helpers.html#bulk-helpers
+
+    Usage:
+        with BulkWriter(max_docs=500) as bulk_writer:
+            bulk_writer.save(group)
+    """
+
+    def __init__(
+        self,
+        max_docs: int = 500,
+        max_bytes: int = 5 * 1024 * 1024,
+        refresh: str = "true",
+        using: str = "default",
+    ):
+        """
+        init an empty buffer
+
+        Keyword Arguments:
+            max_docs {int} -- flush the buffer when it holds this many documents (default: {500})
+            max_bytes {int} -- flush the buffer when the documents are larger than this many bytes
+                               (default: {5 * 1024 * 1024})
+            refresh {str} -- write consistency on close (default: {"true"})
+                             "true" -> refresh all written indices once
+                             "wait_for" -> the last bulk request wait until it is searchable
+                             "false" -> no refresh, the documents get searchable on the next
+                                        periodic refresh
+            using {str} -- elasticsearch connection alias (default: {"default"})
+        """
+        self.max_docs: int = max_docs
+        self.max_bytes: int = max_bytes
+        if refresh not in REFRESH_MODES:
+            raise ValueError("refresh has to be one of {}!".format(REFRESH_MODES))
+        self.refresh: str = refresh
+        self.using: str = using
+
+        # buffered documents with their bulk action & action size, a document which is saved
+        # again before the next flush replace the older action
+        self.buffer: Dict[Hashable, Tuple[Document, dict, int]] = OrderedDict()
+        self.buffer_bytes: int = 0
+
+        # indices with written documents, for the final refresh
+        self.indices: Set[str] = set()
+
+        # amount of successful written documents
+        self.indexed: int = 0
+
+        # amount of created documents, wich already exists & deleted documents, wich not exists
+        self.skipped: int = 0
+
+        # bulk response item of every failed document
+        self.errors: List[dict] = []
+
+        # the writer can be shared by many crawl workers
+        self.lock: RLock = RLock()
+
+        # the bulk requests are send one after another in the order the buffers was taken, so an
+        # older write of a document never overwrite a newer write
+        self.flush_lock: Lock = Lock()
+
+    def __enter__(self) -> BulkWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def connection(self) -> Elasticsearch:
+        """
+        elasticsearch client of the connection alias
+
+        Returns:
+            Elasticsearch -- elasticsearch client
+        """
+        return connections.get_connection(self.using)
+
+    def save(self, document: Document):
+        """
+        add a document to the buffer and flush the buffer when it is full
+
+        Arguments:
+            document {Document} -- document to index
+        """
+
+        with self.lock:
+            # validate & run the clean hooks, like document.save()
+            document.full_clean()
+
+            action: dict = document.to_dict(include_meta=True)
+
+            # documents with an id are the same document, even when they are different objects
+            key: Hashable = id(document)
+            if "_id" in action:
+                key = (action["_index"], action["_id"])
+
+            is_full: bool = self._add_action(key=key, document=document, action=action)
+
+        if is_full:
+            self.flush()
+
+    def _add_action(self, key: Hashable, document: Document, action: dict) -> bool:
+        """
+        add a bulk action to the buffer & replace the older action with the same key, the caller
+        must hold the lock & flush the buffer after releasing the lock, when the buffer is full
+
+        Arguments:
+            key {Hashable} -- key of the action in the buffer
+            document {Document} -- document of the action
+            action {dict} -- bulk action
+
+        Returns:
+            bool -- True when the buffer is full
+        """
+        action_size: int = len(json.dumps(action, default=str))
+
+        # replace older buffered action of the same document
+        if key in self.buffer:
+            self.buffer_bytes = self.buffer_bytes - self.buffer[key][2]
+
+        self.buffer[key] = (document, action, action_size)
+        self.buffer_bytes = self.buffer_bytes + action_size
+
+        return len(self.buffer) >= self.max_docs or self.buffer_bytes >= self.max_bytes
+
+    def create(self, document: Document):
+        """
+        add a document to the buffer, wich is only written when there is no document with the
+        same id, an existing document is not an error & is counted in skipped
+
+        Arguments:
+            document {Document} -- document with an id to create
+        """
+        with self.lock:
+            document.full_clean()
+
+            action: dict = document.to_dict(include_meta=True)
+            action["_op_type"] = "create"
+
+            is_full: bool = self._add_action(
+                key=("create", action["_index"], action["_id"]),
+                document=document,
+                action=action,
+            )
+
+        if is_full:
+            self.flush()
+
+    def update(self, document: Document, fields: Iterable[str]):
+        """
+        add a partial update of some fields of a stored document to the buffer and flush the
+        buffer when it is full, a buffered update of the same document is merged with this update
+
+        Arguments:
+            document {Document} -- stored document with an id
+            fields {Iterable[str]} -- fields to update
+        """
+        with self.lock:
+            document_dict: dict = document.to_dict()
+            action: dict = {
+                "_op_type": "update",
+                "_index": document._get_index(),
+                "_id": document.meta.id,
+                "doc": {field: document_dict.get(field) for field in fields},
+            }
+
+            # keep the fields, wich was only set by the buffered update
+            key: Hashable = ("update", action["_index"], action["_id"])
+            if key in self.buffer:
+                action["doc"] = {**self.buffer[key][1]["doc"], **action["doc"]}
+
+            is_full: bool = self._add_action(
+                key=key,
+                document=document,
+                action=action,
+            )
+
+        if is_full:
+            self.flush()
+
+    def delete(self, document: Document):
+        """
+        add the deletion of a stored document to the buffer and flush the buffer when it is full,
+        a document wich does not exists is not an error & is counted in skipped
+
+        Arguments:
+            document {Document} -- document with an id to delete
+        """
+        with self.lock:
+            action: dict = {
+                "_op_type": "delete",
+                "_index": document._get_index(),
+                "_id": document.meta.id,
+            }
+            is_full: bool = self._add_action(
+                key=("delete", action["_index"], action["_id"]),
+                document=document,
+                action=action,
+            )
+
+        if is_full:
+            self.flush()
+
+    def add_index(self, index: str):
+        """
+        add an index, which was written without the bulk writer, to the indices for the final
+        refresh
+
+        Arguments:
+            index {str} -- written elasticsearch index
+        """
+        with self.lock:
+            self.indices.add(index)
+
+    def flush(self, refresh: str = "false") -> int:
+        """
+        write all buffered documents with a single bulk request, the buffer is swapped under the
+        lock, so other workers can fill the next buffer meanwhile, but the bulk requests are send
+        one after another in the order of the swaps
+
+        Keyword Arguments:
+            refresh {str} -- refresh param of the bulk request (default: {"false"})
+
+        Returns:
+            int -- amount of successful written documents
+        """
+        with self.flush_lock:
+            with self.lock:
+                if len(self.buffer) == 0:
+                    return 0
+
+                buffer: List[Tuple[Document, dict, int]] = list(self.buffer.values())
+                self.buffer = OrderedDict()
+                self.buffer_bytes = 0
+
+            indexed: int = 0
+            skipped: int = 0
+            errors: List[dict] = []
+            indices: Set[str] = set()
+
+            # streaming_bulk yield the results in the same order as the actions
+            for (document, action, _), (ok, result) in zip(
+                buffer,
+                streaming_bulk(
+                    self.connection,
+                    (action for _, action, _ in buffer),
+                    chunk_size=self.max_docs,
+                    max_chunk_bytes=self.max_bytes,
+                    raise_on_error=False,
+                    raise_on_exception=False,
+                    refresh=refresh,
+                ),
+            ):
+                item: dict = result.popitem()[1]
+
+                if not ok:
+                    if (action.get("_op_type"), item.get("status")) in SKIPPED_RESULTS:
+                        skipped = skipped + 1
+                    else:
+                        errors.append(item)
+                    continue
+
+                # set meta information from elasticsearch like on document.save()
+                for meta_field in ("_id", "_index", "_seq_no", "_primary_term"):
+                    if meta_field in item:
+                        setattr(document.meta, meta_field[1:], item[meta_field])
+
+                indices.add(item["_index"])
+                indexed = indexed + 1
+
+            with self.lock:
+                self.indexed = self.indexed + indexed
+                self.skipped = self.skipped + skipped
+                self.errors.extend(errors)
+                self.indices.update(indices)
+
+            return indexed
+
+    def close(self):
+        """
+        write all buffered documents & make them searchable like set in refresh
+        """
+        with self.lock:
+            has_buffer: bool = len(self.buffer) > 0
+
+        # the last bulk request wait for the refresh
+        if self.refresh == "wait_for" and has_buffer:
+            self.flush(refresh="wait_for")
+            return
+
+        self.flush()
+
+        with self.lock:
+            indices: List[str] = sorted(self.indices)
+
+        if self.refresh != "false" and len(indices) > 0:
+            self.connection.indices.refresh(index=",".join(indices))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, Set
+
+from elasticsearch_dsl import Date, Keyword
+from elasticsearch_dsl.search import Search
+
+from meetup_search.models.bulk_writer import BulkWriter
+from meetup_search.models.index_version import VersionedDocument
+
+
+class CrawlState(VersionedDocument):
+    """
+    Done task of a crawl, like a zip of load_groups or a group urlname of get_groups, so an
+    interrupted crawl can be resumed without crawling the done tasks again
+
+    Usage:
+        done_zips: Set[str] = CrawlState.get_done_tasks(crawl="load_groups:DE")
+
+        CrawlState.mark_done(crawl="load_groups:DE", task="meetup1")
+    """
+
+    class Index:
+        """
+        Elasticsearch index of the model
+
+        for override the default index ->
+        https://elasticsearch-dsl.readthedocs.io/en/latest/persistence.html#document-life-cycle
+        """
+
+        name = "meetup_crawl_state"
+
+    # required fields
+    crawl = Keyword(required=True)
+    task = Keyword(required=True)
+    done_at = Date(required=True)
+
+    def clean(self):
+        """
+        Set the document id, called by full_clean on save & on bulk writes
+        """
+        self.meta.id = "{}:{}".format(self.crawl, self.task)
+
+    @staticmethod
+    def get_done_tasks(crawl: str) -> Set[str]:
+        """
+        Get all done tasks of a crawl
+
+        Arguments:
+            crawl {str} -- name of the crawl, like "load_groups:DE"
+
+        Returns:
+            Set[str] -- done tasks
+        """
+        s: Search = CrawlState.search()
+        s = s.filter("term", crawl=crawl).source(["task"])
+        return {hit.task for hit in s.scan()}
+
+    @staticmethod
+    def mark_done(crawl: str, task: str, bulk_writer: Optional[BulkWriter] = None):
+        """
+        Save a task of a crawl as done, over the bulk_writer if there is one, so the state is
+        written with the data of the task
+
+        Arguments:
+            crawl {str} -- name of the crawl, like "load_groups:DE"
+            task {str} -- done task, like a zip code
+
+        Keyword Arguments:
+            bulk_writer {Optional[BulkWriter]} -- bulk writer of the crawl (default: {None})
+        """
+        crawl_state: CrawlState = CrawlState(crawl=crawl, task=task, done_at=datetime.now())
+        if bulk_writer:
+            bulk_writer.save(crawl_state)
+        else:
+            crawl_state.save()
+
+    @staticmethod
+    def reset(crawl: str):
+        """
+        Delete the state of a crawl, so the next crawl start from the beginning
+
+        Arguments:
+            crawl {str} -- name of the crawl, like "load_groups:DE"
+        """
+        CrawlState.search().filter("term", crawl=crawl).params(
+            conflicts="proceed", refresh=True
+        ).delete()
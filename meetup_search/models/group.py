@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterator, List, Optional, Set, Tuple, Union
 
-from elasticsearch_dsl import Boolean, Date, Document, GeoPoint, InnerDoc, Integer, Long, Nested, Text
+from elasticsearch_dsl import (Boolean, Date, GeoPoint, InnerDoc, Integer, Keyword,
+                               Long, Nested, Object, Q, Text, UpdateByQuery, connections)
 from elasticsearch_dsl.field import Completion
 from elasticsearch_dsl.response import Response
 from elasticsearch_dsl.search import Search
 from meetup_search.meetup_api_client.exceptions import GroupDoesNotExists
+from meetup_search.models.index_version import VersionedDocument
 
 
 class Topic(InnerDoc):
@@ -16,19 +19,44 @@ class Topic(InnerDoc):
     """
 
     # required fields
-    meetup_id = Text(required=True)
-    lang = Text(required=True)
+    meetup_id = Keyword(required=True)
+    lang = Keyword(required=True)
     name = Text(required=True)
-    urlkey = Text(required=True)
+    urlkey = Text(required=True, fields={"keyword": Keyword()})
 
 
-class Event(InnerDoc):
+class Venue(InnerDoc):
     """
-    Meetup Group Event
+    Venue of a group, used by at least one event of the group
     """
 
     # required fields
-    meetup_id = Text(required=True)
+    name = Text(required=True)
+    location = GeoPoint(required=True)
+
+
+class Event(VersionedDocument):
+    """
+    Meetup Group Event with elasticsearch persistence, every event is a own document with a
+    reference to the group, so a new event doesn't reindex the group
+
+    Meetup Event doc:
+    https://www.meetup.com/de-DE/meetup_api/docs/:urlname/events/#list
+    """
+
+    class Index:
+        """
+        Elasticsearch index of the model
+
+        for override the default index ->
+        https://elasticsearch-dsl.readthedocs.io/en/latest/persistence.html#document-life-cycle
+        """
+
+        name = "meetup_event"
+
+    # required fields
+    meetup_id = Keyword(required=True)
+    group_id = Keyword(required=True)
     time = Date(required=True)
     name = Text(required=True)
     link = Text(required=True)
@@ -47,18 +75,18 @@ class Event(InnerDoc):
     fee_description = Text()
     fee_label = Text()
     how_to_find_us = Text()
-    status = Text()
+    status = Text(fields={"keyword": Keyword()})
     updated = Date()
     utc_offset = Long()
-    venue_visibility = Text()
-    visibility = Text()
+    venue_visibility = Text(fields={"keyword": Keyword()})
+    visibility = Text(fields={"keyword": Keyword()})
 
     # venue
     venue_address_1 = Text()
     venue_address_2 = Text()
     venue_address_3 = Text()
-    venue_city = Text()
-    venue_country = Text()
+    venue_city = Text(fields={"keyword": Keyword()})
+    venue_country = Text(fields={"keyword": Keyword()})
     venue_localized_country_name = Text()
     venue_name = Text()
     venue_phone = Text()
@@ -72,8 +100,218 @@ class Event(InnerDoc):
     event_host_join_date = Date()
     event_host_name = Text()
 
+    # fields wich are needed for the venues of a group
+    VENUE_FIELDS: Tuple[str, ...] = ("venue_name", "venue_location")
+
+    def clean(self):
+        """
+        Set the document id, called by full_clean on save & on bulk writes
+        """
+        self.meta.id = str(self.meetup_id)
+
+    @staticmethod
+    def get_group_events(
+        group_id: str, source_fields: Optional[List[str]] = None
+    ) -> Iterator[Event]:
+        """
+        Stream all events of a group sorted by the event time
+
+        Arguments:
+            group_id {str} -- document id of the group
+
+        Keyword Arguments:
+            source_fields {Optional[List[str]]} -- load only these fields, load all fields when
+                                                   None (default: {None})
+
+        Returns:
+            Iterator[Event] -- all events of the group
+        """
+        return Event.get_events_of_groups(group_ids=[group_id], source_fields=source_fields)
+
+    @staticmethod
+    def get_events_of_groups(
+        group_ids: List[str],
+        source_fields: Optional[List[str]] = None,
+        only_with_venue: bool = False,
+    ) -> Iterator[Event]:
+        """
+        Stream all events of many groups with a single search, sorted by the event time
+
+        Arguments:
+            group_ids {List[str]} -- document ids of the groups
+
+        Keyword Arguments:
+            source_fields {Optional[List[str]]} -- load only these fields, load all fields when
+                                                   None (default: {None})
+            only_with_venue {bool} -- load only events with a venue location (default: {False})
+
+        Returns:
+            Iterator[Event] -- all events of the groups
+        """
+        s: Search = Event.search()
+        s = s.filter("terms", group_id=group_ids).sort("time")
+        if only_with_venue:
+            s = s.filter("exists", field="venue_location")
+        if source_fields:
+            s = s.source(source_fields + ["group_id"])
+        return s.params(preserve_order=True).scan()
+
+    @staticmethod
+    def get_group_event_ids(group_id: str) -> Set[str]:
+        """
+        Get the meetup_ids of all events of a group, without loading the events
+
+        Arguments:
+            group_id {str} -- document id of the group
+
+        Returns:
+            Set[str] -- meetup_ids of all events
+        """
+        s: Search = Event.search()
+        s = s.filter("term", group_id=group_id).source(False)
+        return {hit.meta.id for hit in s.scan()}
+
+    @staticmethod
+    def get_group_ids(query: dict, batch_size: int = 5000) -> List[str]:
+        """
+        Get the document ids of all groups with at least one event matching the query, to filter
+        a group search by the events. The ids are loaded in batches with a composite aggregation,
+        so no group is dropped.
+
+        Arguments:
+            query {dict} -- elasticsearch query for the events
+
+        Keyword Arguments:
+            batch_size {int} -- how many group ids are loaded with a single request
+                                (default: {5000})
+
+        Returns:
+            List[str] -- group document ids
+        """
+        group_ids: List[str] = []
+        after_key: Optional[dict] = None
+
+        while True:
+            s: Search = Event.search()
+            s = s.query(Q(query)).extra(size=0)
+            composite: dict = {
+                "size": batch_size,
+                "sources": [{"group_id": {"terms": {"field": "group_id"}}}],
+            }
+            if after_key:
+                composite["after"] = after_key
+            s.aggs.bucket("groups", "composite", **composite)
+            results: Response = s.execute()
+
+            group_ids.extend(
+                bucket.key.group_id for bucket in results.aggregations.groups.buckets
+            )
+
+            if len(results.aggregations.groups.buckets) < batch_size:
+                return group_ids
+
+            after_key = results.aggregations.groups.after_key.to_dict()
+
+    @staticmethod
+    def get_top_group_ids(query: dict, max_groups: int = 10000) -> List[str]:
+        """
+        Get the document ids of the groups with the best matching events, to rank groups by the
+        events in a group search. The groups are ranked by the score of their best event, so a
+        query matching the events of more than max_groups groups keeps the best groups.
+
+        Arguments:
+            query {dict} -- elasticsearch query for the events
+
+        Keyword Arguments:
+            max_groups {int} -- max amount of returned group ids (default: {10000})
+
+        Returns:
+            List[str] -- group document ids, sorted by the best event score
+        """
+        s: Search = Event.search()
+        s = s.query(Q(query)).extra(size=0)
+        s.aggs.bucket(
+            "groups", "terms", field="group_id", size=max_groups, order={"max_score": "desc"}
+        ).metric("max_score", "max", script={"source": "_score"})
+        results: Response = s.execute()
+
+        return [bucket.key for bucket in results.aggregations.groups.buckets]
+
+    @staticmethod
+    def delete_group_events(group_id: str):
+        """
+        Delete all events of a group
+
+        Arguments:
+            group_id {str} -- document id of the group
+        """
+        Event.search().filter("term", group_id=group_id).params(
+            conflicts="proceed"
+        ).delete()
+
+    @staticmethod
+    def move_group_events(old_group_id: str, new_group_id: str, refresh: str = "false"):
+        """
+        Move all events of a group to another group
 
-class Group(Document):
+        Arguments:
+            old_group_id {str} -- document id of the group with the events
+            new_group_id {str} -- document id of the group wich get the events
+
+        Keyword Arguments:
+            refresh {str} -- elasticsearch refresh mode (default: {"false"})
+        """
+        UpdateByQuery(index=Event._default_index()).filter(
+            "term", group_id=old_group_id
+        ).script(
+            source="ctx._source.group_id = params.group_id",
+            params={"group_id": new_group_id},
+        ).params(
+            conflicts="proceed", refresh=refresh != "false"
+        ).execute()
+
+
+class GroupMeetupId(VersionedDocument):
+    """
+    Document id of the group with a meetup_id, stored under the meetup_id as document id. So the
+    group of a meetup_id can be loaded with a realtime get by id, without a refresh of the group
+    index, when a group changed the urlname.
+    """
+
+    class Index:
+        """
+        Elasticsearch index of the model
+
+        for override the default index ->
+        https://elasticsearch-dsl.readthedocs.io/en/latest/persistence.html#document-life-cycle
+        """
+
+        name = "meetup_group_meetup_id"
+
+    # required fields
+    group_id = Keyword(required=True)
+
+    @staticmethod
+    def get_group_id(meetup_id: int) -> Optional[str]:
+        """
+        Get the document id of the group with the meetup_id with a realtime get by id
+
+        Arguments:
+            meetup_id {int} -- Meetup Group id
+
+        Returns:
+            Optional[str] -- document id of the group, None when no group was stored with the
+                             meetup_id
+        """
+        group_meetup_id: Optional[GroupMeetupId] = GroupMeetupId.get(
+            id=str(meetup_id), ignore=404
+        )
+        if group_meetup_id:
+            return group_meetup_id.group_id
+        return None
+
+
+class Group(VersionedDocument):
     """
     Meetup.com Group Model with elasticsearch persistence
 
@@ -97,47 +335,48 @@ class Group(Document):
 
         name = "meetup_group"
 
-    # required fields
+    # required fields, text fields with a keyword sub field can be used for term filters, sorting
+    # & aggregations, like "urlname.keyword"
     meetup_id = Long(required=True)
-    urlname = Text(required=True)
+    urlname = Text(required=True, fields={"keyword": Keyword()})
     created = Date(default_timezone="UTC", required=True)
     description = Text(analyzer="snowball", required=True)
     name = Text(required=True)
     link = Text(required=True)
     location = GeoPoint(required=True)
     members = Integer(required=True)
-    status = Text(required=True)
-    timezone = Text(required=True)
-    visibility = Text(required=True)
+    status = Text(required=True, fields={"keyword": Keyword()})
+    timezone = Text(required=True, fields={"keyword": Keyword()})
+    visibility = Text(required=True, fields={"keyword": Keyword()})
 
     # optional fields
     nomination_acceptable = Boolean()
-    city = Text()
+    city = Text(fields={"keyword": Keyword()})
     city_link = Text()
-    country = Text()
+    country = Text(fields={"keyword": Keyword()})
     fee_options_currencies_code = Text()
     fee_options_currencies_default = Boolean()
     fee_options_type = Text()
-    join_mode = Text()
-    localized_country_name = Text()
+    join_mode = Text(fields={"keyword": Keyword()})
+    localized_country_name = Text(fields={"keyword": Keyword()})
     localized_location = Text()
     member_limit = Integer()
     short_link = Text()
-    state = Text()
+    state = Text(fields={"keyword": Keyword()})
     untranslated_city = Text()
     welcome_message = Text()
     who = Text()
 
     # category
     category_id = Long()
-    category_name = Text()
-    category_shortname = Text()
+    category_name = Text(fields={"keyword": Keyword()})
+    category_shortname = Text(fields={"keyword": Keyword()})
     category_sort_name = Text()
 
     # meta_category
     meta_category_id = Long()
-    meta_category_shortname = Text()
-    meta_category_name = Text()
+    meta_category_shortname = Text(fields={"keyword": Keyword()})
+    meta_category_name = Text(fields={"keyword": Keyword()})
     meta_category_sort_name = Text()
 
     # topics
@@ -148,20 +387,177 @@ class Group(Document):
     organizer_name = Text()
     organizer_bio = Text()
 
-    # events
-    events = Nested(Event)
+    # event statistics, updated when events are added
+    event_count = Integer()
+    first_event_time = Date()
+    last_event_time = Date()
+
+    # venues of all events deduplicated by the location & their average location, updated when
+    # events are added, so a search response doesn't need the events
+    venues = Object(Venue, multi=True)
+    venue_location_average = GeoPoint()
+
+    # fields wich are calculated from the events
+    EVENT_STATS_FIELDS: Tuple[str, ...] = (
+        "event_count",
+        "first_event_time",
+        "last_event_time",
+        "venues",
+        "venue_location_average",
+    )
+
+    # events are stored in the event index & loaded lazy into this list
+    _events: Optional[List[Event]] = None
+
+    # events wich was added before the events was loaded
+    _added_events: Optional[List[Event]] = None
+
+    # meetup_ids of all events, build lazy for a fast event_exists
+    _event_ids: Optional[Set[str]] = None
+
+    # keys of the venue locations, build lazy for a fast venue deduplication
+    _venue_keys: Optional[Set[str]] = None
 
     # suggest fields (auto fill on save)
     name_suggest = Completion()
 
+    # internal fields, wich are not loaded for the search response
+    SEARCH_SOURCE_EXCLUDES: Tuple[str, ...] = ("name_suggest",)
+
+    # unique sort fields after the requested sort fields, so search_after has a stable order, the
+    # meetup_id is not set for every group, so the unique urlname is the last tiebreaker
+    SORT_TIEBREAKER: Tuple[str, ...] = ("meetup_id", "urlname.keyword")
+
+    @property
+    def events(self) -> List[Event]:
+        """
+        All events of the group, the stored events are loaded from elasticsearch on the first
+        access, added events are only in this list until they are saved
+
+        Returns:
+            List[Event] -- all events of the group
+        """
+        if self._events is None:
+            self._events = list(
+                Event.get_group_events(group_id=Group.get_id(urlname=self.urlname))
+            )
+
+            # add the events wich wasn't saved yet
+            stored_event_ids: Set[str] = {str(event.meetup_id) for event in self._events}
+            for event in self._added_events or []:
+                if str(event.meetup_id) not in stored_event_ids:
+                    self._events.append(event)
+            self._added_events = None
+
+        return self._events
+
+    @property
+    def event_ids(self) -> Set[str]:
+        """
+        meetup_ids of all events of the group, build from the loaded events or when the events
+        are not loaded, only the ids are loaded from elasticsearch
+
+        Returns:
+            Set[str] -- meetup_ids of all events
+        """
+        if self._event_ids is None:
+            if self._events is not None:
+                self._event_ids = {str(event.meetup_id) for event in self._events}
+            else:
+                self._event_ids = Event.get_group_event_ids(
+                    group_id=Group.get_id(urlname=self.urlname)
+                )
+        return self._event_ids
+
     def add_event(self, event: Event):
         """
-        Add a single event object to the group.
+        Add a single event object to the group & update the event statistics, the event has to be
+        saved by the caller. The stored events are not loaded for this.
 
         Arguments:
             event {Event} -- Event wich should be added
         """
-        self.events.append(event)
+        event.group_id = Group.get_id(urlname=self.urlname)
+
+        if self._events is not None:
+            self._events.append(event)
+        else:
+            self._added_events = (self._added_events or []) + [event]
+
+        # update event statistics only for new events
+        if str(event.meetup_id) in self.event_ids:
+            return
+        self.event_ids.add(str(event.meetup_id))
+
+        self.event_count = (self.event_count or 0) + 1
+        if not self.first_event_time or event.time < self.first_event_time:
+            self.first_event_time = event.time
+        if not self.last_event_time or event.time > self.last_event_time:
+            self.last_event_time = event.time
+
+        self.add_venue(event)
+
+    def add_venue(self, event: Event) -> bool:
+        """
+        Add the venue of an event to the group venues, when the group has no venue with the same
+        location & update the average venue location
+
+        Arguments:
+            event {Event} -- event with or without venue
+
+        Returns:
+            bool -- True when the venue was added, False when the event has no venue or the
+                    venue already exists
+        """
+        # check if there is no venue information in event
+        if not event.venue_location or not event.venue_name:
+            return False
+
+        if not self.venues:
+            self.venues = []
+        if self._venue_keys is None:
+            self._venue_keys = {
+                Group.get_venue_key(location=venue.to_dict()["location"])
+                for venue in self.venues
+            }
+
+        event_dict: dict = event.to_dict()
+        venue_key: str = Group.get_venue_key(location=event_dict["venue_location"])
+        if venue_key in self._venue_keys:
+            return False
+        self._venue_keys.add(venue_key)
+
+        self.venues.append(
+            Venue(name=event_dict["venue_name"], location=event_dict["venue_location"])
+        )
+
+        # update the average with the new venue, without iterating over all venues
+        location: dict = event_dict["venue_location"]
+        if not self.venue_location_average:
+            self.venue_location_average = {"lat": location["lat"], "lon": location["lon"]}
+        else:
+            venue_count: int = len(self.venues)
+            self.venue_location_average = {
+                "lat": self.venue_location_average["lat"]
+                + (location["lat"] - self.venue_location_average["lat"]) / venue_count,
+                "lon": self.venue_location_average["lon"]
+                + (location["lon"] - self.venue_location_average["lon"]) / venue_count,
+            }
+
+        return True
+
+    @staticmethod
+    def get_venue_key(location: Union[dict, list, str]) -> str:
+        """
+        Get a hashable key of a venue location, to find venues with the same location
+
+        Arguments:
+            location {Union[dict, list, str]} -- geo point of the venue
+
+        Returns:
+            str -- key of the location
+        """
+        return json.dumps(location, sort_keys=True)
 
     def add_topic(self, topic: Topic):
         """
@@ -174,16 +570,17 @@ class Group(Document):
 
     def add_events(self, events: List[Event]):
         """
-        Add a mutiple event objects to the group.
+        Add a mutiple event objects to the group, the events has to be saved by the caller.
 
         Arguments:
             events {List[Event]} -- Event list wich should be added
         """
-        self.events.extend(events)
+        for event in events:
+            self.add_event(event)
 
     def event_exists(self, event_meetup_id: str) -> bool:
         """
-        Check if a event with the meetup_id exists in this group on elasticsearch
+        Check if a event with the meetup_id exists in this group on elasticsearch or was added
 
         Arguments:
             event_meetup_id {str} -- meetup_id of the requested event
@@ -191,46 +588,54 @@ class Group(Document):
         Returns:
             bool -- True -> Event exists; False -> Event does not exists
         """
-        for event in self.events:
-            if event.meetup_id == event_meetup_id:
-                return True
-        return False
+        return str(event_meetup_id) in self.event_ids
 
-    def save(self, **kwargs):
+    def clean(self):
         """
-        Overwrite save method to set suggest fields
+        Set suggest fields & the document id, called by full_clean on save & on bulk writes
         """
         self.name_suggest = self.name
+        self.meta.id = Group.get_id(urlname=self.urlname)
 
-        return super().save(**kwargs)
+    @staticmethod
+    def get_id(urlname: str) -> str:
+        """
+        Get the elasticsearch document id of a group, meetup urlnames are case insensitive so the
+        id is the lowercase urlname
 
-    @property
-    def last_event_time(self) -> Optional[datetime]:
+        Arguments:
+            urlname {str} -- Group urlname
+
+        Returns:
+            str -- elasticsearch document id
+        """
+        return urlname.lower()
+
+    @staticmethod
+    def get_sort_field(sort: str) -> str:
         """
-        Get from the last event the event time, if any event exists
+        Get the field to sort by, text fields can't be sorted so the keyword sub field of a text
+        field is used
 
         Usage:
-            group: Group = Group(...)
+            Group.get_sort_field("-urlname") -> "-urlname.keyword"
 
-            group.last_event_time
+        Arguments:
+            sort {str} -- field name, with a "-" prefix for a descending sort
 
         Returns:
-            Optional[datetime] -- Last event time, when any event exists in this group else return
-                                  None
-        """
-        last_event_time: Optional[datetime] = None
-        for event in self.events:
-            if last_event_time:
-                if event.time > last_event_time:
-                    last_event_time = event.time
-            else:
-                last_event_time = event.time
-        return last_event_time
+            str -- sortable field name, with the same prefix
+        """
+        field: str = sort.lstrip("-")
+        if field in Group._doc_type.mapping:
+            if "keyword" in Group._doc_type.mapping[field].to_dict().get("fields", {}):
+                return "{}.keyword".format(sort)
+        return sort
 
     @staticmethod
     def delete_if_exists(urlname: str) -> bool:
         """
-        Delete a group based on the urlname if exists.
+        Delete a group & all its events based on the urlname if exists.
 
         Usage:
             Group.delete_if_exists(urlname="MyGroupToDelete)
@@ -241,17 +646,17 @@ class Group(Document):
         Returns:
             bool -- True -> Group was deletet; False -> Group doesn't exists on elasticsearch
         """
-        try:
-            group: Group = Group.get_group(urlname)
-            group.delete()
-            return True
-        except GroupDoesNotExists:
-            return False
+        Event.delete_group_events(group_id=Group.get_id(urlname=urlname))
+
+        response: dict = connections.get_connection().delete(
+            index=Group._default_index(), id=Group.get_id(urlname=urlname), ignore=404
+        )
+        return response.get("result") == "deleted"
 
     @staticmethod
     def get_group(urlname: str) -> Group:
         """
-        Get Group from elasticseach based on urlname
+        Get Group from elasticseach based on urlname with a realtime get by id
 
         Arguments:
             urlname {str} -- Group urlname
@@ -262,206 +667,211 @@ class Group(Document):
         Returns:
             Group -- the request Group object from elasticsearch
         """
-        s: Search = Group.search()
-        s = s.query("match", urlname=urlname)
-        results: Response = s.execute()
-        for group in results:
+        group: Optional[Group] = Group.get(id=Group.get_id(urlname=urlname), ignore=404)
+        if group:
             return group
         raise GroupDoesNotExists("{} does not exists in elasticsearch!".format(urlname))
 
     @staticmethod
-    def get_or_create_by_urlname(
-        urlname: str,
-        meetup_id: int,
-        created: datetime,
-        description: str,
-        name: str,
-        link: str,
-        lat: float,
-        lon: float,
-        members: int,
-        status: str,
-        timezone: str,
-        visibility: str,
-    ) -> Group:
-        """
-        Get a Group Object from elasticsearch based on the urlname and update the Group Object
-        with all arguments.
-
-        When the Group does not exists on elasticsearch, create a new Group Object with all
-        arguments.
-
-        Arguments:
-            urlname {str} -- Meetup Group urlname
-            meetup_id {int} -- Meetup Group id 
-            created {datetime} -- create time of the Meetup Group
-            description {str} -- Meetup Group description
-            name {str} -- Meetup Group name
-            link {str} -- link to the Group Meetup URL
-            lat {float} -- Meetup Group location lat
-            lon {float} -- Meetup Group location lon
-            members {int} -- Meetup Group members amount
-            status {str} -- Meetup Group status
-            timezone {str} -- Meetup Group timezone
-            visibility {str} -- Meetup Group visibility
-
-        Returns:
-            Group -- Updated or new Group Object from elasticsearch
+    def get_group_by_meetup_id(meetup_id: int, exclude_id: Optional[str] = None) -> Group:
         """
+        Get Group from elasticseach based on the meetup_id, the meetup_id doesn't change when a
+        group change the urlname
 
-        s: Search = Group.search()
-        s = s.query("match", urlname=urlname)
-        results: Response = s.execute()
-
-        for group in results:
-            group.description = description
-            group.name = name
-            group.location = {"lat": lat, "lon": lon}
-            group.members = members
-            group.status = status
-            group.timezone = timezone
-            group.visibility = visibility
-            group.save()
-            return group
-
-        return Group(
-            urlname=urlname,
-            meetup_id=meetup_id,
-            created=created,
-            description=description,
-            name=name,
-            link=link,
-            location={"lat": lat, "lon": lon},
-            members=members,
-            status=status,
-            timezone=timezone,
-            visibility=visibility,
-        )
+        Arguments:
+            meetup_id {int} -- Meetup Group id
 
-    @staticmethod
-    def get_all_groups() -> List[Group]:
-        """
-        Get all groups from Elasticsearch
+        Keyword Arguments:
+            exclude_id {Optional[str]} -- ignore the group with this document id (default: {None})
 
         Raises:
             GroupDoesNotExists: When a Group does not exists on elasticsearch
 
         Returns:
-            List[Group] -- all groups from elasticsearch
+            Group -- the request Group object from elasticsearch
         """
         s: Search = Group.search()
-        s = s.query("match_all")
-        results: Response = s.execute()
-
-        groups: List[Group] = []
+        s = s.filter("term", meetup_id=meetup_id)
+        if exclude_id:
+            s = s.exclude("ids", values=[exclude_id])
+        results: Response = s[0:1].execute()
         for group in results:
-            groups.append(group)
-
-        return groups
+            return group
+        raise GroupDoesNotExists(
+            "Group with meetup_id {} does not exists in elasticsearch!".format(meetup_id)
+        )
 
-    @staticmethod
-    def add_event_venue_to_list(venue_list: List[dict], event: Event) -> List[dict]:
+    def upsert(self, refresh: str = "false") -> str:
         """
-        add venue to dict, if it wasn't already included
+        Write every set field of the group with a single partial update into elasticsearch, when
+        the group does not exists, it will be created. The stored event statistics are returned
+        by elasticsearch & the events of this group object are reloaded from the event index on
+        the next access.
 
-        Arguments:
-            venue_list: List[dict] -- list of venue dicts
-            event {Event} -- event to add
+        When the group was created, but a group with the same meetup_id exists, the group changed
+        the urlname, so the events are moved to this group & the old group will be deleted. The
+        old group is found by the GroupMeetupId document of the meetup_id. Groups without a
+        meetup_id are never merged.
+
+        Usage:
+            group: Group = Group(urlname="MyGroup", ...)
+            group.upsert()
+
+        Keyword Arguments:
+            refresh {str} -- elasticsearch refresh mode (default: {"false"})
 
         Returns:
-            List[dict] -- input venue_list with added event venue
+            str -- "created", "updated" or "noop" when nothing was changed
         """
+        # validate & run the clean hooks, like document.save()
+        self.full_clean()
+
+        response: dict = self._get_connection().update(
+            index=self._get_index(),
+            id=self.meta.id,
+            body={"doc": self.to_dict(), "doc_as_upsert": True},
+            refresh=refresh,
+            retry_on_conflict=3,
+            _source_includes=",".join(Group.EVENT_STATS_FIELDS),
+        )
 
-        # check if there is no venue information in event
-        if not event.venue_location or not event.venue_name:
-            return venue_list
+        # set meta information from elasticsearch like on document.save()
+        for meta_field in ("_index", "_seq_no", "_primary_term"):
+            if meta_field in response:
+                setattr(self.meta, meta_field[1:], response[meta_field])
 
-        # exit method if venue already exists
-        for venue in venue_list:
-            if venue["location"] == event.venue_location:
-                return venue_list
+        # load the stored event statistics
+        stored_source: dict = response["get"]["_source"]
+        for field in Group.EVENT_STATS_FIELDS:
+            setattr(
+                self, field, self._doc_type.mapping[field].deserialize(stored_source.get(field))
+            )
 
-        event_dict: dict = event.to_dict()
+        self._events = None
+        self._added_events = None
+        self._event_ids = None
+        self._venue_keys = None
+
+        if response["result"] == "created" and self.meetup_id:
+            # realtime get of the group wich was stored with the meetup_id before, so no refresh
+            # of the group index is needed
+            old_group_id: Optional[str] = GroupMeetupId.get_group_id(meetup_id=self.meetup_id)
+            GroupMeetupId(meta={"id": str(self.meetup_id)}, group_id=self.meta.id).save(
+                refresh=refresh
+            )
+            if not old_group_id or old_group_id == self.meta.id:
+                return response["result"]
 
-        # append venue if it does not exists
-        venue_list.append(
-            {
-                "name": event_dict["venue_name"],
-                "location": event_dict["venue_location"],
-            }
-        )
+            old_group: Optional[Group] = Group.get(id=old_group_id, ignore=404)
+            if not old_group:
+                return response["result"]
 
-        return venue_list
+            # the group changed the urlname, move the events to the new id first & delete only
+            # the old group document afterwards
+            Event.move_group_events(
+                old_group_id=old_group.meta.id, new_group_id=self.meta.id, refresh=refresh
+            )
+            if old_group.event_count:
+                self.update(
+                    refresh=refresh,
+                    **{field: getattr(old_group, field) for field in Group.EVENT_STATS_FIELDS}
+                )
+            Group(meta={"id": old_group.meta.id, "index": old_group.meta.index}).delete(
+                refresh=refresh, ignore=404
+            )
+
+        return response["result"]
 
     @staticmethod
-    def get_venue_location_average(venue_list: List[dict]) -> dict:
+    def get_all_groups(
+        batch_size: int = 500,
+        source_fields: Optional[List[str]] = None,
+        last_event_before: Optional[datetime] = None,
+    ) -> Iterator[Group]:
         """
-        Calc the average location of all venues
+        Stream all groups from Elasticsearch, the groups are loaded lazy in batches with
+        search_after, so only a single batch is in memory at once
 
-        Arguments:
-            venue_list {List[dict]} -- venue list for calc the average
+        Usage:
+            for group in Group.get_all_groups():
+                ...
+
+        Keyword Arguments:
+            batch_size {int} -- how many groups are loaded with a single request (default: {500})
+            source_fields {Optional[List[str]]} -- load only these fields, load all fields when
+                                                   None. Groups with only some fields loaded must
+                                                   not be saved! (default: {None})
+            last_event_before {Optional[datetime]} -- load only groups without events or with the
+                                                      last event before this time, load all
+                                                      groups when None (default: {None})
 
         Returns:
-            dict -- {'lat': float, 'lon': float}
+            Iterator[Group] -- all groups from elasticsearch
         """
+        s: Search = Group.search()
+        s = s.query("match_all").sort(*Group.SORT_TIEBREAKER).extra(size=batch_size)
+        if source_fields:
+            s = s.source(source_fields)
+        if last_event_before:
+            s = s.filter(
+                Q("range", last_event_time={"lt": last_event_before})
+                | ~Q("exists", field="last_event_time")
+            )
 
-        if len(venue_list) == 0:
-            raise ValueError("The size of venue_list need to be larger than 0!")
-
-        lat_average: float = 0
-        lon_average: float = 0
+        search_after: Optional[list] = None
+        while True:
+            page: Search = s
+            if search_after:
+                page = s.extra(search_after=search_after)
+            results: Response = page.execute()
 
-        for venue in venue_list:
-            lat_average = lat_average + venue["location"]["lat"]
-            lon_average = lon_average + venue["location"]["lon"]
+            for group in results:
+                yield group
 
-        lat_average = lat_average / len(venue_list)
-        lon_average = lon_average / len(venue_list)
+            if len(results.hits) < batch_size:
+                return
 
-        return {"lat": lat_average, "lon": lon_average}
+            search_after = list(results.hits[-1].meta.sort)
 
-    def to_json_dict(self, load_events: bool) -> dict:
+    def to_json_dict(self, load_events: bool, events: Optional[List[Event]] = None) -> dict:
         """
         Convert to_dict into a JSON serializable dict object.
-        Also add a venue dict to the group, for each venue that was used by that group in any event.
+        The venues of the group are stored on the group, so the events are only needed for
+        load_events.
 
         Arguments:
             load_events {bool} -- load events into dict
 
+        Keyword Arguments:
+            events {Optional[List[Event]]} -- already loaded events of the group, use the group
+                                              events when None (default: {None})
+
         Returns:
             dict -- JSON serializable dict object
         """
-
         group_dict: dict = self.to_dict()
 
-        # set group venue
-        group_dict["venues"] = []
-        for event in self.events:
-            group_dict["venues"] = self.add_event_venue_to_list(
-                group_dict["venues"], event
-            )
-
-        if len(group_dict["venues"]) > 0:
-            group_dict["venue_location_average"] = self.get_venue_location_average(
-                group_dict["venues"]
-            )
+        # load events into dict
+        group_dict["events"] = []
+        if load_events:
+            if events is None:
+                events = self.events
+
+            for event in events:
+                event_dict: dict = event.to_dict()
+                event_dict.pop("group_id", None)
+                for event_field in event_dict:
+                    # todo remove double events to reduce bandwith
+                    if isinstance(event_dict[event_field], datetime):
+                        event_dict[event_field] = event_dict[event_field].strftime(
+                            "%Y-%m-%dT%H:%M:%S%z"
+                        )
+                group_dict["events"].append(event_dict)
+
+        # groups without venues has no venues field
+        group_dict.setdefault("venues", [])
 
         for field in group_dict:
-
-            if "events" in group_dict:
-                for event_dict in group_dict["events"]:
-
-                    # load events into dict
-                    if load_events:
-                        for event_field in event_dict:
-                            # todo remove double events to reduce bandwith
-                            if isinstance(event_dict[event_field], datetime):
-                                event_dict[event_field] = event_dict[
-                                    event_field
-                                ].strftime("%Y-%m-%dT%H:%M:%S%z")
-                    else:
-                        group_dict["events"] = []
-
             if isinstance(group_dict[field], datetime):
                 group_dict[field] = group_dict[field].strftime("%Y-%m-%dT%H:%M:%S%z")
 
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from elasticsearch_dsl import Long
+
+from meetup_search.models.index_version import VersionedDocument
+
+
+class IndexGeneration(VersionedDocument):
+    """
+    Generation of the indexed data, wich is bumped by the crawler after writing, so results
+    cached by the rest api can be invalidated across processes
+
+    Usage:
+        generation: int = IndexGeneration.get_generation()
+
+        IndexGeneration.bump()
+    """
+
+    # id of the single generation document
+    DOCUMENT_ID: str = "generation"
+
+    class Index:
+        """
+        Elasticsearch index of the model
+
+        for override the default index ->
+        https://elasticsearch-dsl.readthedocs.io/en/latest/persistence.html#document-life-cycle
+        """
+
+        name = "meetup_index_generation"
+
+    # required fields
+    generation = Long(required=True)
+
+    @staticmethod
+    def get_generation() -> int:
+        """
+        Get the current generation
+
+        Returns:
+            int -- current generation, 0 when the generation was never bumped
+        """
+        index_generation: Optional[IndexGeneration] = IndexGeneration.get(
+            id=IndexGeneration.DOCUMENT_ID, ignore=404
+        )
+        if not index_generation:
+            return 0
+        return index_generation.generation
+
+    @staticmethod
+    def bump() -> int:
+        """
+        Increase the generation with a single atomic update, the document is created on the
+        first bump
+
+        Returns:
+            int -- new generation
+        """
+        response: dict = IndexGeneration._get_connection().update(
+            index=IndexGeneration._default_index(),
+            id=IndexGeneration.DOCUMENT_ID,
+            body={
+                "script": {"source": "ctx._source.generation += 1", "lang": "painless"},
+                "upsert": {"generation": 1},
+            },
+            refresh=True,
+            retry_on_conflict=5,
+            _source_includes="generation",
+        )
+        return response["get"]["_source"]["generation"]
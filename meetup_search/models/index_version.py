@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+from fnmatch import fnmatch
+from typing import Dict, Iterator, List, Optional, Type
+
+from elasticsearch import Elasticsearch
+from elasticsearch_dsl import Document
+
+# version suffix of the physical indices, sortable by the creation time
+INDEX_VERSION_FORMAT: str = "%Y%m%d%H%M%S%f"
+
+
+class VersionedDocument(Document):
+    """
+    Document stored in versioned physical indices like "meetup_group_v20200101000000000000", the
+    Index.name of the document is an alias to the current version. So a new version can be
+    filled, while every search still use the old version, and the alias is switched afterwards.
+    """
+
+    @classmethod
+    def _matches(cls, hit: dict) -> bool:
+        """
+        Check if a search hit is a document of this class, the hits are returned with the name of
+        the physical index & not with the alias
+
+        Arguments:
+            hit {dict} -- raw search hit from elasticsearch
+
+        Returns:
+            bool -- True when the hit is from the alias, from any version of the index or from
+                    the index used by this process
+        """
+        hit_index: str = hit.get("_index", "")
+        return any(
+            fnmatch(hit_index, pattern)
+            for pattern in (cls.Index.name, get_version_pattern(document=cls), cls._index._name)
+        )
+
+
+def get_version_pattern(document: Type[Document]) -> str:
+    """
+    Get the index pattern of all versions of a document index
+
+    Arguments:
+        document {Type[Document]} -- document class
+
+    Returns:
+        str -- index pattern like "meetup_group_v*"
+    """
+    return "{}_v*".format(document.Index.name)
+
+
+def get_index_versions(document: Type[Document]) -> List[str]:
+    """
+    Get all physical index versions of a document, sorted from the oldest to the newest version
+
+    Arguments:
+        document {Type[Document]} -- document class
+
+    Returns:
+        List[str] -- index names
+    """
+    connection: Elasticsearch = document._get_connection()
+    return sorted(connection.indices.get(index=get_version_pattern(document=document)))
+
+
+def get_alias_indices(document: Type[Document]) -> List[str]:
+    """
+    Get the physical indices behind the alias of a document
+
+    Arguments:
+        document {Type[Document]} -- document class
+
+    Returns:
+        List[str] -- index names, empty when there is no alias
+    """
+    connection: Elasticsearch = document._get_connection()
+    if not connection.indices.exists_alias(name=document.Index.name):
+        return []
+    return sorted(connection.indices.get_alias(name=document.Index.name))
+
+
+def get_unfinished_index(document: Type[Document]) -> Optional[str]:
+    """
+    Get the newest index version, wich was created but is not behind the alias, like when the
+    filling of a new version was interrupted
+
+    Arguments:
+        document {Type[Document]} -- document class
+
+    Returns:
+        Optional[str] -- index name, None when there is no unfinished version
+    """
+    alias_indices: List[str] = get_alias_indices(document=document)
+    unfinished_indices: List[str] = [
+        index for index in get_index_versions(document=document) if index not in alias_indices
+    ]
+    if len(unfinished_indices) == 0:
+        return None
+    return unfinished_indices[-1]
+
+
+def create_index_version(document: Type[Document], version: Optional[str] = None) -> str:
+    """
+    Create a new physical index with the current mapping of the document, without an alias
+
+    Arguments:
+        document {Type[Document]} -- document class
+
+    Keyword Arguments:
+        version {Optional[str]} -- version of the index, the current time when None
+                                   (default: {None})
+
+    Returns:
+        str -- name of the new index
+    """
+    if not version:
+        version = datetime.now().strftime(INDEX_VERSION_FORMAT)
+
+    index: str = "{}_v{}".format(document.Index.name, version)
+    document._index.clone(name=index).create()
+    return index
+
+
+def switch_aliases(indices: Dict[Type[Document], str]):
+    """
+    Switch the aliases of the documents atomic to the new index versions & delete all other
+    versions afterwards. When there is still a physical index with the name of the alias, like
+    before the indices was versioned, this index will be deleted in the same request.
+
+    Arguments:
+        indices {Dict[Type[Document], str]} -- document classes with the new index version
+    """
+    if len(indices) == 0:
+        return
+
+    connection: Elasticsearch = list(indices)[0]._get_connection()
+    actions: List[dict] = []
+    for document, index in indices.items():
+        alias: str = document.Index.name
+        alias_indices: List[str] = get_alias_indices(document=document)
+
+        if len(alias_indices) == 0 and connection.indices.exists(index=alias):
+            actions.append({"remove_index": {"index": alias}})
+        for alias_index in alias_indices:
+            actions.append({"remove": {"index": alias_index, "alias": alias}})
+        actions.append({"add": {"index": index, "alias": alias}})
+
+    connection.indices.update_aliases(body={"actions": actions})
+
+    # garbage collect the old versions
+    for document, index in indices.items():
+        for old_index in get_index_versions(document=document):
+            if old_index != index:
+                connection.indices.delete(index=old_index, ignore=404)
+
+
+def delete_unfinished_indices(document: Type[Document]) -> List[str]:
+    """
+    Delete all index versions of a document, wich are not behind the alias
+
+    Arguments:
+        document {Type[Document]} -- document class
+
+    Returns:
+        List[str] -- deleted index names
+    """
+    alias_indices: List[str] = get_alias_indices(document=document)
+    deleted_indices: List[str] = []
+    for index in get_index_versions(document=document):
+        if index not in alias_indices:
+            document._get_connection().indices.delete(index=index, ignore=404)
+            deleted_indices.append(index)
+    return deleted_indices
+
+
+@contextmanager
+def use_indices(indices: Dict[Type[Document], str]) -> Iterator[None]:
+    """
+    Read & write the documents of this process from other indices than the aliases, like to fill
+    a new index version. Searches of other processes like the rest api still use the aliases.
+
+    Usage:
+        with use_indices({Group: create_index_version(Group)}):
+            group.save()
+
+    Arguments:
+        indices {Dict[Type[Document], str]} -- document classes with the index to use
+    """
+    original_indices: dict = {document: document._index for document in indices}
+    try:
+        for document, index in indices.items():
+            document._index = document._index.clone(name=index)
+        yield
+    finally:
+        for document, original_index in original_indices.items():
+            document._index = original_index
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
-from typing import List
+from collections import OrderedDict
+from typing import Iterator, List, Optional
 
-from elasticsearch_dsl import Document, Q, Text
+from elasticsearch_dsl import Keyword, Q, Text
 from elasticsearch_dsl.response import Response
 from elasticsearch_dsl.search import Search
 
+from meetup_search.models.bulk_writer import BulkWriter
+from meetup_search.models.index_version import VersionedDocument
 
-class MeetupZip(Document):
+
+class MeetupZip(VersionedDocument):
     """
     Meetup.com Zip Model with elasticsearch persistence
 
@@ -21,7 +25,8 @@ class MeetupZip(Document):
         GroupDoesNotExists: Raise when request a group wich does not exists on elasticsearch or on meetup
     """
 
-    zip_code = Text(required=True)
+    # keyword sub field for sorting & search_after
+    zip_code = Text(required=True, fields={"keyword": Keyword()})
 
     class Index:
         """
@@ -33,6 +38,12 @@ class MeetupZip(Document):
 
         name = "meetup_zip"
 
+    def clean(self):
+        """
+        Set the document id, called by full_clean on save & on bulk writes
+        """
+        self.meta.id = self.zip_code
+
     @staticmethod
     def get_or_create_zip(zip_code: str) -> MeetupZip:
         """
@@ -46,10 +57,8 @@ class MeetupZip(Document):
         """
 
         # get MeetupZip from elasticsearch. if exists
-        s: Search = MeetupZip.search()
-        s = s.query("match", zip_code=zip_code)
-        results: Response = s.execute()
-        for meetup_zip in results:
+        meetup_zip: Optional[MeetupZip] = MeetupZip.get(id=zip_code, ignore=404)
+        if meetup_zip:
             return meetup_zip
 
         # create a new MeetupZip and save it to elasticsearch
@@ -60,35 +69,58 @@ class MeetupZip(Document):
         return new_meetup_zip
 
     @staticmethod
-    def get_or_create_zips(zip_code_list: List[str]) -> List[MeetupZip]:
+    def get_or_create_zips(zip_code_list: List[str], refresh: str = "true") -> List[MeetupZip]:
         """
-        Get or create a list of MeetupZip objects
+        Get or create a list of MeetupZip objects, all zips are created with bulk create requests,
+        wich skip the existing zips
 
         Arguments:
             zip_code_list {List[str]} -- list of zip codes
 
+        Keyword Arguments:
+            refresh {str} -- elasticsearch refresh mode after the last write (default: {"true"})
+
         Returns:
             List[MeetupZip] -- get or created MeetupZip objects
         """
 
         # remove double entries from list
-        zip_code_list = list(set(zip_code_list))
+        zip_code_list = list(OrderedDict.fromkeys(zip_code_list))
 
         # create return list
-        meetup_zips: List[MeetupZip] = []
+        meetup_zips: List[MeetupZip] = [
+            MeetupZip(zip_code=zip_code) for zip_code in zip_code_list
+        ]
 
-        for zip_code in zip_code_list:
-            meetup_zips.append(MeetupZip.get_or_create_zip(zip_code=zip_code))
+        with BulkWriter(refresh=refresh) as bulk_writer:
+            for meetup_zip in meetup_zips:
+                bulk_writer.create(meetup_zip)
 
         return meetup_zips
 
     @staticmethod
-    def get_all_zips() -> List[MeetupZip]:
+    def get_all_zips(
+        batch_size: int = 500, cursor: Optional[str] = None
+    ) -> Iterator[MeetupZip]:
         """
-        Get all MeetupZip from elasticsearch
+        Stream all MeetupZip from elasticsearch, sorted by zip_code & loaded lazy in batches with
+        search_after
+
+        Usage:
+            for meetup_zip in MeetupZip.get_all_zips():
+                ...
+
+            # resume after the last crawled zip
+            for meetup_zip in MeetupZip.get_all_zips(cursor=last_meetup_zip.zip_code):
+                ...
+
+        Keyword Arguments:
+            batch_size {int} -- how many zips are loaded with a single request (default: {500})
+            cursor {Optional[str]} -- start after this zip_code, start with the first zip when
+                                      None (default: {None})
 
         Returns:
-            List[MeetupZip] -- List of all MeetupZip
+            Iterator[MeetupZip] -- all MeetupZip
         """
         # init search
         search: Search = MeetupZip.search()
@@ -98,14 +130,20 @@ class MeetupZip(Document):
 
         # execute search
         search = search.query(Q(search_query))
+        search = search.sort("zip_code.keyword").extra(size=batch_size)
 
-        # load response from elasticsearch
-        results: Response = search.execute()
+        while True:
+            page: Search = search
+            if cursor:
+                page = search.extra(search_after=[cursor])
 
-        # create return array
-        meetup_zips: List[MeetupZip] = []
+            # load response from elasticsearch
+            results: Response = page.execute()
 
-        for meetup_zip in results.hits:
-            meetup_zips.append(meetup_zip)
+            for meetup_zip in results.hits:
+                yield meetup_zip
 
-        return meetup_zips
+            if len(results.hits) < batch_size:
+                return
+
+            cursor = results.hits[-1].meta.sort[0]
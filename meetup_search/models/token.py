@@ -1,18 +1,20 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta
 from typing import Optional
 
 import requests
-from elasticsearch_dsl import Document, Text
+from elasticsearch_dsl import Date, Text
 from elasticsearch_dsl.response import Response
 from elasticsearch_dsl.search import Search
 from environs import Env
 from requests.models import Response as HttpResponse
 
 from meetup_search.meetup_api_client.exceptions import HttpNoSuccess
+from meetup_search.models.index_version import VersionedDocument
 
 
-class Token(Document):
+class Token(VersionedDocument):
     """
     Meetup OAuth token
     """
@@ -20,6 +22,9 @@ class Token(Document):
     access_token = Text(required=True)
     refresh_token = Text(required=True)
 
+    # utc time when the access_token expires
+    expires_at = Date()
+
     class Index:
         name = "token"
 
@@ -52,10 +57,44 @@ class Token(Document):
         for token in results:
             token.delete()
 
+    def set_expires_in(self, expires_in: int):
+        """
+        set expires_at from the oauth expires_in response value
+
+        Arguments:
+            expires_in {int} -- lifetime of the access_token in secounds
+        """
+        self.expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
+
+    def is_expired(self, margin: int = 0) -> bool:
+        """
+        check if the access_token is expired or will expire in the next margin secounds, a token
+        without expires_at counts as expired
+
+        Keyword Arguments:
+            margin {int} -- secounds before the real expire time (default: {0})
+
+        Returns:
+            bool -- True -> token need to be refreshed; False -> token is still valid
+        """
+        if not self.expires_at:
+            return True
+
+        return self.expires_at - timedelta(seconds=margin) <= datetime.utcnow()
 
-    def get_refresh_token(self, post_url: str = "https://secure.meetup.com/oauth2/access"):
+    def get_refresh_token(
+        self,
+        post_url: str = "https://secure.meetup.com/oauth2/access",
+        session: Optional[requests.Session] = None,
+    ):
         """
         refresh auth token
+
+        Keyword Arguments:
+            post_url {str} -- meetup oauth token url
+                              (default: {"https://secure.meetup.com/oauth2/access"})
+            session {Optional[requests.Session]} -- http session for the refresh request, use a
+                                                    new connection when None (default: {None})
         """
         env: Env = Env()
         data = {
@@ -64,7 +103,10 @@ class Token(Document):
             'grant_type': 'refresh_token',
             'refresh_token': self.refresh_token,
             }
-        response: HttpResponse = requests.post(post_url, data=data)
+        if session:
+            response: HttpResponse = session.post(post_url, data=data)
+        else:
+            response = requests.post(post_url, data=data)
 
         if response.status_code != 200:
             raise HttpNoSuccess(
@@ -77,4 +119,6 @@ class Token(Document):
 
         self.access_token = json_response["access_token"]
         self.refresh_token = json_response["refresh_token"]
+        if "expires_in" in json_response:
+            self.set_expires_in(expires_in=json_response["expires_in"])
         self.save()
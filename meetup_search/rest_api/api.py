@@ -1,14 +1,15 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from elasticsearch_dsl.query import Q
-from elasticsearch_dsl.response import Response
-from elasticsearch_dsl.response.hit import Hit
+from elasticsearch_dsl.response import AggResponse, Response
 from elasticsearch_dsl.search import Search
-from flask_restful import Resource, reqparse
+from flask_restful import Resource, abort, reqparse
 
-from meetup_search.models.group import Group
+from meetup_search.models.group import Event, Group
 
-from .argument_validator import date_validator, positive_int_validator
+from .argument_validator import (cursor_validator, date_validator, encode_cursor,
+                                 positive_int_validator)
+from .result_cache import ResultCache, get_result_cache
 
 
 class MeetupSearchApi(Resource):
@@ -35,6 +36,9 @@ class MeetupSearchApi(Resource):
             choices=(5, 10, 25, 100),
             default=10,
         )
+        self.parser.add_argument(
+            "cursor", type=cursor_validator, help="Bad cursor: {error_msg}",
+        )
 
         # sort
         self.parser.add_argument(
@@ -65,15 +69,63 @@ class MeetupSearchApi(Resource):
             "geo_distance", type=str, help="Bad distance (example: 100km): {error_msg}",
         )
 
+        # map aggregations
+        self.parser.add_argument(
+            "map_bounds", type=bool, help="Bad map bounds: {error_msg}", default=False,
+        )
+        self.parser.add_argument(
+            "map_heatmap_precision",
+            type=int,
+            help="Bad map heatmap precision: {error_msg}",
+            choices=range(0, 30),
+        )
+
     def put(self) -> dict:
         """
-        search for a group in Elasticsearch
+        search for a group in Elasticsearch, the results are cached when the result cache is
+        enabled
 
         Returns:
             dict -- search results
         """
         args = self.parser.parse_args()
 
+        # a cursor continues only a search with the same sort
+        if args["cursor"] and args["cursor"]["sort"] != self.get_sort_fields(args=args):
+            abort(400, message={"cursor": "Bad cursor: The cursor has another sort!"})
+
+        result_cache: Optional[ResultCache] = get_result_cache()
+        if result_cache:
+            return result_cache.get_or_set(
+                endpoint="search", args=args, get_result=lambda: self.search(args=args)
+            )
+        return self.search(args=args)
+
+    @staticmethod
+    def get_sort_fields(args: dict) -> List[str]:
+        """
+        Get the sort fields of a search, without the tiebreaker
+
+        Arguments:
+            args {dict} -- parsed request arguments
+
+        Returns:
+            List[str] -- sort fields, like ["-_score"]
+        """
+        if args["sort"]:
+            return [args["sort"]]
+        return ["-_score"]
+
+    def search(self, args: dict) -> dict:
+        """
+        search for a group in Elasticsearch
+
+        Arguments:
+            args {dict} -- parsed request arguments
+
+        Returns:
+            dict -- search results
+        """
         # init search
         search: Search = Group.search()
 
@@ -99,30 +151,25 @@ class MeetupSearchApi(Resource):
                             },
                         }
                     },
-                    {
-                        "nested": {
-                            "path": "events",
-                            "score_mode": "avg",
-                            "query": {
-                                "bool": {
-                                    "must": [
-                                        {
-                                            "query_string": {
-                                                "query": args["query"],
-                                                "fields": ["*"],
-                                            }
-                                        }
-                                    ]
-                                }
-                            },
-                        }
-                    },
                 ],
                 "must": [],
             }
         }
 
-        # set event time filter
+        # groups with the best matching events, a wildcard query match every group without the
+        # events
+        if args["query"].strip() != "*":
+            search_query["bool"]["should"].append(
+                {
+                    "ids": {
+                        "values": Event.get_top_group_ids(
+                            query={"query_string": {"query": args["query"], "fields": ["*"]}}
+                        )
+                    }
+                }
+            )
+
+        # set event time filter, only groups with an event in the time range are found
         if args["event_time_gte"] or args["event_time_lte"]:
             range_query: dict = {}
             if args["event_time_gte"]:
@@ -131,51 +178,34 @@ class MeetupSearchApi(Resource):
                 range_query["lte"] = args["event_time_lte"]
 
             search_query["bool"]["must"].append(
-                {
-                    "nested": {
-                        "path": "events",
-                        "score_mode": "avg",
-                        "query": {
-                            "bool": {"must": [{"range": {"events.time": range_query}}]}
-                        },
-                    }
-                }
+                {"ids": {"values": Event.get_group_ids(query={"range": {"time": range_query}})}}
             )
 
-        # set geo_distance filter
+        # set geo_distance filter, with the stored venues of the groups
         if args["geo_distance"] and args["geo_lat"] and args["geo_lon"]:
             search_query["bool"]["must"].append(
                 {
-                    "nested": {
-                        "path": "events",
-                        "score_mode": "avg",
-                        "query": {
-                            "bool": {
-                                "must": [
-                                    {
-                                        "geo_distance": {
-                                            "distance": args["geo_distance"],
-                                            "events.venue_location": {
-                                                "lat": args["geo_lat"],
-                                                "lon": args["geo_lon"],
-                                            },
-                                        }
-                                    }
-                                ]
-                            }
-                        },
+                    "geo_distance": {
+                        "distance": args["geo_distance"],
+                        "venues.location": {"lat": args["geo_lat"], "lon": args["geo_lon"]},
                     }
                 }
             )
 
-        # pagination
-        strat_entry: int = args["page"] * args["limit"]
-        end_entry: int = strat_entry + args["limit"]
-        search = search[strat_entry:end_entry]
-
-        # sort
-        if args["sort"]:
-            search = Search().sort(args["sort"])
+        # pagination, with a cursor the page is ignored & the search continues after the last
+        # group of the previous response, so deep pages are as fast as the first page
+        if args["cursor"]:
+            search = search.extra(search_after=args["cursor"]["search_after"])[: args["limit"]]
+        else:
+            strat_entry: int = args["page"] * args["limit"]
+            end_entry: int = strat_entry + args["limit"]
+            search = search[strat_entry:end_entry]
+
+        # sort, the meetup_id is the tiebreaker for groups with the same sort values
+        sort_fields: List[str] = self.get_sort_fields(args=args)
+        search = search.sort(
+            *[Group.get_sort_field(sort) for sort in sort_fields], *Group.SORT_TIEBREAKER
+        )
 
         # execute search
         search = search.query(Q(search_query))
@@ -183,47 +213,189 @@ class MeetupSearchApi(Resource):
         # set highlight score
         search.highlight_options(order="score")
 
+        # load only the group fields of the response
+        search = search.source(excludes=list(Group.SEARCH_SOURCE_EXCLUDES))
+
+        # map aggregations over all found groups & not only the current page
+        self.add_map_aggregations(
+            search=search,
+            bounds=args["map_bounds"],
+            heatmap_precision=args["map_heatmap_precision"],
+        )
+
         # load response from elasticsearch
         results: Response = search.execute()
 
-        # get response
+        # load the events of all found groups with a single search, the venues are stored on
+        # the groups, so the events are only loaded with load_events
+        group_events: Dict[str, List[Event]] = {group.meta.id: [] for group in results.hits}
+        if args["load_events"] and len(group_events) > 0:
+            for event in Event.get_events_of_groups(group_ids=list(group_events)):
+                group_events[event.group_id].append(event)
+
+        # get response, every hit is already a full Group, so there is no need to load the
+        # groups again from elasticsearch
         found_groups: List[dict] = []
-        map_center_lat: float = 0
-        map_center_lon: float = 0
         for group in results.hits:
-
-            group_dict: dict = {}
-            if isinstance(group, Hit):
-                group_object = Group.get_group(urlname=group.to_dict()["urlname"])
-                group_dict = group_object.to_json_dict(load_events=args["load_events"])
-            else:
-                group_dict = group.to_json_dict(load_events=args["load_events"])
-
-            if "venue_location_average" in group_dict:
-                map_center_lat = (
-                    map_center_lat + group_dict["venue_location_average"]["lat"]
-                )
-                map_center_lon = (
-                    map_center_lon + group_dict["venue_location_average"]["lon"]
-                )
-            else:
-                map_center_lat = map_center_lat + group_dict["location"]["lat"]
-                map_center_lon = map_center_lon + group_dict["location"]["lon"]
+            group_dict: dict = group.to_json_dict(
+                load_events=args["load_events"], events=group_events[group.meta.id]
+            )
 
             # add group dict to array
             found_groups.append(
                 {**group_dict,}
             )
 
-        if len(found_groups) > 0:
-            map_center_lat = map_center_lat / len(found_groups)
-            map_center_lon = map_center_lon / len(found_groups)
+        # cursor of the next page, None when there is no next page
+        cursor: Optional[str] = None
+        if len(results.hits) == args["limit"]:
+            cursor = encode_cursor(
+                sort=sort_fields, sort_values=list(results.hits[-1].meta.sort)
+            )
 
-        return {
+        response: dict = {
             "results": found_groups,
             "hits": results.hits.total["value"],
-            "map_center": {"lat": map_center_lat, "lon": map_center_lon},
+            "cursor": cursor,
+            "map_center": self.get_map_center(aggregations=results.aggregations),
         }
+        if args["map_bounds"]:
+            response["map_bounds"] = self.get_map_bounds(aggregations=results.aggregations)
+        if args["map_heatmap_precision"] is not None:
+            response["map_heatmap"] = self.get_map_heatmap(aggregations=results.aggregations)
+
+        return response
+
+    @staticmethod
+    def add_map_aggregations(search: Search, bounds: bool, heatmap_precision: Optional[int]):
+        """
+        Add the map aggregations to a group search, groups with venues are located by the
+        average venue location & groups without venues by the group location
+
+        Arguments:
+            search {Search} -- group search, the aggregations are added in place
+            bounds {bool} -- add the geo bounds of all groups
+            heatmap_precision {Optional[int]} -- zoom level of the geotile heatmap, no heatmap
+                                                 when None
+        """
+        without_venues: dict = {
+            "bool": {"must_not": [{"exists": {"field": "venue_location_average"}}]}
+        }
+
+        search.aggs.metric("venue_center", "geo_centroid", field="venue_location_average")
+        search.aggs.bucket("without_venues", "filter", filter=Q(without_venues)).metric(
+            "location_center", "geo_centroid", field="location"
+        )
+
+        if bounds:
+            search.aggs.metric("venue_bounds", "geo_bounds", field="venue_location_average")
+            search.aggs["without_venues"].metric(
+                "location_bounds", "geo_bounds", field="location"
+            )
+
+        if heatmap_precision is not None:
+            search.aggs.bucket(
+                "heatmap",
+                "geotile_grid",
+                field="location",
+                precision=heatmap_precision,
+                size=10000,
+            ).metric("center", "geo_centroid", field="location")
+
+    @staticmethod
+    def get_map_center(aggregations: AggResponse) -> dict:
+        """
+        Get the center of all found groups from the map aggregations
+
+        Arguments:
+            aggregations {AggResponse} -- aggregations of the group search
+
+        Returns:
+            dict -- {'lat': float, 'lon': float}, {'lat': 0, 'lon': 0} without groups
+        """
+        map_center: dict = {"lat": 0, "lon": 0}
+        count: int = 0
+
+        # merge both centroids weighted by the amount of groups
+        for centroid in (
+            aggregations.venue_center,
+            aggregations.without_venues.location_center,
+        ):
+            if centroid.count == 0:
+                continue
+            map_center["lat"] = map_center["lat"] + centroid.location.lat * centroid.count
+            map_center["lon"] = map_center["lon"] + centroid.location.lon * centroid.count
+            count = count + centroid.count
+
+        if count > 0:
+            map_center["lat"] = map_center["lat"] / count
+            map_center["lon"] = map_center["lon"] / count
+
+        return map_center
+
+    @staticmethod
+    def get_map_bounds(aggregations: AggResponse) -> Optional[dict]:
+        """
+        Get the bounding box of all found groups from the map aggregations
+
+        Arguments:
+            aggregations {AggResponse} -- aggregations of the group search
+
+        Returns:
+            Optional[dict] -- {'top_left': {'lat': float, 'lon': float},
+                               'bottom_right': {'lat': float, 'lon': float}},
+                              None without groups
+        """
+        map_bounds: Optional[dict] = None
+
+        for bounds in (
+            aggregations.venue_bounds,
+            aggregations.without_venues.location_bounds,
+        ):
+            if "bounds" not in bounds:
+                continue
+            if not map_bounds:
+                map_bounds = {
+                    "top_left": dict(bounds.bounds.top_left),
+                    "bottom_right": dict(bounds.bounds.bottom_right),
+                }
+                continue
+            map_bounds["top_left"]["lat"] = max(
+                map_bounds["top_left"]["lat"], bounds.bounds.top_left.lat
+            )
+            map_bounds["top_left"]["lon"] = min(
+                map_bounds["top_left"]["lon"], bounds.bounds.top_left.lon
+            )
+            map_bounds["bottom_right"]["lat"] = min(
+                map_bounds["bottom_right"]["lat"], bounds.bounds.bottom_right.lat
+            )
+            map_bounds["bottom_right"]["lon"] = max(
+                map_bounds["bottom_right"]["lon"], bounds.bounds.bottom_right.lon
+            )
+
+        return map_bounds
+
+    @staticmethod
+    def get_map_heatmap(aggregations: AggResponse) -> List[dict]:
+        """
+        Get the heatmap of the group locations from the map aggregations
+
+        Arguments:
+            aggregations {AggResponse} -- aggregations of the group search
+
+        Returns:
+            List[dict] -- every geotile with groups as {'key': 'zoom/x/y', 'count': int,
+                          'lat': float, 'lon': float}, located at the center of its groups
+        """
+        return [
+            {
+                "key": bucket.key,
+                "count": bucket.doc_count,
+                "lat": bucket.center.location.lat,
+                "lon": bucket.center.location.lon,
+            }
+            for bucket in aggregations.heatmap.buckets
+        ]
 
 
 class MeetupSearchSuggestApi(Resource):
@@ -245,6 +417,24 @@ class MeetupSearchSuggestApi(Resource):
         """
         args = self.parser.parse_args()
 
+        result_cache: Optional[ResultCache] = get_result_cache()
+        if result_cache:
+            return result_cache.get_or_set(
+                endpoint="suggest", args=args, get_result=lambda: self.suggest(args=args)
+            )
+        return self.suggest(args=args)
+
+    def suggest(self, args: dict) -> Dict[str, List[str]]:
+        """
+        Get Suggestion for query term in Group name
+
+        Arguments:
+            args {dict} -- parsed request arguments
+
+        Returns:
+            Dict[str, List[str]] -- a list to 5 suggestions
+        """
+
         # run suggest query
         search: Search = Group.search()
         search = search.suggest(
@@ -260,3 +450,17 @@ class MeetupSearchSuggestApi(Resource):
                 suggestion.append(option.text)
 
         return {"suggestions": suggestion}
+
+
+class ResultCacheStatsApi(Resource):
+    def get(self) -> dict:
+        """
+        Get the hit & miss counters of the result cache
+
+        Returns:
+            dict -- {'enabled': bool, 'hits': int, 'misses': int, 'generation': int}
+        """
+        result_cache: Optional[ResultCache] = get_result_cache()
+        if not result_cache:
+            return {"enabled": False}
+        return {"enabled": True, **result_cache.get_stats()}
@@ -1,4 +1,7 @@
+import base64
+import json
 from datetime import datetime
+from typing import Dict, List
 
 
 def string_list_validator(value: str) -> str:
@@ -75,3 +78,52 @@ def date_validator(value: str) -> str:
         return str(datetime.fromisoformat(value).date())
     except TypeError:
         raise ValueError("Can't convert value to date!")
+
+
+def encode_cursor(sort: List[str], sort_values: List) -> str:
+    """
+    Encode the sort fields of the search & the sort values of the last search hit into an opaque
+    cursor for the next page
+
+    Arguments:
+        sort {List[str]} -- sort fields of the search, like ["-_score"]
+        sort_values {List} -- sort values of a search hit
+
+    Returns:
+        str -- url safe cursor
+    """
+    return base64.urlsafe_b64encode(
+        json.dumps({"sort": sort, "search_after": sort_values}).encode("utf-8")
+    ).decode("ascii")
+
+
+def cursor_validator(value: str) -> Dict[str, List]:
+    """
+    Validate & decode a cursor created by encode_cursor
+
+    Arguments:
+        value {str} -- cursor of a previous search response
+
+    Raises:
+        ValueError: Value is not a valid cursor
+
+    Returns:
+        Dict[str, List] -- {'sort': sort fields of the search, 'search_after': sort values to
+                           search after}
+    """
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(value.encode("ascii")))
+    except (AttributeError, ValueError):
+        raise ValueError("Value is not a valid cursor!")
+
+    if (
+        not isinstance(cursor, dict)
+        or not isinstance(cursor.get("sort"), list)
+        or len(cursor["sort"]) == 0
+        or not all(isinstance(sort, str) for sort in cursor["sort"])
+        or not isinstance(cursor.get("search_after"), list)
+        or len(cursor["search_after"]) == 0
+    ):
+        raise ValueError("Value is not a valid cursor!")
+
+    return {"sort": cursor["sort"], "search_after": cursor["search_after"]}
@@ -0,0 +1,254 @@
+import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app
+
+from meetup_search.models.index_generation import IndexGeneration
+
+
+class CacheBackend(ABC):
+    """
+    Storage of the result cache, a backend has to evict the entries after their ttl
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Get a cached result
+
+        Arguments:
+            key {str} -- cache key
+
+        Returns:
+            Optional[dict] -- cached result, None when the key is not cached or expired
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: dict, ttl: int):
+        """
+        Cache a result
+
+        Arguments:
+            key {str} -- cache key
+            value {dict} -- JSON serializable result
+            ttl {int} -- time to live in secounds
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Remove all cached results
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In process cache backend, with a size bounded LRU eviction
+    """
+
+    def __init__(self, max_size: int = 1000):
+        """
+        Keyword Arguments:
+            max_size {int} -- max amount of cached results, the least recently used result is
+                              removed when the cache is full (default: {1000})
+        """
+        if max_size < 1:
+            raise ValueError("max_size has to be equal or greater than 1!")
+
+        self.max_size: int = max_size
+        self.lock: Lock = Lock()
+
+        # key -> (expire time, result), ordered from the least to the most recently used
+        self.entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            if key not in self.entries:
+                return None
+
+            expires_at, value = self.entries[key]
+            if expires_at <= monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict, ttl: int):
+        with self.lock:
+            self.entries[key] = (monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache backend for a redis server, so the cached results are shared by all processes. The
+    LRU eviction is done by redis with the maxmemory-policy "allkeys-lru".
+
+    The client is passed in, so every client with the redis-py methods get, set, scan_iter &
+    delete can be used, like a local stand-in for testing.
+    """
+
+    def __init__(self, client: Any, prefix: str = "meetup_search:result_cache:"):
+        """
+        Arguments:
+            client {Any} -- redis client
+
+        Keyword Arguments:
+            prefix {str} -- prefix of all cache keys (default: {"meetup_search:result_cache:"})
+        """
+        self.client: Any = client
+        self.prefix: str = prefix
+
+    def get(self, key: str) -> Optional[dict]:
+        value: Optional[bytes] = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: dict, ttl: int):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+class ResultCache:
+    """
+    Cache of rest api responses, keyed by the endpoint & the parsed request arguments. The index
+    generation is part of the key, so all cached results are invalidated when the crawler bumps
+    the generation.
+
+    Usage:
+        result_cache: ResultCache = ResultCache(backend=MemoryCacheBackend(max_size=1000))
+
+        response: dict = result_cache.get_or_set(
+            endpoint="search", args=args, get_result=lambda: search(args)
+        )
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: int = 60,
+        generation_check_interval: float = 5,
+        get_generation: Callable[[], int] = IndexGeneration.get_generation,
+    ):
+        """
+        Arguments:
+            backend {CacheBackend} -- storage of the cached results
+
+        Keyword Arguments:
+            ttl {int} -- time to live of a cached result in secounds (default: {60})
+            generation_check_interval {float} -- the index generation is loaded at most once in
+                                                 this secounds (default: {5})
+            get_generation {Callable[[], int]} -- load the current index generation
+                                                  (default: {IndexGeneration.get_generation})
+        """
+        self.backend: CacheBackend = backend
+        self.ttl: int = ttl
+        self.generation_check_interval: float = generation_check_interval
+        self.get_generation: Callable[[], int] = get_generation
+
+        self.lock: Lock = Lock()
+        self.generation: int = 0
+        self.generation_checked_at: Optional[float] = None
+
+        # statistics
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get_current_generation(self) -> int:
+        """
+        Get the index generation, wich is reloaded after the generation_check_interval
+
+        Returns:
+            int -- index generation
+        """
+        with self.lock:
+            if (
+                self.generation_checked_at is None
+                or monotonic() - self.generation_checked_at >= self.generation_check_interval
+            ):
+                self.generation = self.get_generation()
+                self.generation_checked_at = monotonic()
+            return self.generation
+
+    def get_key(self, endpoint: str, args: Dict[str, Any]) -> str:
+        """
+        Get the cache key of a request, arguments with the same values have the same key
+        regardless of their order
+
+        Arguments:
+            endpoint {str} -- name of the endpoint
+            args {Dict[str, Any]} -- parsed request arguments
+
+        Returns:
+            str -- cache key
+        """
+        return "{}:{}:{}".format(
+            self.get_current_generation(),
+            endpoint,
+            json.dumps(args, sort_keys=True, default=str),
+        )
+
+    def get_or_set(
+        self, endpoint: str, args: Dict[str, Any], get_result: Callable[[], dict]
+    ) -> dict:
+        """
+        Get a cached result or get the result & cache it
+
+        Arguments:
+            endpoint {str} -- name of the endpoint
+            args {Dict[str, Any]} -- parsed request arguments
+            get_result {Callable[[], dict]} -- get the result when it's not cached
+
+        Returns:
+            dict -- cached or new result
+        """
+        key: str = self.get_key(endpoint=endpoint, args=args)
+
+        result: Optional[dict] = self.backend.get(key)
+        if result is not None:
+            with self.lock:
+                self.hits = self.hits + 1
+            return result
+
+        with self.lock:
+            self.misses = self.misses + 1
+
+        result = get_result()
+        self.backend.set(key, result, ttl=self.ttl)
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the cache statistics
+
+        Returns:
+            Dict[str, int] -- {'hits': int, 'misses': int, 'generation': int}
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "generation": self.generation}
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Get the result cache of the current flask app
+
+    Returns:
+        Optional[ResultCache] -- result cache, None when the cache is disabled
+    """
+    return current_app.extensions.get("result_cache")
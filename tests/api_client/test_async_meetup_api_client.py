@@ -0,0 +1,231 @@
+import asyncio
+from threading import Event as ThreadEvent
+from threading import Thread
+from typing import List
+
+import pytest
+from pytest_httpserver import HTTPServer
+
+from meetup_search.meetup_api_client.async_meetup_api_client import (
+    AsyncMeetupApiClient,
+    AsyncRateLimit,
+)
+from meetup_search.meetup_api_client.crawler import SeenSet
+from meetup_search.meetup_api_client.exceptions import (
+    GroupDoesNotExistsOnMeetup,
+    HttpNoSuccess,
+    HttpNotAccessibleError,
+    HttpNotFoundError,
+    HttpNoXRateLimitHeader,
+)
+from meetup_search.models.group import Event, Group
+from tests.meetup_api_demo_response import (RATE_LIMIT_HEADERS, get_event_response,
+                                            get_group_response)
+
+
+def run(coroutine):
+    """
+    run a coroutine until it is complete
+
+    Arguments:
+        coroutine -- coroutine to run
+
+    Returns:
+        coroutine result
+    """
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def get_api_client(httpserver: HTTPServer) -> AsyncMeetupApiClient:
+    """
+    create an async api client for the local fake server
+
+    Arguments:
+        httpserver {HTTPServer} -- local fake meetup server
+
+    Returns:
+        AsyncMeetupApiClient -- api client
+    """
+    api_client: AsyncMeetupApiClient = AsyncMeetupApiClient(max_concurrency=2)
+    api_client.base_url = httpserver.url_for("/")
+    return api_client
+
+
+def test_async_rate_limit():
+    rate_limit: AsyncRateLimit = AsyncRateLimit()
+
+    # hold the thread condition in another thread, the loop must not wait for it
+    locked: ThreadEvent = ThreadEvent()
+    release: ThreadEvent = ThreadEvent()
+
+    def hold_condition():
+        with rate_limit.condition:
+            locked.set()
+            release.wait(timeout=10)
+
+    thread: Thread = Thread(target=hold_condition)
+    thread.start()
+    locked.wait(timeout=10)
+    try:
+        run(asyncio.wait_for(rate_limit.wait_for_next_request(), timeout=1))
+        rate_limit.request_done()
+    finally:
+        release.set()
+        thread.join()
+
+    assert rate_limit.in_flight == 0
+
+
+def test_get(httpserver: HTTPServer):
+    api_client: AsyncMeetupApiClient = get_api_client(httpserver=httpserver)
+
+    httpserver.expect_request("/not-exist").respond_with_data("", status=404)
+    httpserver.expect_request("/gone").respond_with_data("", status=410)
+    httpserver.expect_request("/sandbox").respond_with_json(
+        {"id": 1}, headers=RATE_LIMIT_HEADERS
+    )
+    httpserver.expect_request("/HttpNoXRateLimitHeader").respond_with_json({})
+    httpserver.expect_request("/HttpNoSuccess").respond_with_data("", status=500)
+
+    with pytest.raises(HttpNotFoundError):
+        run(api_client.get("not-exist"))
+
+    with pytest.raises(HttpNotAccessibleError):
+        run(api_client.get("gone"))
+
+    assert run(api_client.get("sandbox")) == {"id": 1}
+
+    with pytest.raises(HttpNoXRateLimitHeader):
+        run(api_client.get("HttpNoXRateLimitHeader", reset_time=0))
+
+    with pytest.raises(HttpNoSuccess):
+        run(api_client.get("HttpNoSuccess"))
+
+    run(api_client.close())
+
+
+def test_get_group(httpserver: HTTPServer):
+    api_client: AsyncMeetupApiClient = get_api_client(httpserver=httpserver)
+
+    httpserver.expect_request("/group_1").respond_with_json(
+        get_group_response(meetup_id=1, urlname="group_1"), headers=RATE_LIMIT_HEADERS
+    )
+    httpserver.expect_request("/not-exist").respond_with_data("", status=404)
+
+    # check existing group
+    group: Group = run(api_client.get_group("group_1"))
+    assert isinstance(group, Group)
+    assert group.urlname == "group_1"
+
+    # check not existing group
+    with pytest.raises(GroupDoesNotExistsOnMeetup):
+        run(api_client.get_group("not-exist"))
+
+    run(api_client.close())
+
+
+def test_update_all_group_events(httpserver: HTTPServer, group_1: Group):
+    api_client: AsyncMeetupApiClient = get_api_client(httpserver=httpserver)
+
+    httpserver.expect_oneshot_request(
+        "/{}/events".format(group_1.urlname)
+    ).respond_with_json(
+        [get_event_response(meetup_id="1"), get_event_response(meetup_id="2")],
+        headers=RATE_LIMIT_HEADERS,
+    )
+    httpserver.expect_request("/{}/events".format(group_1.urlname)).respond_with_json(
+        [get_event_response(meetup_id="2")], headers=RATE_LIMIT_HEADERS
+    )
+
+    events: List[Event] = run(api_client.update_all_group_events(group=group_1))
+    assert len(events) == 2
+    assert len(group_1.events) == 2
+
+    run(api_client.close())
+
+
+def test_get_zip_from_meetup(httpserver: HTTPServer):
+    api_client: AsyncMeetupApiClient = get_api_client(httpserver=httpserver)
+
+    # 2 full pages & a last page
+    for page in range(0, 2):
+        httpserver.expect_oneshot_request("/find/locations").respond_with_json(
+            [{"zip": "{}-{}".format(page, i)} for i in range(0, 5)],
+            headers=RATE_LIMIT_HEADERS,
+        )
+    httpserver.expect_oneshot_request("/find/locations").respond_with_json(
+        [{"zip": "last"}, {"city": "no zip"}], headers=RATE_LIMIT_HEADERS
+    )
+
+    zip_code_list: List[str] = run(
+        api_client.get_zip_from_meetup(lat=52.520008, lon=13.404954, max_entries=5)
+    )
+    assert len(zip_code_list) == 11
+    assert zip_code_list[-1] == "last"
+
+    # every page was requested once
+    assert len(httpserver.log) == 3
+
+    run(api_client.close())
+
+
+def test_search_new_groups(httpserver: HTTPServer):
+    api_client: AsyncMeetupApiClient = get_api_client(httpserver=httpserver)
+
+    # a full page & a last page
+    httpserver.expect_oneshot_request("/find/groups").respond_with_json(
+        [
+            get_group_response(meetup_id=1, urlname="group_1"),
+            get_group_response(meetup_id=2, urlname="group_2"),
+        ],
+        headers=RATE_LIMIT_HEADERS,
+    )
+    httpserver.expect_oneshot_request("/find/groups").respond_with_json(
+        [get_group_response(meetup_id=3, urlname="group_3")],
+        headers=RATE_LIMIT_HEADERS,
+    )
+
+    groups: List[Group] = run(
+        api_client.search_new_groups(zip_code="12345", country_code="DE", max_entries=2)
+    )
+    assert [group.urlname for group in groups] == ["group_1", "group_2", "group_3"]
+
+    run(api_client.close())
+
+
+def test_search_new_groups_seen_groups(httpserver: HTTPServer):
+    api_client: AsyncMeetupApiClient = get_api_client(httpserver=httpserver)
+    seen_groups: SeenSet = SeenSet()
+
+    # two neighboring zips with an overlapping group
+    httpserver.expect_oneshot_request("/find/groups").respond_with_json(
+        [
+            get_group_response(meetup_id=1, urlname="group_1"),
+            get_group_response(meetup_id=2, urlname="group_2"),
+        ],
+        headers=RATE_LIMIT_HEADERS,
+    )
+    httpserver.expect_oneshot_request("/find/groups").respond_with_json(
+        [get_group_response(meetup_id=3, urlname="group_3")], headers=RATE_LIMIT_HEADERS,
+    )
+    httpserver.expect_oneshot_request("/find/groups").respond_with_json(
+        [get_group_response(meetup_id=2, urlname="Group_2")], headers=RATE_LIMIT_HEADERS,
+    )
+
+    groups_1: List[Group] = run(
+        api_client.search_new_groups(
+            zip_code="1", country_code="DE", max_entries=2, seen_groups=seen_groups
+        )
+    )
+    assert [group.urlname for group in groups_1] == ["group_1", "group_2", "group_3"]
+
+    # the group of the first zip is skipped
+    groups_2: List[Group] = run(
+        api_client.search_new_groups(
+            zip_code="2", country_code="DE", max_entries=2, seen_groups=seen_groups
+        )
+    )
+    assert len(groups_2) == 0
+    assert seen_groups.duplicates == 1
+
+    run(api_client.close())
@@ -0,0 +1,76 @@
+import time
+from threading import current_thread
+from typing import Iterator, List
+
+import pytest
+
+from meetup_search.meetup_api_client.crawler import Crawler, SeenSet
+
+
+def test_crawler_single_worker():
+    crawler: Crawler = Crawler()
+
+    # crawl in the calling thread in task order
+    results: List[str] = list(
+        crawler.run(tasks=range(5), crawl=lambda task: current_thread().name)
+    )
+    assert results == [current_thread().name] * 5
+
+
+def test_crawler_workers():
+    crawler: Crawler = Crawler(workers=4)
+
+    def crawl(task: int) -> int:
+        time.sleep(0.5)
+        return task * 2
+
+    # 8 tasks of 0.5 secounds on 4 workers
+    start_time: float = time.time()
+    results: List[int] = list(crawler.run(tasks=range(8), crawl=crawl))
+
+    assert sorted(results) == [task * 2 for task in range(8)]
+    assert time.time() - start_time < 2
+
+
+def test_crawler_lazy_tasks():
+    crawler: Crawler = Crawler(workers=2, max_pending=2)
+    taken: List[int] = []
+
+    def tasks() -> Iterator[int]:
+        for task in range(100):
+            taken.append(task)
+            yield task
+
+    # take only the first result
+    next(crawler.run(tasks=tasks(), crawl=lambda task: task))
+
+    # not all tasks was taken from the iterator
+    assert len(taken) < 100
+
+
+def test_crawler_invalid_workers():
+    with pytest.raises(ValueError):
+        Crawler(workers=0)
+
+
+def test_seen_set():
+    seen_set: SeenSet = SeenSet()
+
+    # new keys are added, seen keys are counted as duplicates
+    assert seen_set.add("group_1") is True
+    assert seen_set.add("group_2") is True
+    assert seen_set.add("group_1") is False
+    assert len(seen_set) == 2
+    assert seen_set.duplicates == 1
+
+
+def test_seen_set_workers():
+    seen_set: SeenSet = SeenSet()
+    crawler: Crawler = Crawler(workers=4)
+
+    # every key is new only once, also when the workers add the same keys at the same time
+    results: List[bool] = list(
+        crawler.run(tasks=[task % 10 for task in range(100)], crawl=seen_set.add)
+    )
+    assert results.count(True) == 10
+    assert seen_set.duplicates == 90
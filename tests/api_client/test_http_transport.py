@@ -0,0 +1,56 @@
+import pytest
+from pytest_httpserver import HTTPServer
+
+from meetup_search.meetup_api_client.exceptions import HttpNoSuccess
+from meetup_search.meetup_api_client.http_transport import HttpTransport
+from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient
+from tests.meetup_api_demo_response import RATE_LIMIT_HEADERS
+
+
+def test_http_transport(httpserver: HTTPServer):
+    transport: HttpTransport = HttpTransport(pool_connections=1, pool_maxsize=1)
+
+    # setup local stand-in server
+    httpserver.expect_request("/get").respond_with_json({"get": True})
+    httpserver.expect_request("/post", method="POST").respond_with_json({"post": True})
+
+    # test get & post over the same session
+    assert transport.get(httpserver.url_for("/get")).json() == {"get": True}
+    assert transport.post(httpserver.url_for("/post"), data={"a": 1}).json() == {
+        "post": True
+    }
+
+    # check if the pooled adapter is mounted for http & https
+    assert transport.session.get_adapter("http://") is transport.session.get_adapter(
+        "https://"
+    )
+
+    transport.close()
+
+
+def test_http_transport_keep_alive():
+    # keep alive is default
+    assert "Connection" not in HttpTransport().session.headers
+
+    # disable keep alive
+    assert HttpTransport(keep_alive=False).session.headers["Connection"] == "close"
+
+
+def test_meetup_api_client_transport(httpserver: HTTPServer):
+    transport: HttpTransport = HttpTransport()
+
+    # inject transport into the api client
+    api_client: MeetupApiClient = MeetupApiClient(transport=transport)
+    assert api_client.transport is transport
+
+    # every request goes through the injected transport
+    httpserver.expect_request("/Meetup-API-Testing").respond_with_json(
+        {"id": 1556336}, headers=RATE_LIMIT_HEADERS
+    )
+    api_client.base_url = httpserver.url_for("/")
+    assert api_client.get(url_path="Meetup-API-Testing")["id"] == 1556336
+
+    # test connection errors
+    api_client.base_url = "http://127.0.0.1:1/"
+    with pytest.raises(HttpNoSuccess):
+        api_client.get(url_path="", reset_time=2)
@@ -1,6 +1,7 @@
 import time
 from datetime import datetime
 from time import sleep
+from typing import List
 
 import pytest
 
@@ -254,6 +255,48 @@ def test_get_event_from_response():
         get_event_from_response(response=event_1_response, group=group_1)
 
 
+@pytest.mark.parametrize("group_events", [0, 5000, 20000])
+def test_get_event_from_response_benchmark(group_events: int):
+    # large group with many known events
+    group_1: Group = get_group_from_response(
+        response=get_group_response(urlname="group_benchmark")
+    )
+    group_1.add_events(
+        [
+            get_event_from_response(
+                response=get_event_response(meetup_id=str(i)), group=group_1
+            )
+            for i in range(0, group_events)
+        ]
+    )
+
+    # parse a full page of 200 events, the first half is already known
+    page: List[dict] = [
+        get_event_response(meetup_id=str(i))
+        for i in range(group_events - 100, group_events + 100)
+    ]
+
+    start_time: float = time.time()
+    new_events: List[Event] = []
+    for event_response in page:
+        try:
+            new_events.append(
+                get_event_from_response(response=event_response, group=group_1)
+            )
+        except EventAlreadyExists:
+            pass
+    duration: float = time.time() - start_time
+
+    print(
+        "{} known events: parsed 200 events in {:.4f}s".format(group_events, duration)
+    )
+
+    assert len(new_events) == 200 - min(group_events, 100)
+
+    # the dedup check doesn't depend on the amount of known events
+    assert duration < 1
+
+
 def test_get_venue_from_response():
     # set group model
     group_1: Group = get_group_from_response(
@@ -1,4 +1,6 @@
 import time
+from datetime import datetime
+from threading import Thread
 from time import sleep
 from typing import List
 
@@ -16,8 +18,11 @@ from meetup_search.meetup_api_client.exceptions import (
     MeetupConnectionError,
 )
 from meetup_search.meetup_api_client.meetup_api_client import MeetupApiClient, RateLimit
+from meetup_search.models.bulk_writer import REFRESH_MODES, BulkWriter
 from meetup_search.models.group import Event, Group
 from pytest_httpserver import HTTPServer
+from tests.meetup_api_demo_response import (RATE_LIMIT_HEADERS, get_event_response,
+                                            get_group_response)
 
 
 def test_wait_for_next_request():
@@ -33,6 +38,35 @@ def test_wait_for_next_request():
     assert time.time() >= rate_limit.reset_time
 
 
+def test_wait_for_next_request_shared():
+    # setup RateLimit with 2 remaining requests in a 2 secound window
+    rate_limit: RateLimit = RateLimit()
+    rate_limit.limit = 2
+    rate_limit.remaining = 2
+    timestamp: float = time.time()
+    rate_limit.reset_time = timestamp + 2
+
+    # 4 worker share the rate limit
+    request_times: List[float] = []
+
+    def request():
+        rate_limit.wait_for_next_request()
+        request_times.append(time.time())
+        rate_limit.request_done()
+
+    threads: List[Thread] = [Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 2 requests pass at once, the other 2 wait for the window reset
+    request_times.sort()
+    assert request_times[1] < timestamp + 1
+    assert request_times[2] >= timestamp + 2
+    assert request_times[3] - request_times[2] < 1
+
+
 def test_update_rate_limit():
     # set start timestamp
     timestamp: float = time.time()
@@ -219,6 +253,107 @@ def test_update_all_group_events(meetup_groups: dict, api_client: MeetupApiClien
     assert len(events_3) == 0
 
 
+def test_get_group_upsert(httpserver: HTTPServer, group_1: Group):
+    httpserver.expect_request("/{}".format(group_1.urlname)).respond_with_json(
+        get_group_response(meetup_id=group_1.meetup_id, urlname=group_1.urlname),
+        headers=RATE_LIMIT_HEADERS,
+    )
+
+    # save group with a event
+    event: Event = Event(
+        meetup_id="0", time=datetime.now(), name="", link="", date_in_series_pattern=False,
+    )
+    group_1.add_event(event)
+    group_1.save()
+    event.save(refresh=True)
+
+    bulk_writer: BulkWriter = BulkWriter()
+    api_client: MeetupApiClient = MeetupApiClient(bulk_writer=bulk_writer)
+    api_client.base_url = httpserver.url_for("/")
+
+    # the group fields are updated without overwriting the stored events
+    group_2: Group = api_client.get_group(group_urlname=group_1.urlname)
+    assert len(group_2.events) == 1
+    assert len(bulk_writer.buffer) == 0
+
+    # the upserted group get refreshed on close
+    bulk_writer.close()
+    groups: List[Group] = list(Group.get_all_groups())
+    assert len(groups) == 1
+    assert groups[0].name == group_2.name
+    assert len(groups[0].events) == 1
+
+
+def serve_event_pages(httpserver: HTTPServer, urlname: str, pages: int):
+    """
+    serve event pages of a group, every page has 2 new events & 1 double event
+
+    Arguments:
+        httpserver {HTTPServer} -- local stand-in server
+        urlname {str} -- group urlname
+        pages {int} -- amount of pages with new events
+    """
+    for page in range(0, pages):
+        httpserver.expect_oneshot_request("/{}/events".format(urlname)).respond_with_json(
+            [
+                get_event_response(meetup_id="{}-{}".format(urlname, page * 2)),
+                get_event_response(meetup_id="{}-{}".format(urlname, page * 2 + 1)),
+                get_event_response(meetup_id="{}-{}".format(urlname, page * 2 + 2)),
+            ],
+            headers=RATE_LIMIT_HEADERS,
+        )
+    httpserver.expect_request("/{}/events".format(urlname)).respond_with_json(
+        [get_event_response(meetup_id="{}-{}".format(urlname, pages * 2))],
+        headers=RATE_LIMIT_HEADERS,
+    )
+
+
+@pytest.mark.parametrize("refresh", REFRESH_MODES)
+def test_update_all_group_events_benchmark(
+    httpserver: HTTPServer, group_1: Group, group_2: Group, refresh: str
+):
+    pages: int = 10
+    serve_event_pages(httpserver=httpserver, urlname=group_1.urlname, pages=pages)
+    serve_event_pages(httpserver=httpserver, urlname=group_2.urlname, pages=pages)
+
+    # sequential baseline, every page is written & refreshed with its own bulk request
+    baseline_client: MeetupApiClient = MeetupApiClient(refresh="true")
+    baseline_client.base_url = httpserver.url_for("/")
+
+    start_time: float = time.time()
+    baseline_events: List[Event] = baseline_client.update_all_group_events(group=group_2)
+    baseline_duration: float = time.time() - start_time
+
+    # buffered, all pages are written with the bulk writer & refreshed like set on close
+    bulk_writer: BulkWriter = BulkWriter(refresh=refresh)
+    api_client: MeetupApiClient = MeetupApiClient(bulk_writer=bulk_writer)
+    api_client.base_url = httpserver.url_for("/")
+
+    start_time = time.time()
+    events: List[Event] = api_client.update_all_group_events(group=group_1)
+    bulk_writer.close()
+    duration: float = time.time() - start_time
+
+    print(
+        "refresh={}: {} pages in {:.3f}s, sequential baseline {:.3f}s".format(
+            refresh, pages, duration, baseline_duration
+        )
+    )
+
+    # the timings are only reported, the buffered run write the same events without errors
+    assert len(events) == pages * 2 + 1
+    assert len(baseline_events) == len(events)
+    assert bulk_writer.indexed >= len(events)
+    assert len(bulk_writer.errors) == 0
+
+    # every page was requested once by both runs
+    assert len(httpserver.log) == 2 * (pages + 1)
+
+    # with refresh the group is searchable right away
+    if refresh != "false":
+        assert len(Group.get_group(urlname=group_1.urlname).events) == len(events)
+
+
 def test_get_max_entries():
     # test min value
     assert MeetupApiClient.get_max_entries(max_entries=-1) == 1
@@ -270,3 +405,19 @@ def test_get_all_zip_from_meetup(api_client: MeetupApiClient):
 #     assert len(groups_2) != len(groups_1)
 #     for group in groups_2:
 #         assert isinstance(group, Group)
+
+
+def test_update_all_group_events_raise_errors(httpserver: HTTPServer, group_1: Group):
+    httpserver.expect_request("/{}/events".format(group_1.urlname)).respond_with_data(
+        status=404, headers=RATE_LIMIT_HEADERS
+    )
+
+    api_client: MeetupApiClient = MeetupApiClient()
+    api_client.base_url = httpserver.url_for("/")
+
+    # stop loading without events
+    assert len(api_client.update_all_group_events(group=group_1)) == 0
+
+    # raise the error, so the caller can retry the group
+    with pytest.raises(MeetupConnectionError):
+        api_client.update_all_group_events(group=group_1, raise_errors=True)
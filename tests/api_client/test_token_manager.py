@@ -0,0 +1,102 @@
+from threading import Thread
+from typing import List
+
+from pytest_httpserver import HTTPServer
+
+from meetup_search.meetup_api_client.token_manager import TokenManager
+from meetup_search.models.token import Token
+
+
+def get_refresh_response(access_token: str, expires_in: int = 3600) -> dict:
+    """
+    create a meetup oauth refresh response
+
+    Arguments:
+        access_token {str} -- new access_token
+
+    Keyword Arguments:
+        expires_in {int} -- lifetime of the new access_token (default: {3600})
+
+    Returns:
+        dict -- oauth refresh response
+    """
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": expires_in,
+        "refresh_token": "refresh",
+    }
+
+
+def test_get_auth_headers_without_token():
+    token_manager: TokenManager = TokenManager(token=None)
+
+    assert token_manager.get_auth_headers() == {}
+    token_manager.refresh()
+    assert token_manager.refresh_count == 0
+
+
+def test_get_auth_headers(httpserver: HTTPServer, auth_token: Token):
+    httpserver.expect_request("/refresh").respond_with_json(
+        get_refresh_response(access_token="new_access")
+    )
+    token_manager: TokenManager = TokenManager(
+        token=auth_token, post_url=httpserver.url_for("/refresh")
+    )
+
+    # token without expires_at will be refreshed once
+    assert token_manager.get_auth_headers() == {"Authorization": "Bearer new_access"}
+    assert token_manager.refresh_count == 1
+
+    # token is valid, so there is no refresh
+    for _ in range(10):
+        assert token_manager.get_auth_headers() == {
+            "Authorization": "Bearer new_access"
+        }
+    assert token_manager.refresh_count == 1
+    assert len(httpserver.log) == 1
+
+    # token expires inside the refresh margin
+    auth_token.set_expires_in(expires_in=token_manager.refresh_margin - 1)
+    token_manager.get_auth_headers()
+    assert token_manager.refresh_count == 2
+
+
+def test_refresh(httpserver: HTTPServer, auth_token: Token):
+    httpserver.expect_request("/refresh").respond_with_json(
+        get_refresh_response(access_token="new_access")
+    )
+    auth_token.set_expires_in(expires_in=3600)
+    token_manager: TokenManager = TokenManager(
+        token=auth_token, post_url=httpserver.url_for("/refresh")
+    )
+
+    # refresh after a rejected access_token
+    token_manager.refresh(rejected_access_token="access")
+    assert token_manager.refresh_count == 1
+    assert auth_token.access_token == "new_access"
+
+    # skip refresh when the rejected access_token was already refreshed
+    token_manager.refresh(rejected_access_token="access")
+    assert token_manager.refresh_count == 1
+
+
+def test_refresh_concurrent(httpserver: HTTPServer, auth_token: Token):
+    httpserver.expect_request("/refresh").respond_with_json(
+        get_refresh_response(access_token="new_access")
+    )
+    token_manager: TokenManager = TokenManager(
+        token=auth_token, post_url=httpserver.url_for("/refresh")
+    )
+
+    # many workers ask for the expired token at the same time
+    threads: List[Thread] = [
+        Thread(target=token_manager.get_auth_headers) for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # only one worker refreshed the token
+    assert token_manager.refresh_count == 1
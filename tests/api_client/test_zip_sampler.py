@@ -0,0 +1,157 @@
+import math
+import random
+from typing import Callable, List, Tuple
+
+import pytest
+
+from meetup_search.meetup_api_client.zip_sampler import Cell, ZipSampler
+
+
+def get_recorded_zip_page(
+    zip_locations: List[Tuple[str, float, float]], max_entries: int, radius: float = 1
+) -> Callable[[float, float, int], List[str]]:
+    """
+    create a fake find/locations endpoint from recorded zip locations, a page return the nearest
+    zips of the location within the radius
+
+    Arguments:
+        zip_locations {List[Tuple[str, float, float]]} -- recorded zips as [zip, lat, lon]
+        max_entries {int} -- entries of a full page
+
+    Keyword Arguments:
+        radius {float} -- search radius in degrees (default: {1})
+
+    Returns:
+        Callable[[float, float, int], List[str]] -- get a page of zips for [lat, lon, offset]
+    """
+
+    def get_zip_page(lat: float, lon: float, offset: int) -> List[str]:
+        distances: List[Tuple[float, str]] = sorted(
+            (math.hypot(zip_lat - lat, zip_lon - lon), zip_code)
+            for zip_code, zip_lat, zip_lon in zip_locations
+        )
+        zip_codes: List[str] = [
+            zip_code for distance, zip_code in distances if distance <= radius
+        ]
+        start: int = offset * max_entries
+        return zip_codes[start:start + max_entries]
+
+    return get_zip_page
+
+
+def get_zip_locations() -> List[Tuple[str, float, float]]:
+    """
+    zip locations of a 8x8 degree boundingbox, with 3 dense cities, sparse land in the west half
+    & no zips in the east half (sea)
+
+    Returns:
+        List[Tuple[str, float, float]] -- zips as [zip, lat, lon]
+    """
+    random.seed(0)
+    zip_locations: List[Tuple[str, float, float]] = []
+
+    for city_lat, city_lon in ((48.5, 1.5), (51, 3), (54.2, 2.2)):
+        for _ in range(0, 400):
+            zip_locations.append(
+                (
+                    "city-{}".format(len(zip_locations)),
+                    random.gauss(city_lat, 0.05),
+                    random.gauss(city_lon, 0.05),
+                )
+            )
+
+    for _ in range(0, 300):
+        zip_locations.append(
+            (
+                "land-{}".format(len(zip_locations)),
+                random.uniform(47, 55),
+                random.uniform(0, 4),
+            )
+        )
+
+    return zip_locations
+
+
+def test_cell_split():
+    cell: Cell = Cell(0, 2, 0, 4)
+    assert cell.center == (1, 2)
+    assert cell.size == 4
+
+    # the quadrants cover the cell
+    children: List[Cell] = cell.split()
+    assert len(children) == 4
+    assert sum((c.max_lat - c.min_lat) * (c.max_lon - c.min_lon) for c in children) == 8
+
+
+def test_zip_sampler_empty_cells():
+    requests: List[Tuple[float, float, int]] = []
+
+    def get_zip_page(lat: float, lon: float, offset: int) -> List[str]:
+        requests.append((lat, lon, offset))
+        return []
+
+    # every start cell is requested once & not split
+    sampler: ZipSampler = ZipSampler(get_zip_page=get_zip_page, max_entries=10)
+    assert sampler.run(min_lat=0, max_lat=4, min_lon=0, max_lon=4) == []
+    assert sampler.requests == 4
+    assert len(requests) == 4
+
+
+def test_zip_sampler_saturated_cells():
+    zip_locations: List[Tuple[str, float, float]] = get_zip_locations()
+    sampler: ZipSampler = ZipSampler(
+        get_zip_page=get_recorded_zip_page(zip_locations=zip_locations, max_entries=50),
+        max_entries=50,
+    )
+
+    # every zip is found once
+    zip_code_list: List[str] = sampler.run(min_lat=47, max_lat=55, min_lon=0, max_lon=8)
+    assert len(zip_code_list) == len(set(zip_code_list))
+    assert len(zip_code_list) >= 0.95 * len(zip_locations)
+
+
+def test_zip_sampler_max_requests():
+    sampler: ZipSampler = ZipSampler(
+        get_zip_page=get_recorded_zip_page(zip_locations=get_zip_locations(), max_entries=50),
+        max_entries=50,
+        max_requests=20,
+    )
+    sampler.run(min_lat=47, max_lat=55, min_lon=0, max_lon=8)
+    assert sampler.requests == 20
+
+    with pytest.raises(ValueError):
+        ZipSampler(get_zip_page=lambda lat, lon, offset: [], max_entries=50, max_requests=0)
+
+
+@pytest.mark.parametrize("radius", [0.5, 1, 100])
+def test_zip_sampler_benchmark(radius: float):
+    zip_locations: List[Tuple[str, float, float]] = get_zip_locations()
+    get_zip_page: Callable[[float, float, int], List[str]] = get_recorded_zip_page(
+        zip_locations=zip_locations, max_entries=50, radius=radius
+    )
+
+    # fixed 0.5 degree grid, every page of every node
+    grid_requests: int = 0
+    grid_zip_codes: set = set()
+    for lat in range(470, 550, 5):
+        for lon in range(0, 80, 5):
+            offset: int = 0
+            while True:
+                zip_page: List[str] = get_zip_page(lat / 10, lon / 10, offset)
+                grid_requests = grid_requests + 1
+                grid_zip_codes.update(zip_page)
+                offset = offset + 1
+                if len(zip_page) < 50:
+                    break
+
+    # adaptive sampler
+    sampler: ZipSampler = ZipSampler(get_zip_page=get_zip_page, max_entries=50)
+    zip_code_list: List[str] = sampler.run(min_lat=47, max_lat=55, min_lon=0, max_lon=8)
+
+    print(
+        "radius {}: grid {} zips with {} requests, sampler {} zips with {} requests".format(
+            radius, len(grid_zip_codes), grid_requests, len(zip_code_list), sampler.requests
+        )
+    )
+    assert sampler.requests < grid_requests
+    assert len(zip_code_list) >= 0.95 * len(grid_zip_codes)
@@ -1,4 +1,8 @@
-from meetup_search.commands.get_groups import get_groups
+import os
+from typing import List
+
+from meetup_search.commands.get_groups import get_groups, get_urlnames
+from meetup_search.models.crawl_state import CrawlState
 from meetup_search.models.group import Group
 from time import sleep
 from flask.app import Flask
@@ -40,3 +44,23 @@ def test_get_groups_without_events(meetup_groups: dict, app: Flask):
 
     # check if group has events
     assert len(group_1.events) == 0
+
+
+def test_get_groups_resume(app: Flask):
+    runner: FlaskCliRunner = app.test_cli_runner()
+
+    # mark every group as done, like when the last run was interrupted at the end
+    meetup_files_path: str = "/app/compose/local/flask/meetup_groups"
+    urlnames: List[str] = list(get_urlnames(meetup_files_path=meetup_files_path))
+    for urlname in urlnames:
+        CrawlState.mark_done(
+            crawl="get_groups:{}".format(os.path.abspath(meetup_files_path)), task=urlname
+        )
+    sleep(1)
+
+    # no group is loaded again
+    result_1: Result = runner.invoke(get_groups, [meetup_files_path, "--resume"])
+    assert result_1.exit_code == 0
+    assert "skip {} groups".format(len(set(urlnames))) in result_1.output
+    sleep(1)
+    assert len(list(Group.get_all_groups())) == 0
@@ -19,7 +19,7 @@ def test_load_zip_codes(app: Flask):
 
     sleep(2)
 
-    assert len(MeetupZip.get_all_zips()) > 0
+    assert len(list(MeetupZip.get_all_zips())) > 0
 
     # force http error
     result_2: Result = runner.invoke(
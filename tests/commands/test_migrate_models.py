@@ -1,3 +1,4 @@
+from datetime import datetime
 from time import sleep
 from typing import List
 
@@ -7,9 +8,12 @@ from elasticsearch.exceptions import NotFoundError
 from flask.app import Flask
 from flask.testing import FlaskCliRunner
 
-from conftest import delte_index
-from meetup_search.commands.migrate_models import migrate_models_command
-from meetup_search.models.group import Group
+from conftest import create_group, delte_index
+from meetup_search.commands.migrate_models import (init_index, migrate_group_event_stats,
+                                                   migrate_group_events, migrate_group_ids,
+                                                   migrate_models_command, migrate_zip_ids,
+                                                   reindex_index)
+from meetup_search.models.group import Event, Group
 from meetup_search.models.meetup_zip import MeetupZip
 
 
@@ -21,9 +25,9 @@ def test_migrate_models_command(app: Flask):
 
     # check if index was deleted
     with pytest.raises(NotFoundError):
-        Group.get_all_groups()
+        list(Group.get_all_groups())
     with pytest.raises(NotFoundError):
-        MeetupZip.get_all_zips()
+        list(MeetupZip.get_all_zips())
 
     # migrate models
     result_1: Result = runner.invoke(migrate_models_command)
@@ -31,5 +35,144 @@ def test_migrate_models_command(app: Flask):
     sleep(2)
 
     # check if indexes was created
-    assert isinstance(Group.get_all_groups(), List)
-    assert isinstance(MeetupZip.get_all_zips(), List)
+    assert isinstance(list(Group.get_all_groups()), List)
+    assert isinstance(list(MeetupZip.get_all_zips()), List)
+
+
+def test_migrate_group_ids():
+    # save groups with random ids, like before the urlname was the id
+    for urlname in ("1", "2", "Two"):
+        Group._get_connection().index(
+            index=Group.Index.name,
+            body=create_group(urlname=urlname).to_dict(),
+            refresh=True,
+        )
+
+    # move the groups, "2" & "Two" are the same group
+    assert migrate_group_ids() == 3
+    sleep(1)
+
+    groups: List[Group] = list(Group.get_all_groups())
+    assert sorted([group.meta.id for group in groups]) == ["1", "two"]
+
+    # groups with the right id are not moved again
+    assert migrate_group_ids() == 0
+
+
+def test_migrate_zip_ids():
+    # save zips with random ids, like before the zip_code was the id
+    for zip_code in ("1", "2", "2"):
+        MeetupZip._get_connection().index(
+            index=MeetupZip.Index.name, body={"zip_code": zip_code}, refresh=True,
+        )
+
+    # move the zips, the double "2" is merged
+    assert migrate_zip_ids() == 3
+    sleep(1)
+
+    meetup_zips: List[MeetupZip] = list(MeetupZip.get_all_zips())
+    assert [meetup_zip.meta.id for meetup_zip in meetup_zips] == ["1", "2"]
+
+    # zips with the right id are not moved again
+    assert migrate_zip_ids() == 0
+
+
+def test_migrate_group_events():
+    # create a group index with nested events, like before the events had a own index
+    delte_index()
+    Group._get_connection().indices.create(
+        index=Group.Index.name,
+        body={"mappings": {"properties": {"events": {"type": "nested"}}}},
+    )
+    Group.init()
+    Event.init()
+
+    group_dict: dict = create_group(urlname="1").to_dict()
+    group_dict["events"] = [
+        {
+            "meetup_id": str(i),
+            "time": "2020-01-0{}T00:00:00".format(i + 1),
+            "name": "",
+            "link": "",
+            "date_in_series_pattern": False,
+        }
+        for i in range(0, 3)
+    ]
+    Group._get_connection().index(
+        index=Group.Index.name, id="1", body=group_dict, refresh=True
+    )
+
+    # move the events into the event index
+    assert migrate_group_events() == 3
+    sleep(1)
+
+    assert len(Group.get_group(urlname="1").events) == 3
+    assert "events" not in Group._get_connection().get(index=Group.Index.name, id="1")[
+        "_source"
+    ]
+
+    # the events are moved only once
+    assert migrate_group_events() == 0
+
+
+def test_migrate_group_event_stats():
+    # save events without updating the group stats
+    for urlname in ("1", "2"):
+        create_group(urlname=urlname).save()
+    for i in range(0, 3):
+        Event(
+            meetup_id=str(i),
+            group_id="1",
+            time=datetime(year=2000 + i, month=1, day=1),
+            name="",
+            link="",
+            date_in_series_pattern=False,
+            venue_name="venue",
+            venue_location={"lat": i % 2, "lon": i % 2},
+        ).save()
+    sleep(1)
+
+    # calculate the stats in batches of one group
+    assert migrate_group_event_stats(batch_size=1) == 1
+    sleep(1)
+
+    group_1: Group = Group.get_group(urlname="1")
+    assert group_1.event_count == 3
+    assert group_1.first_event_time == datetime(year=2000, month=1, day=1)
+    assert group_1.last_event_time == datetime(year=2002, month=1, day=1)
+    assert len(group_1.venues) == 2
+    assert group_1.venue_location_average["lat"] == 0.5
+    assert Group.get_group(urlname="2").event_count is None
+
+    # groups with statistics are not calculated again
+    assert migrate_group_event_stats(batch_size=1) == 0
+
+
+def test_reindex_index():
+    # create a event index with a text meetup_id, like before the keyword mapping
+    delte_index()
+    Event._get_connection().indices.create(
+        index=Event.Index.name,
+        body={"mappings": {"properties": {"meetup_id": {"type": "text"}}}},
+    )
+    Event._get_connection().index(
+        index=Event.Index.name,
+        id="1",
+        body={"meetup_id": "1", "group_id": "1", "time": "2020-01-01T00:00:00"},
+        refresh=True,
+    )
+
+    # the mapping can't be updated
+    assert init_index(Event) is False
+
+    # recreate the index with the new mapping
+    assert reindex_index(Event) == 1
+    mapping: dict = Event._get_connection().indices.get_mapping(index=Event.Index.name)
+    assert len(mapping) == 1
+    assert (
+        list(mapping.values())[0]["mappings"]["properties"]["meetup_id"]["type"] == "keyword"
+    )
+    assert [event.meetup_id for event in Event.get_group_events(group_id="1")] == ["1"]
+
+    # the new mapping can be updated
+    assert init_index(Event) is True
@@ -1,3 +1,11 @@
+# rate limit headers of every meetup api response, for the local stand-in server
+RATE_LIMIT_HEADERS: dict = {
+    "X-RateLimit-Limit": "30",
+    "X-RateLimit-Remaining": "30",
+    "X-RateLimit-Reset": "10",
+}
+
+
 def get_member_response(meetup_id: int = 1, content: bool = False) -> dict:
     """
     create a Member response
@@ -0,0 +1,158 @@
+from datetime import datetime
+from typing import List
+
+import pytest
+
+from conftest import create_group
+from meetup_search.models.bulk_writer import BulkWriter
+from meetup_search.models.group import Group
+
+
+def test_bulk_writer_flush_by_docs():
+    bulk_writer: BulkWriter = BulkWriter(max_docs=10)
+
+    # add 9 groups, so there is no flush
+    groups: List[Group] = []
+    for i in range(0, 9):
+        group: Group = create_group(urlname=str(i), name=str(i))
+        bulk_writer.save(group)
+        groups.append(group)
+    assert len(bulk_writer.buffer) == 9
+    assert bulk_writer.indexed == 0
+
+    # the 10th group flush the buffer
+    bulk_writer.save(create_group(urlname="9", name="9"))
+    assert len(bulk_writer.buffer) == 0
+    assert bulk_writer.indexed == 10
+
+    # check if the elasticsearch meta was set on the documents
+    for group in groups:
+        assert group.meta.id is not None
+
+    # check if the groups are searchable after close
+    bulk_writer.close()
+    assert len(list(Group.get_all_groups())) == 10
+
+
+def test_bulk_writer_flush_by_bytes():
+    bulk_writer: BulkWriter = BulkWriter(max_bytes=1)
+
+    # every group is larger than one byte
+    bulk_writer.save(create_group(urlname="1"))
+    assert len(bulk_writer.buffer) == 0
+    assert bulk_writer.indexed == 1
+
+
+def test_bulk_writer_save_twice():
+    # save the same group twice before flushing
+    with BulkWriter() as bulk_writer:
+        group: Group = create_group(urlname="1", name="old")
+        bulk_writer.save(group)
+        group.name = "new"
+        bulk_writer.save(group)
+        assert len(bulk_writer.buffer) == 1
+
+    # check if only the last version was saved
+    groups: List[Group] = list(Group.get_all_groups())
+    assert len(groups) == 1
+    assert groups[0].name == "new"
+    assert groups[0].name_suggest == "new"
+
+
+def test_bulk_writer_errors():
+    bulk_writer: BulkWriter = BulkWriter()
+
+    # latitude has to be between -90 & 90
+    bulk_writer.save(create_group(urlname="1", lat=1000, lon=1000))
+    bulk_writer.close()
+
+    assert bulk_writer.indexed == 0
+    assert len(bulk_writer.errors) == 1
+    assert "error" in bulk_writer.errors[0]
+
+
+def test_bulk_writer_create():
+    # create a group, wich is not stored
+    with BulkWriter() as bulk_writer:
+        bulk_writer.create(create_group(urlname="1", name="old"))
+    assert bulk_writer.indexed == 1
+
+    # an existing group is skipped & not overwritten
+    with BulkWriter() as bulk_writer:
+        bulk_writer.create(create_group(urlname="1", name="new"))
+    assert bulk_writer.indexed == 0
+    assert bulk_writer.skipped == 1
+    assert len(bulk_writer.errors) == 0
+
+    groups: List[Group] = list(Group.get_all_groups())
+    assert len(groups) == 1
+    assert groups[0].name == "old"
+
+
+def test_bulk_writer_refresh():
+    # invalid refresh mode
+    with pytest.raises(ValueError):
+        BulkWriter(refresh="invalid")
+
+    # wait for the last bulk request
+    with BulkWriter(refresh="wait_for") as bulk_writer:
+        bulk_writer.save(create_group(urlname="1"))
+    assert len(list(Group.get_all_groups())) == 1
+
+    # refresh after the last bulk request
+    with BulkWriter(refresh="true") as bulk_writer:
+        bulk_writer.save(create_group(urlname="2"))
+    assert len(list(Group.get_all_groups())) == 2
+
+
+def test_bulk_writer_update():
+    group: Group = create_group(urlname="1", name="old")
+    group.save(refresh=True)
+
+    # update only the selected fields
+    with BulkWriter() as bulk_writer:
+        group.name = "new"
+        group.event_count = 1
+        group.last_event_time = datetime(year=2020, month=1, day=1)
+        bulk_writer.update(group, fields=["event_count", "last_event_time"])
+        bulk_writer.update(group, fields=["event_count", "last_event_time"])
+        assert len(bulk_writer.buffer) == 1
+    assert bulk_writer.indexed == 1
+
+    group_2: Group = Group.get_group(urlname="1")
+    assert group_2.name == "old"
+    assert group_2.event_count == 1
+    assert group_2.last_event_time == datetime(year=2020, month=1, day=1)
+
+
+def test_bulk_writer_delete():
+    group: Group = create_group(urlname="1")
+    group.save(refresh=True)
+
+    # delete the stored group, a not existing group is skipped
+    with BulkWriter() as bulk_writer:
+        bulk_writer.delete(group)
+        bulk_writer.delete(Group(meta={"id": "2"}))
+    assert bulk_writer.indexed == 1
+    assert bulk_writer.skipped == 1
+    assert len(bulk_writer.errors) == 0
+
+    assert len(list(Group.get_all_groups())) == 0
+
+
+def test_bulk_writer_update_merge():
+    group: Group = create_group(urlname="1", name="old")
+    group.save(refresh=True)
+
+    # the buffered updates of the same group are merged
+    with BulkWriter() as bulk_writer:
+        group.event_count = 1
+        group.last_event_time = datetime(year=2020, month=1, day=1)
+        bulk_writer.update(group, fields=["event_count"])
+        bulk_writer.update(group, fields=["last_event_time"])
+        assert len(bulk_writer.buffer) == 1
+    assert bulk_writer.indexed == 1
+
+    group_2: Group = Group.get_group(urlname="1")
+    assert group_2.event_count == 1
+    assert group_2.last_event_time == datetime(year=2020, month=1, day=1)
@@ -0,0 +1,31 @@
+from time import sleep
+
+from meetup_search.models.bulk_writer import BulkWriter
+from meetup_search.models.crawl_state import CrawlState
+
+
+def test_crawl_state_mark_done():
+    # no done tasks
+    assert CrawlState.get_done_tasks(crawl="load_groups:DE") == set()
+
+    # mark tasks as done, a task is saved only once
+    CrawlState.mark_done(crawl="load_groups:DE", task="meetup1")
+    CrawlState.mark_done(crawl="load_groups:DE", task="meetup1")
+    with BulkWriter() as bulk_writer:
+        CrawlState.mark_done(crawl="load_groups:DE", task="meetup2", bulk_writer=bulk_writer)
+        CrawlState.mark_done(crawl="load_groups:AT", task="meetup3", bulk_writer=bulk_writer)
+    sleep(1)
+
+    assert CrawlState.get_done_tasks(crawl="load_groups:DE") == {"meetup1", "meetup2"}
+    assert CrawlState.get_done_tasks(crawl="load_groups:AT") == {"meetup3"}
+
+
+def test_crawl_state_reset():
+    CrawlState.mark_done(crawl="load_groups:DE", task="meetup1")
+    CrawlState.mark_done(crawl="load_groups:AT", task="meetup2")
+    sleep(1)
+
+    # only the state of the crawl is deleted
+    CrawlState.reset(crawl="load_groups:DE")
+    assert CrawlState.get_done_tasks(crawl="load_groups:DE") == set()
+    assert CrawlState.get_done_tasks(crawl="load_groups:AT") == {"meetup2"}
@@ -1,55 +1,37 @@
 import pytest
-from meetup_search.models.group import Event, Group, Topic
+from meetup_search.models.group import Event, Group, GroupMeetupId, Topic
 from time import sleep
 from datetime import datetime
 from typing import List
 from meetup_search.meetup_api_client.exceptions import GroupDoesNotExists
+from conftest import create_group
 
 
-def test_group_get_or_create_by_urlname(group_2: Group):
+def test_group_upsert(group_1: Group):
     # test with non exiting Group
-    group_1: Group = Group.get_or_create_by_urlname(
-        urlname=group_2.urlname,
-        meetup_id=0,
-        created=datetime.now(),
-        description="",
-        name="",
-        link="",
-        lat=0,
-        lon=0,
-        members=0,
-        status="",
-        timezone="",
-        visibility="",
+    assert group_1.upsert() == "created"
+    assert len(group_1.events) == 0
+
+    # add events to the stored group
+    event: Event = Event(
+        meetup_id="0", time=datetime.now(), name="", link="", date_in_series_pattern=False,
     )
-    sleep(1)
+    group_1.add_event(event)
+    event.save(refresh=True)
 
-    # assert if request does not exist
-    assert isinstance(group_1, Group)
-    assert group_1.meetup_id == 0
+    # update the group with a new object without events
+    group_2: Group = create_group(urlname=group_1.urlname, name="new")
+    assert group_2.upsert() == "updated"
 
-    # test with exiting Group
-    group_2.save()
-    sleep(1)
+    # the events wasn't overwritten & are loaded into the group
+    assert len(group_2.events) == 1
+    group_3: Group = Group.get_group(urlname=group_1.urlname)
+    assert group_3.name == "new"
+    assert group_3.name_suggest == "new"
+    assert len(group_3.events) == 1
 
-    # assert if request does exist
-    group_3: Group = Group.get_or_create_by_urlname(
-        urlname=group_2.urlname,
-        meetup_id=0,
-        created=datetime.now(),
-        description="",
-        name="",
-        link="",
-        lat=0,
-        lon=0,
-        members=0,
-        status="",
-        timezone="",
-        visibility="",
-    )
-    assert isinstance(group_3, Group)
-    assert group_3.urlname == group_2.urlname
-    assert group_3.meetup_id == group_2.meetup_id
+    # nothing changed, the same object has the same created time & the stored statistics
+    assert group_2.upsert() == "noop"
 
 
 def test_group_add_event(group_1: Group):
@@ -68,7 +50,7 @@ def test_group_add_event(group_1: Group):
         )
 
         group_1.add_event(event=event)
-        group_1.save()
+        event.save()
         sleep(1)
 
         group_2: Group = Group.get_group(urlname=group_1.urlname)
@@ -98,7 +80,8 @@ def test_group_add_events(group_1: Group):
 
     # add events to group
     group_1.add_events(events)
-    group_1.save()
+    for event in events:
+        event.save()
     sleep(1)
 
     # check if events was added
@@ -137,6 +120,89 @@ def test_group_event_exists(group_1: Group, group_2: Group):
     assert group_2.event_exists(event_meetup_id=search_event.meetup_id) is False
 
 
+def test_group_event_ids(group_1: Group):
+    # save events without the group object
+    group_1.save()
+    for i in range(0, 3):
+        event: Event = Event(
+            meetup_id=str(i),
+            group_id=group_1.meta.id,
+            time=datetime.now(),
+            name="",
+            link="",
+            date_in_series_pattern=False,
+        )
+        event.save()
+    sleep(1)
+
+    # only the ids are loaded, not the events
+    group_2: Group = Group.get_group(urlname=group_1.urlname)
+    assert group_2.event_ids == {"0", "1", "2"}
+    assert group_2._events is None
+    assert group_2.event_exists(event_meetup_id="1") is True
+
+    # added events are kept in sync
+    group_2.add_event(
+        Event(
+            meetup_id="3",
+            time=datetime.now(),
+            name="",
+            link="",
+            date_in_series_pattern=False,
+        )
+    )
+    assert group_2.event_exists(event_meetup_id="3") is True
+    assert len(group_2.events) == 4
+
+
+def test_group_event_stats(group_1: Group):
+    # no events
+    assert group_1.upsert() == "created"
+    assert group_1.event_count is None
+    assert group_1.last_event_time is None
+
+    # add events without loading the stored events
+    for i, year in enumerate((2010, 2000, 2020)):
+        group_1.add_event(
+            Event(
+                meetup_id=str(i),
+                time=datetime(year=year, month=1, day=1),
+                name="",
+                link="",
+                date_in_series_pattern=False,
+            )
+        )
+    assert group_1._events is None
+    assert group_1.event_count == 3
+    assert group_1.first_event_time == datetime(year=2000, month=1, day=1)
+    assert group_1.last_event_time == datetime(year=2020, month=1, day=1)
+
+    # the same event is counted only once
+    group_1.add_event(
+        Event(
+            meetup_id="0",
+            time=datetime(year=2030, month=1, day=1),
+            name="",
+            link="",
+            date_in_series_pattern=False,
+        )
+    )
+    assert group_1.event_count == 3
+
+    # the stats are returned by the upsert of a group object without events
+    group_1.update(
+        refresh=True,
+        event_count=group_1.event_count,
+        first_event_time=group_1.first_event_time,
+        last_event_time=group_1.last_event_time,
+    )
+    group_2: Group = create_group(urlname=group_1.urlname)
+    group_2.upsert()
+    assert group_2.event_count == 3
+    assert group_2.first_event_time == datetime(year=2000, month=1, day=1)
+    assert group_2.last_event_time == datetime(year=2020, month=1, day=1)
+
+
 def test_group_get_group(group_1: Group):
     # check when there is no group
     with pytest.raises(GroupDoesNotExists):
@@ -223,6 +289,153 @@ def test_group_delete_if_exists(group_1: Group):
         Group.get_group(urlname=group_1.urlname)
 
 
+def test_group_delete_if_exists_events(group_1: Group):
+    # save group with events
+    group_1.save()
+    for i in range(0, 5):
+        event: Event = Event(
+            meetup_id=str(i),
+            time=datetime.now(),
+            name="",
+            link="",
+            date_in_series_pattern=False,
+        )
+        group_1.add_event(event)
+        event.save()
+    sleep(1)
+
+    # the events are deleted with the group
+    assert Group.delete_if_exists(urlname=group_1.urlname) is True
+    sleep(1)
+    assert len(list(Event.get_group_events(group_id=group_1.meta.id))) == 0
+
+
+def test_event_index(group_1: Group, group_2: Group):
+    # every event is a own document with a reference to the group
+    for group in (group_1, group_2):
+        group.save()
+        for i in range(0, 3):
+            event: Event = Event(
+                meetup_id="{}-{}".format(group.urlname, i),
+                time=datetime(year=2000 + i, month=1, day=1),
+                name="event {}".format(group.urlname),
+                link="",
+                date_in_series_pattern=False,
+            )
+            if i == 0:
+                event.venue_name = "venue {}".format(group.urlname)
+                event.venue_location = {"lat": 52.52, "lon": 13.40}
+            group.add_event(event)
+            event.save()
+            assert event.meta.id == event.meetup_id
+            assert event.group_id == group.meta.id
+    sleep(1)
+
+    # load the events of both groups with a single search sorted by time
+    events: List[Event] = list(
+        Event.get_events_of_groups(group_ids=[group_1.meta.id, group_2.meta.id])
+    )
+    assert len(events) == 6
+    assert events[0].time <= events[-1].time
+
+    # load only the venues of the events with a venue
+    venue_events: List[Event] = list(
+        Event.get_events_of_groups(
+            group_ids=[group_1.meta.id, group_2.meta.id],
+            source_fields=list(Event.VENUE_FIELDS),
+            only_with_venue=True,
+        )
+    )
+    assert len(venue_events) == 2
+    for event in venue_events:
+        assert event.venue_name is not None
+        assert event.name is None
+
+    # the stored events are loaded lazy into the group
+    assert len(Group.get_group(urlname=group_1.urlname).events) == 3
+
+    # get the groups of matching events
+    assert Event.get_group_ids(
+        query={"match": {"name": group_2.urlname}}
+    ) == [group_2.meta.id]
+
+    # the group ids are loaded in batches
+    assert sorted(Event.get_group_ids(query={"match_all": {}}, batch_size=1)) == sorted(
+        [group_1.meta.id, group_2.meta.id]
+    )
+
+    # only the groups with the best matching events are kept
+    assert Event.get_top_group_ids(
+        query={"match": {"name": group_2.urlname}}, max_groups=1
+    ) == [group_2.meta.id]
+    assert len(Event.get_top_group_ids(query={"match_all": {}}, max_groups=1)) == 1
+
+
+def test_group_id(group_1: Group):
+    # the document id is the lowercase urlname
+    group_1.urlname = "My-Group"
+    group_1.save()
+    assert group_1.meta.id == "my-group"
+
+    # get the group by id without a refresh & case insensitive
+    assert Group.get_group(urlname="my-group").urlname == "My-Group"
+
+    # save the same group with a new object, so it replace the old document
+    group_2: Group = create_group(urlname="My-Group", name="new")
+    group_2.save()
+    sleep(1)
+
+    groups: List[Group] = list(Group.get_all_groups())
+    assert len(groups) == 1
+    assert groups[0].name == "new"
+
+
+def test_group_get_group_by_meetup_id(group_1: Group):
+    # check when there is no group
+    with pytest.raises(GroupDoesNotExists):
+        Group.get_group_by_meetup_id(meetup_id=group_1.meetup_id)
+
+    # save group
+    group_1.save()
+    sleep(1)
+
+    assert Group.get_group_by_meetup_id(meetup_id=group_1.meetup_id).urlname == "1"
+
+
+def test_group_upsert_renamed(group_1: Group):
+    # save group with the old urlname, only groups with a meetup_id are merged
+    group_1.meetup_id = 1
+    event: Event = Event(
+        meetup_id="0", time=datetime.now(), name="", link="", date_in_series_pattern=False,
+    )
+    group_1.add_event(event)
+    assert group_1.upsert() == "created"
+    event.save()
+    assert GroupMeetupId.get_group_id(meetup_id=group_1.meetup_id) == group_1.meta.id
+
+    # the group changed the urlname on meetup, the old group is found with a realtime get
+    # without a refresh
+    group_2: Group = create_group(urlname="renamed", meetup_id=group_1.meetup_id)
+    assert group_2.upsert(refresh="true") == "created"
+    assert GroupMeetupId.get_group_id(meetup_id=group_1.meetup_id) == group_2.meta.id
+
+    # check if the group was moved with all events
+    assert len(group_2.events) == 1
+    with pytest.raises(GroupDoesNotExists):
+        Group.get_group(urlname=group_1.urlname)
+    assert len(Group.get_group(urlname="renamed").events) == 1
+    assert len(list(Group.get_all_groups())) == 1
+
+
+def test_group_upsert_without_meetup_id():
+    # groups without a meetup_id are not the same group
+    assert create_group(urlname="1", meetup_id=0).upsert(refresh="true") == "created"
+    assert create_group(urlname="2", meetup_id=0).upsert(refresh="true") == "created"
+
+    assert len(list(Group.get_all_groups())) == 2
+    assert GroupMeetupId.get_group_id(meetup_id=0) is None
+
+
 def test_group_add_topic(group_1: Group):
     # init group model
     group_1.save()
@@ -244,7 +457,7 @@ def test_group_add_topic(group_1: Group):
 
 def test_get_all_groups(group_1: Group, group_2: Group):
     # test with no group in es
-    groups_1: List[Group] = Group.get_all_groups()
+    groups_1: List[Group] = list(Group.get_all_groups())
     assert len(groups_1) == 0
 
     # init groups
@@ -253,12 +466,69 @@ def test_get_all_groups(group_1: Group, group_2: Group):
     sleep(1)
 
     # test with 2 group in es
-    groups_2: List[Group] = Group.get_all_groups()
+    groups_2: List[Group] = list(Group.get_all_groups())
     assert len(groups_2) == 2
     assert isinstance(groups_2[0], Group)
 
 
-def test_add_event_venue_to_list():
+def test_get_all_groups_last_event_before():
+    # groups without events, with an old & with a new last event
+    create_group(urlname="1", meetup_id=1).save()
+    group_2: Group = create_group(urlname="2", meetup_id=2)
+    group_2.last_event_time = datetime(year=2000, month=1, day=1)
+    group_2.save()
+    group_3: Group = create_group(urlname="3", meetup_id=3)
+    group_3.last_event_time = datetime.now()
+    group_3.save()
+    sleep(1)
+
+    groups: List[Group] = list(
+        Group.get_all_groups(last_event_before=datetime(year=2010, month=1, day=1))
+    )
+    assert [group.urlname for group in groups] == ["1", "2"]
+
+
+def test_get_all_groups_batches():
+    # init more groups than fit into a single batch
+    for i in range(0, 25):
+        create_group(urlname=str(i), meetup_id=i).save()
+    sleep(1)
+
+    # stream all groups in batches of 10
+    groups: List[Group] = list(Group.get_all_groups(batch_size=10))
+    assert len(groups) == 25
+    assert [group.meetup_id for group in groups] == list(range(0, 25))
+
+    # load only selected fields
+    for group in Group.get_all_groups(batch_size=10, source_fields=["urlname"]):
+        assert group.urlname is not None
+        assert group.name is None
+
+
+def test_get_all_groups_same_meetup_id():
+    # groups without a meetup_id share the same sort value across the batches
+    for i in range(0, 25):
+        create_group(urlname="group-{}".format(i), meetup_id=0).save()
+    sleep(1)
+
+    groups: List[Group] = list(Group.get_all_groups(batch_size=10))
+    assert sorted(group.urlname for group in groups) == sorted(
+        "group-{}".format(i) for i in range(0, 25)
+    )
+
+
+def test_group_get_sort_field():
+    # text fields are sorted by the keyword sub field
+    assert Group.get_sort_field("urlname") == "urlname.keyword"
+    assert Group.get_sort_field("-country") == "-country.keyword"
+
+    # other fields are sortable
+    assert Group.get_sort_field("-meetup_id") == "-meetup_id"
+    assert Group.get_sort_field("description") == "description"
+    assert Group.get_sort_field("unknown") == "unknown"
+
+
+def test_add_venue(group_1: Group):
     event: Event = Event(
         meetup_id=0,
         created=datetime.now(),
@@ -269,54 +539,37 @@ def test_add_event_venue_to_list():
     )
 
     # check with event without venue
-    venue_list_1: List[dict] = Group.add_event_venue_to_list(venue_list=[], event=event)
-    assert len(venue_list_1) == 0
+    assert group_1.add_venue(event=event) is False
+    assert not group_1.venues
+    assert not group_1.venue_location_average
 
     # add venue to event
     event.venue_name = "Café"
-    event.venue_location = [52.520008, 13.404954]
+    event.venue_location = {"lat": 10, "lon": 20}
 
     # check with any previous event
-    venue_list_2: List[dict] = Group.add_event_venue_to_list(
-        venue_list=venue_list_1, event=event
-    )
-    assert len(venue_list_2) == 1
+    assert group_1.add_venue(event=event) is True
+    assert len(group_1.venues) == 1
+    assert group_1.venue_location_average["lat"] == 10
+    assert group_1.venue_location_average["lon"] == 20
 
     # add again the same event
-    venue_list_3: List[dict] = Group.add_event_venue_to_list(
-        venue_list=venue_list_2, event=event
-    )
-    assert len(venue_list_3) == 1
+    assert group_1.add_venue(event=event) is False
+    assert len(group_1.venues) == 1
 
     # add a different event
-    event.venue_location = [51.050407, 13.737262]
-    venue_list_4: List[dict] = Group.add_event_venue_to_list(
-        venue_list=venue_list_3, event=event
-    )
-    assert len(venue_list_4) == 2
+    event.venue_location = {"lat": 20, "lon": 40}
+    assert group_1.add_venue(event=event) is True
+    assert len(group_1.venues) == 2
+    assert group_1.venue_location_average["lat"] == 15
+    assert group_1.venue_location_average["lon"] == 30
 
-
-def test_get_venue_location_average():
-    # test with empty venue arry
-    with pytest.raises(ValueError):
-        Group.get_venue_location_average(venue_list=[])
-
-    # test average with a single event
-    venue_list: List[dict] = [{"location": {"lat": 10, "lon": 10}}]
-
-    venue_average_1: dict = Group.get_venue_location_average(venue_list=venue_list)
-    assert venue_average_1["lat"] == 10
-    assert venue_average_1["lon"] == 10
-
-    # test with mmutiple venues
-    venue_list.append({"location": {"lat": 20, "lon": 20}})
-    venue_list.append({"location": {"lat": 30, "lon": 30}})
-    venue_list.append({"location": {"lat": 40, "lon": 40}})
-    venue_list.append({"location": {"lat": 50, "lon": 50}})
-
-    venue_average_2: dict = Group.get_venue_location_average(venue_list=venue_list)
-    assert venue_average_2["lat"] == 30
-    assert venue_average_2["lon"] == 30
+    # the venues are stored on the group & deduplicated with the stored venues
+    group_1.save()
+    group_2: Group = Group.get_group(urlname=group_1.urlname)
+    assert len(group_2.venues) == 2
+    assert group_2.add_venue(event=event) is False
+    assert group_2.venue_location_average["lat"] == 15
 
 
 def test_to_json_dict(group_1: Group):
@@ -0,0 +1,17 @@
+from meetup_search.models.index_generation import IndexGeneration
+
+
+def test_index_generation_bump():
+    generation: int = IndexGeneration.get_generation()
+
+    # every bump increase the generation
+    assert IndexGeneration.bump() == generation + 1
+    assert IndexGeneration.bump() == generation + 2
+    assert IndexGeneration.get_generation() == generation + 2
+
+
+def test_index_generation_without_bump():
+    # the generation is 0 until the first bump
+    IndexGeneration(meta={"id": IndexGeneration.DOCUMENT_ID}).delete(ignore=404)
+    assert IndexGeneration.get_generation() == 0
+    assert IndexGeneration.bump() == 1
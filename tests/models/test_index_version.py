@@ -0,0 +1,69 @@
+from time import sleep
+from typing import List
+
+from conftest import create_group, delte_index
+from meetup_search.models.group import Group
+from meetup_search.models.index_version import (create_index_version, delete_unfinished_indices,
+                                                get_alias_indices, get_index_versions,
+                                                get_unfinished_index, switch_aliases,
+                                                use_indices)
+
+
+def test_index_version_alias():
+    # the index was created as version behind the alias
+    alias_indices: List[str] = get_alias_indices(document=Group)
+    assert len(alias_indices) == 1
+    assert alias_indices[0].startswith("meetup_group_v")
+    assert get_index_versions(document=Group) == alias_indices
+    assert get_unfinished_index(document=Group) is None
+
+
+def test_index_version_switch(group_1: Group):
+    old_index: str = get_alias_indices(document=Group)[0]
+    group_1.save(refresh=True)
+
+    # fill a new index version, without changing the alias
+    new_index: str = create_index_version(document=Group)
+    assert get_unfinished_index(document=Group) == new_index
+    with use_indices({Group: new_index}):
+        create_group(urlname="new").save(refresh=True)
+        groups: List[Group] = list(Group.get_all_groups())
+        assert [group.urlname for group in groups] == ["new"]
+        assert isinstance(groups[0], Group)
+
+    # searches still use the old index
+    assert [group.urlname for group in Group.get_all_groups()] == [group_1.urlname]
+
+    # switch the alias & delete the old index
+    switch_aliases({Group: new_index})
+    sleep(1)
+    assert get_alias_indices(document=Group) == [new_index]
+    assert get_index_versions(document=Group) == [new_index]
+    assert old_index not in get_index_versions(document=Group)
+    assert [group.urlname for group in Group.get_all_groups()] == ["new"]
+
+
+def test_index_version_switch_from_index(group_1: Group):
+    # a physical index with the name of the alias, like before the indices was versioned
+    delte_index()
+    Group.init()
+    group_1.save(refresh=True)
+
+    new_index: str = create_index_version(document=Group)
+    with use_indices({Group: new_index}):
+        create_group(urlname=group_1.urlname).save(refresh=True)
+
+    # the old index is replaced by the alias
+    switch_aliases({Group: new_index})
+    sleep(1)
+    assert get_alias_indices(document=Group) == [new_index]
+    assert Group.get_group(urlname=group_1.urlname).urlname == group_1.urlname
+
+
+def test_delete_unfinished_indices():
+    alias_indices: List[str] = get_alias_indices(document=Group)
+
+    # only the index versions wich are not behind the alias are deleted
+    new_index: str = create_index_version(document=Group)
+    assert delete_unfinished_indices(document=Group) == [new_index]
+    assert get_index_versions(document=Group) == alias_indices
@@ -61,6 +61,8 @@ def test_get_refresh_token(httpserver: HTTPServer, auth_token: Token):
     # assert if token was refreshed
     assert auth_token.access_token == response_json["access_token"]
     assert auth_token.refresh_token == response_json["refresh_token"]
+    assert auth_token.is_expired() is False
+    assert auth_token.is_expired(margin=response_json["expires_in"] + 60) is True
 
     sleep(1)
 
@@ -69,3 +71,20 @@ def test_get_refresh_token(httpserver: HTTPServer, auth_token: Token):
     assert isinstance(auth_token_2, Token)
     assert auth_token_2.access_token == auth_token.access_token
     assert auth_token_2.refresh_token == auth_token.refresh_token
+
+
+def test_is_expired(auth_token: Token):
+    # token without expires_at is expired
+    assert auth_token.is_expired() is True
+
+    # token with expires_at in the future
+    auth_token.set_expires_in(expires_in=3600)
+    assert auth_token.is_expired() is False
+    assert auth_token.is_expired(margin=60) is False
+
+    # token expires inside the margin
+    assert auth_token.is_expired(margin=3600) is True
+
+    # token expired in the past
+    auth_token.set_expires_in(expires_in=-1)
+    assert auth_token.is_expired() is True
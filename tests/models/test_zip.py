@@ -2,6 +2,8 @@ from meetup_search.models.meetup_zip import MeetupZip
 from time import sleep
 from typing import List
 
+from elasticsearch import Elasticsearch
+
 
 def test_get_or_create_zip():
     zip_code: str = "12345"
@@ -13,6 +15,7 @@ def test_get_or_create_zip():
 
     # # check if both MeetupZip has the same id
     assert meetup_zip_1.meta.id == meetup_zip_2.meta.id
+    assert meetup_zip_1.meta.id == zip_code
     assert meetup_zip_1.zip_code == zip_code
     assert meetup_zip_2.zip_code == zip_code
 
@@ -29,11 +32,36 @@ def test_get_or_create_zips():
     assert len(meetup_zips_1) == 4
     for meetup_zip in meetup_zips_1:
         assert isinstance(meetup_zip, MeetupZip)
+        assert meetup_zip.meta.id == meetup_zip.zip_code
+
+    # add new & existing zips, the existing zips are not written again
+    meetup_zips_2: List[MeetupZip] = MeetupZip.get_or_create_zips(
+        zip_code_list=["4", "5"]
+    )
+    assert [meetup_zip.zip_code for meetup_zip in meetup_zips_2] == ["4", "5"]
+    assert len(list(MeetupZip.get_all_zips())) == 5
+
+
+def test_get_or_create_zips_requests(monkeypatch):
+    # count the requests to elasticsearch
+    connection: Elasticsearch = MeetupZip._get_connection()
+    perform_request = connection.transport.perform_request
+    requests: List[str] = []
+
+    def count_request(method: str, url: str, *args, **kwargs):
+        requests.append(url)
+        return perform_request(method, url, *args, **kwargs)
+
+    monkeypatch.setattr(connection.transport, "perform_request", count_request)
+
+    # a single bulk request & the final refresh for all zips
+    MeetupZip.get_or_create_zips(zip_code_list=[str(i) for i in range(100)])
+    assert len(requests) == 2
 
 
 def test_get_all_zips():
     # get all MeetupZip without add one to elasticsearch
-    assert len(MeetupZip.get_all_zips()) == 0
+    assert len(list(MeetupZip.get_all_zips())) == 0
 
     # create in a loop MeetupZips
     for i in range(0, 5):
@@ -41,6 +69,25 @@ def test_get_all_zips():
 
         sleep(1)
 
-        assert len(MeetupZip.get_all_zips()) == i + 1
-        assert isinstance(MeetupZip.get_all_zips()[i], MeetupZip)
-        assert MeetupZip.get_all_zips()[i].zip_code == "{}".format(i)
+        meetup_zips: List[MeetupZip] = list(MeetupZip.get_all_zips())
+        assert len(meetup_zips) == i + 1
+        assert isinstance(meetup_zips[i], MeetupZip)
+        assert meetup_zips[i].zip_code == "{}".format(i)
+
+
+def test_get_all_zips_cursor():
+    # create more zips than fit into a single batch
+    MeetupZip.get_or_create_zips(zip_code_list=["{:02d}".format(i) for i in range(25)])
+    sleep(1)
+
+    # stream all zips in batches of 10
+    meetup_zips: List[MeetupZip] = list(MeetupZip.get_all_zips(batch_size=10))
+    assert [meetup_zip.zip_code for meetup_zip in meetup_zips] == [
+        "{:02d}".format(i) for i in range(25)
+    ]
+
+    # resume after the 15th zip
+    meetup_zips = list(MeetupZip.get_all_zips(batch_size=10, cursor="14"))
+    assert [meetup_zip.zip_code for meetup_zip in meetup_zips] == [
+        "{:02d}".format(i) for i in range(15, 25)
+    ]
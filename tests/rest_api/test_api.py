@@ -1,7 +1,11 @@
+import time
 from datetime import date, datetime, timedelta
 from time import sleep
-from typing import List
+from typing import List, Optional
 
+import pytest
+from elasticsearch import Transport
+from elasticsearch_dsl import connections
 from flask.helpers import url_for
 from flask.testing import FlaskClient
 from pytest_flask.plugin import JSONResponse
@@ -26,6 +30,7 @@ def test_search_query(client: FlaskClient):
     assert response_1.json == {
         "results": [],
         "hits": 0,
+        "cursor": None,
         "map_center": {"lat": 0, "lon": 0},
     }
     assert isinstance(response_1, JSONResponse)
@@ -111,8 +116,12 @@ def test_map_center(client: FlaskClient):
     response_2: JSONResponse = client.put(
         url_for("meetupsearchapi"), data=generate_search_dict(query="v")
     )
+    # geo points are stored encoded, so the centroid is not exact
     assert response_2.status_code == 200
-    assert response_2.json["map_center"] == {"lat": 1, "lon": 1}
+    assert response_2.json["map_center"] == {
+        "lat": pytest.approx(1, abs=1e-6),
+        "lon": pytest.approx(1, abs=1e-6),
+    }
     assert isinstance(response_2, JSONResponse)
 
     # create a event with venue to a group
@@ -125,7 +134,10 @@ def test_map_center(client: FlaskClient):
         url_for("meetupsearchapi"), data=generate_search_dict(query="v")
     )
     assert response_3.status_code == 200
-    assert response_3.json["map_center"] == {"lat": 5.5, "lon": 5.5}
+    assert response_3.json["map_center"] == {
+        "lat": pytest.approx(5.5, abs=1e-6),
+        "lon": pytest.approx(5.5, abs=1e-6),
+    }
     assert isinstance(response_3, JSONResponse)
 
     # add one more group with mutiple events
@@ -139,10 +151,63 @@ def test_map_center(client: FlaskClient):
         url_for("meetupsearchapi"), data=generate_search_dict(query="v")
     )
     assert response_4.status_code == 200
-    assert response_4.json["map_center"] == {"lat": 5.25, "lon": 5.25}
+    assert response_4.json["map_center"] == {
+        "lat": pytest.approx(5.25, abs=1e-6),
+        "lon": pytest.approx(5.25, abs=1e-6),
+    }
     assert isinstance(response_4, JSONResponse)
 
 
+def test_map_aggregations(client: FlaskClient):
+    """
+    test if the map aggregations cover all found groups & not only the current page
+
+    Arguments:
+        client {FlaskClient} -- client to access flask web ressource
+    """
+    # test with no groups
+    response_1: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(query="v", map_bounds=True, map_heatmap_precision=0),
+    )
+    assert response_1.status_code == 200
+    assert response_1.json["map_center"] == {"lat": 0, "lon": 0}
+    assert response_1.json["map_bounds"] is None
+    assert response_1.json["map_heatmap"] == []
+
+    # add a group without venues at 1,1 & a group with venues around 5.5,5.5
+    create_groups(search_query="v", valid_groups=True, amount=1)
+    groups: List[Group] = create_groups(search_query="v", valid_groups=True, amount=1)
+    create_events_to_group(
+        search_query="b", valid_events=True, group=groups[0], amount=10, venue=True
+    )
+
+    # request a page after all found groups
+    response_2: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(
+            query="v", page=1, limit=5, map_bounds=True, map_heatmap_precision=0
+        ),
+    )
+    assert response_2.status_code == 200
+    assert len(response_2.json["results"]) == 0
+    assert response_2.json["map_center"]["lat"] == pytest.approx(3.25, abs=1e-6)
+    assert response_2.json["map_bounds"]["top_left"]["lat"] == pytest.approx(5.5, abs=1e-6)
+    assert response_2.json["map_bounds"]["bottom_right"]["lat"] == pytest.approx(1, abs=1e-6)
+
+    # the heatmap has a single tile with all groups on zoom level 0
+    assert len(response_2.json["map_heatmap"]) == 1
+    assert response_2.json["map_heatmap"][0]["key"] == "0/0/0"
+    assert response_2.json["map_heatmap"][0]["count"] == 2
+
+    # invalid heatmap precision
+    response_3: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(query="v", map_heatmap_precision=30),
+    )
+    assert response_3.status_code == 400
+
+
 def test_group_venues(client: FlaskClient):
     """
     check if group venues was set right
@@ -223,6 +288,64 @@ def test_search_pagination(client: FlaskClient):
     assert isinstance(response_2, JSONResponse)
 
 
+def test_search_cursor(client: FlaskClient):
+    """
+    Test cursor pagination on search request
+
+    Arguments:
+        client {FlaskClient} -- client to access flask web ressource
+    """
+    # generate may matching groups
+    groups_1: List[Group] = create_groups(
+        search_query="v", valid_groups=True, amount=12
+    )
+
+    # load all pages with the cursor of the previous page
+    urlnames: List[str] = []
+    cursor: Optional[str] = None
+    for page_size in (5, 5, 2):
+        response: JSONResponse = client.put(
+            url_for("meetupsearchapi"),
+            data=generate_search_dict(query="v", limit=5, cursor=cursor),
+        )
+        assert response.status_code == 200
+        assert len(response.json["results"]) == page_size
+        assert response.json["hits"] == 12
+        urlnames.extend(group["urlname"] for group in response.json["results"])
+        cursor = response.json["cursor"]
+
+    # every group was loaded once
+    assert sorted(urlnames) == sorted(group.urlname for group in groups_1)
+
+    # there is no cursor after the last page
+    assert cursor is None
+
+    # the cursor is used instead of the page
+    response_1: JSONResponse = client.put(
+        url_for("meetupsearchapi"), data=generate_search_dict(query="v", limit=5)
+    )
+    response_2: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(
+            query="v", page=2, limit=5, cursor=response_1.json["cursor"]
+        ),
+    )
+    assert response_2.json["results"][0]["urlname"] == urlnames[5]
+
+    # invalid cursor
+    response_3: JSONResponse = client.put(
+        url_for("meetupsearchapi"), data=generate_search_dict(query="v", cursor="invalid")
+    )
+    assert response_3.status_code == 400
+
+    # the cursor of another sort
+    response_4: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(query="v", sort="urlname", cursor=response_1.json["cursor"]),
+    )
+    assert response_4.status_code == 400
+
+
 def test_search_query_event(client: FlaskClient):
     """
     Test if events will use for a search request
@@ -338,6 +461,15 @@ def test_search_sort(client: FlaskClient):
     for i in range(9, 0, -1):
         assert response_1.json["results"][i]["meetup_id"] == i
 
+    # test sort by a text field, with the keyword sub field
+    response_3: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(query="*", sort="urlname"),
+    )
+    assert response_3.status_code == 200
+    urlnames: List[str] = [group["urlname"] for group in response_3.json["results"]]
+    assert urlnames == sorted(urlnames)
+
 
 def test_search_load_events(client: FlaskClient):
     """
@@ -378,6 +510,10 @@ def test_search_load_events(client: FlaskClient):
     assert response_2.json["hits"] == 1
     assert isinstance(response_2, JSONResponse)
 
+    # internal fields are not loaded from elasticsearch
+    for response in (response_1, response_2):
+        assert "name_suggest" not in response.json["results"][0]
+
 
 def test_search_geo_distance(client: FlaskClient, group_1: Group):
     """
@@ -413,6 +549,7 @@ def test_search_geo_distance(client: FlaskClient, group_1: Group):
         venue_location={"lat": 52.520008, "lon": 13.404954},
     )
     group_1.add_event(event=event_berlin)
+    event_berlin.save()
     group_1.save()
     sleep(1)
 
@@ -523,6 +660,40 @@ def test_event_time_filter(client: FlaskClient):
     assert isinstance(response_7, JSONResponse)
 
 
+def test_event_time_filter_between_events(client: FlaskClient, group_1: Group):
+    # a group with events before & after the time range, but without an event in the time range
+    for i, event_time in enumerate((datetime(2019, 1, 1), datetime(2019, 12, 1))):
+        event: Event = Event(
+            meetup_id=str(i),
+            time=event_time,
+            name="",
+            link="",
+            date_in_series_pattern=False,
+        )
+        group_1.add_event(event=event)
+        event.save()
+    group_1.save()
+    sleep(1)
+
+    response_1: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(
+            query="*", event_time_gte=date(2019, 6, 1), event_time_lte=date(2019, 7, 1)
+        ),
+    )
+    assert response_1.status_code == 200
+    assert response_1.json["hits"] == 0
+
+    response_2: JSONResponse = client.put(
+        url_for("meetupsearchapi"),
+        data=generate_search_dict(
+            query="*", event_time_gte=date(2019, 11, 1), event_time_lte=date(2019, 12, 31)
+        ),
+    )
+    assert response_2.status_code == 200
+    assert response_2.json["hits"] == 1
+
+
 def test_suggest(client: FlaskClient):
     # test with no groups
     response_1: JSONResponse = client.put(
@@ -563,3 +734,49 @@ def test_suggest(client: FlaskClient):
     )
     assert response_4.status_code == 200
     assert len(response_4.json["suggestions"]) == 5
+
+
+@pytest.mark.parametrize("limit", [5, 10, 25, 100])
+def test_search_query_count_benchmark(client: FlaskClient, monkeypatch, limit: int):
+    """
+    Benchmark the amount of elasticsearch requests & the latency of a search, the search results
+    are build direct from the hits & the events of all groups are loaded at once, so the amount
+    of elasticsearch requests is the same for every limit
+
+    Arguments:
+        client {FlaskClient} -- client to access flask web ressource
+        limit {int} -- pagination limit
+    """
+    create_groups(search_query="v", valid_groups=True, amount=limit)
+
+    # count every request to elasticsearch
+    transport: Transport = connections.get_connection().transport
+    perform_request = transport.perform_request
+    requests: List[str] = []
+
+    def count_request(method: str, url: str, *args, **kwargs):
+        requests.append(url)
+        return perform_request(method, url, *args, **kwargs)
+
+    monkeypatch.setattr(transport, "perform_request", count_request)
+
+    for sort in (None, "meetup_id"):
+        requests.clear()
+
+        start_time: float = time.time()
+        response: JSONResponse = client.put(
+            url_for("meetupsearchapi"),
+            data=generate_search_dict(query="v", limit=limit, sort=sort),
+        )
+        duration: float = time.time() - start_time
+
+        print(
+            "limit={} sort={}: {} elasticsearch requests in {:.3f}s".format(
+                limit, sort, len(requests), duration
+            )
+        )
+
+        # event search, group search & event scroll with clear scroll
+        assert response.status_code == 200
+        assert len(response.json["results"]) == limit
+        assert len(requests) == 4
@@ -3,7 +3,9 @@ from typing import List
 import pytest
 
 from meetup_search.rest_api.argument_validator import (
+    cursor_validator,
     date_validator,
+    encode_cursor,
     positive_int_validator,
     string_list_validator,
 )
@@ -60,3 +62,30 @@ def test_date_validator():
     for value in invalid_values:
         with pytest.raises(ValueError):
             date_validator(value=value)
+
+
+def test_cursor_validator():
+    # check for valid cursors
+    valid_values: List = [
+        (["-_score"], [1.5, 10]),
+        (["urlname"], ["urlname", 0]),
+    ]
+
+    for sort, sort_values in valid_values:
+        assert cursor_validator(value=encode_cursor(sort=sort, sort_values=sort_values)) == {
+            "sort": sort,
+            "search_after": sort_values,
+        }
+
+    # check for invalid values
+    invalid_values: List = [
+        "Bernd ist ein Brot",
+        "",
+        encode_cursor(sort=["-_score"], sort_values=[]),
+        encode_cursor(sort=[], sort_values=[1.5, 10]),
+        0,
+    ]
+
+    for value in invalid_values:
+        with pytest.raises(ValueError):
+            cursor_validator(value=value)
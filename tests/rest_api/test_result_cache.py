@@ -0,0 +1,232 @@
+import time
+from time import sleep
+from typing import Callable, Dict, List, Optional
+
+import pytest
+from flask.app import Flask
+from flask.helpers import url_for
+from flask.testing import FlaskClient
+from pytest_flask.plugin import JSONResponse
+
+from meetup_search.models.index_generation import IndexGeneration
+from meetup_search.rest_api.api import MeetupSearchApi
+from meetup_search.rest_api.result_cache import (CacheBackend, MemoryCacheBackend,
+                                                 RedisCacheBackend, ResultCache)
+
+from .utily import create_groups, generate_search_dict
+
+
+class LocalRedis:
+    """
+    local stand-in for a redis client, with the methods used by the RedisCacheBackend
+    """
+
+    def __init__(self):
+        self.values: Dict[str, bytes] = {}
+
+    def get(self, name: str) -> Optional[bytes]:
+        return self.values.get(name)
+
+    def set(self, name: str, value: str, ex: Optional[int] = None):
+        self.values[name] = value.encode("utf-8")
+
+    def scan_iter(self, match: str) -> List[str]:
+        return [name for name in self.values if name.startswith(match.rstrip("*"))]
+
+    def delete(self, name: str):
+        self.values.pop(name, None)
+
+
+def test_cache_backend_abstract():
+    # a backend has to implement get, set & clear
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_memory_cache_backend_lru():
+    with pytest.raises(ValueError):
+        MemoryCacheBackend(max_size=0)
+
+    backend: MemoryCacheBackend = MemoryCacheBackend(max_size=2)
+    backend.set("1", {"value": 1}, ttl=60)
+    backend.set("2", {"value": 2}, ttl=60)
+
+    # use "1", so "2" is the least recently used result
+    assert backend.get("1") == {"value": 1}
+    backend.set("3", {"value": 3}, ttl=60)
+
+    assert backend.get("1") == {"value": 1}
+    assert backend.get("2") is None
+    assert backend.get("3") == {"value": 3}
+
+    backend.clear()
+    assert backend.get("1") is None
+
+
+def test_memory_cache_backend_ttl():
+    backend: MemoryCacheBackend = MemoryCacheBackend()
+    backend.set("1", {"value": 1}, ttl=1)
+    assert backend.get("1") == {"value": 1}
+
+    # the result expires after the ttl
+    sleep(1.1)
+    assert backend.get("1") is None
+    assert len(backend.entries) == 0
+
+
+def test_redis_cache_backend():
+    client: LocalRedis = LocalRedis()
+    backend: RedisCacheBackend = RedisCacheBackend(client=client)
+
+    backend.set("1", {"value": [1, 2]}, ttl=60)
+    assert backend.get("1") == {"value": [1, 2]}
+    assert backend.get("2") is None
+    assert list(client.values) == ["meetup_search:result_cache:1"]
+
+    # only the keys of the cache are removed
+    client.set("other", "value")
+    backend.clear()
+    assert list(client.values) == ["other"]
+
+
+def test_result_cache():
+    generation: List[int] = [0]
+    result_cache: ResultCache = ResultCache(
+        backend=MemoryCacheBackend(),
+        generation_check_interval=0,
+        get_generation=lambda: generation[0],
+    )
+
+    results: List[dict] = []
+
+    def get_result() -> dict:
+        results.append({"result": len(results)})
+        return results[-1]
+
+    # the args are normalized, so the order doesn't matter
+    assert result_cache.get_or_set("search", {"a": 1, "b": 2}, get_result) == {"result": 0}
+    assert result_cache.get_or_set("search", {"b": 2, "a": 1}, get_result) == {"result": 0}
+    assert result_cache.get_stats() == {"hits": 1, "misses": 1, "generation": 0}
+
+    # other args & endpoints are cached seperate
+    assert result_cache.get_or_set("search", {"a": 2, "b": 2}, get_result) == {"result": 1}
+    assert result_cache.get_or_set("suggest", {"a": 1, "b": 2}, get_result) == {"result": 2}
+
+    # a new index generation invalidate all cached results
+    generation[0] = 1
+    assert result_cache.get_or_set("search", {"a": 1, "b": 2}, get_result) == {"result": 3}
+    assert result_cache.get_stats() == {"hits": 1, "misses": 4, "generation": 1}
+
+
+def test_result_cache_generation_check_interval():
+    checks: List[int] = []
+
+    def get_generation() -> int:
+        checks.append(1)
+        return 0
+
+    result_cache: ResultCache = ResultCache(
+        backend=MemoryCacheBackend(), generation_check_interval=60, get_generation=get_generation
+    )
+
+    # the generation is loaded only once in the interval
+    for _ in range(0, 10):
+        result_cache.get_or_set("search", {}, lambda: {})
+    assert len(checks) == 1
+
+
+def test_result_cache_api(app: Flask, client: FlaskClient):
+    """
+    Test the result cache of the search & suggest endpoints
+
+    Arguments:
+        app {Flask} -- flask app with testing config
+        client {FlaskClient} -- client to access flask web ressource
+    """
+    # the cache is disabled by the testing config
+    response_1: JSONResponse = client.get(url_for("resultcachestatsapi"))
+    assert response_1.json == {"enabled": False}
+
+    app.extensions["result_cache"] = ResultCache(
+        backend=MemoryCacheBackend(), generation_check_interval=0
+    )
+    create_groups(search_query="v", valid_groups=True, amount=2)
+
+    # the second request is a cache hit
+    for endpoint in ("meetupsearchapi", "meetupsearchsuggestapi"):
+        responses: List[JSONResponse] = [
+            client.put(url_for(endpoint), data=generate_search_dict(query="v"))
+            for _ in range(0, 2)
+        ]
+        assert responses[0].status_code == 200
+        assert responses[0].json == responses[1].json
+
+    response_2: JSONResponse = client.get(url_for("resultcachestatsapi"))
+    assert response_2.json["enabled"] is True
+    assert response_2.json["hits"] == 2
+    assert response_2.json["misses"] == 2
+
+    # a new group is found after the crawler bumped the index generation
+    create_groups(search_query="v", valid_groups=True, amount=1)
+    response_3: JSONResponse = client.put(
+        url_for("meetupsearchapi"), data=generate_search_dict(query="v")
+    )
+    assert response_3.json["hits"] == 2
+
+    IndexGeneration.bump()
+    response_4: JSONResponse = client.put(
+        url_for("meetupsearchapi"), data=generate_search_dict(query="v")
+    )
+    assert response_4.json["hits"] == 3
+
+
+def test_result_cache_benchmark(app: Flask, client: FlaskClient, monkeypatch):
+    """
+    Benchmark the latency of the search endpoint with & without the result cache, the latencies
+    are only reported
+
+    Arguments:
+        app {Flask} -- flask app with testing config
+        client {FlaskClient} -- client to access flask web ressource
+    """
+    create_groups(search_query="v", valid_groups=True, amount=100)
+
+    # count the elasticsearch searches of the endpoint
+    searches: List[dict] = []
+    search: Callable[[MeetupSearchApi, dict], dict] = MeetupSearchApi.search
+
+    def count_search(self: MeetupSearchApi, args: dict) -> dict:
+        searches.append(args)
+        return search(self, args)
+
+    monkeypatch.setattr(MeetupSearchApi, "search", count_search)
+
+    latencies: Dict[str, List[float]] = {}
+    for cache in ("off", "on"):
+        if cache == "on":
+            app.extensions["result_cache"] = ResultCache(backend=MemoryCacheBackend())
+
+        searches.clear()
+        latencies[cache] = []
+        for _ in range(0, 100):
+            start_time: float = time.time()
+            response: JSONResponse = client.put(
+                url_for("meetupsearchapi"), data=generate_search_dict(query="v", limit=100)
+            )
+            latencies[cache].append(time.time() - start_time)
+            assert response.status_code == 200
+
+        latencies[cache].sort()
+        print(
+            "cache={}: p50={:.4f}s p99={:.4f}s".format(
+                cache, latencies[cache][49], latencies[cache][98]
+            )
+        )
+
+        # without the cache every request search in elasticsearch, with the cache only the first
+        assert len(searches) == (100 if cache == "off" else 1)
+
+    # every request after the first one is a cache hit
+    stats: Dict[str, int] = app.extensions["result_cache"].get_stats()
+    assert stats["hits"] == 99
+    assert stats["misses"] == 1
@@ -12,6 +12,7 @@ def generate_search_dict(
     query: Optional[str] = None,
     page: Optional[int] = None,
     limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     sort: Optional[str] = None,
     geo_distance: Optional[str] = None,
     geo_lat: Optional[float] = None,
@@ -19,6 +20,8 @@ def generate_search_dict(
     load_events: Optional[bool] = None,
     event_time_gte: Optional[date] = None,
     event_time_lte: Optional[date] = None,
+    map_bounds: Optional[bool] = None,
+    map_heatmap_precision: Optional[int] = None,
 ) -> dict:
     """
     Generate a search query object for testing
@@ -27,6 +30,7 @@ def generate_search_dict(
         query {Optional[str]} -- search query (default: {None})
         page {Optional[int]} -- pagination page (default: {None})
         limit {Optional[int]} -- pagination entry limits per page (default: {None})
+        cursor {Optional[str]} -- pagination cursor of the previous response (default: {None})
         sort {Optional[List[dict]]} -- search dict (default: {None})
         geo_distance {Optional[str]} -- elasticsearch geo_distance like 100km (default: {None})
         geo_lat {Optional[float]} -- geo latitude (default: {None})
@@ -34,6 +38,9 @@ def generate_search_dict(
         load_events {Optional[bool]} -- set if events should be in search response (default: {None})
         event_time_gte {Optional[date]} -- filter event time begin (default: {None})
         event_time_lte {Optional[date]} -- filter event time end (default: {None})
+        map_bounds {Optional[bool]} -- set if the map bounds should be in search response
+                                       (default: {None})
+        map_heatmap_precision {Optional[int]} -- zoom level of the map heatmap (default: {None})
 
     Returns:
         dict -- search object dict for testing
@@ -46,6 +53,8 @@ def generate_search_dict(
         search_dict["page"] = page
     if limit:
         search_dict["limit"] = limit
+    if cursor:
+        search_dict["cursor"] = cursor
     if sort:
         search_dict["sort"] = sort
     if geo_distance:
@@ -60,6 +69,10 @@ def generate_search_dict(
         search_dict["event_time_gte"] = str(event_time_gte)
     if event_time_lte:
         search_dict["event_time_lte"] = str(event_time_lte)
+    if map_bounds:
+        search_dict["map_bounds"] = map_bounds
+    if map_heatmap_precision is not None:
+        search_dict["map_heatmap_precision"] = map_heatmap_precision
 
     return search_dict
 
@@ -131,6 +144,10 @@ def create_events_to_group(
         created_events.append(event)
 
     group.add_events(events=created_events)
+    for event in created_events:
+        event.save()
+
+    # save the event statistics & venues of the group
     group.save()
     sleep(1)
 